@@ -0,0 +1,290 @@
+"""
+Circuit breakers for the upstream endpoints (official API, fallback API routes and CDN hosts).
+"""
+import time
+import logging
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from .metrics import CIRCUIT_STATE, CIRCUIT_TRANSITIONS, CIRCUIT_REJECTED
+
+logger = logging.getLogger(__name__)
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling an endpoint whose circuit is open."""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"{name} is unavailable, retrying it in {retry_in:.0f}s.")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker of one upstream endpoint, fed with the outcome and latency of every call.
+
+    While closed, calls go through and their outcomes fill a rolling window bounded both in
+    size and in age. Once the window holds `min_calls` outcomes and the failure or slow-call
+    ratio reaches its threshold, the circuit opens: calls are rejected with `CircuitOpenError`
+    so callers move on to an alternative straight away. After `open_for` seconds the circuit
+    turns half-open and lets `probes` calls through; a successful probe closes it, a failed one
+    opens it again for twice as long (up to `max_open_for`).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window: int = 50,
+        horizon: float = 60.0,
+        min_calls: int = 10,
+        failure_ratio: float = 0.5,
+        slow_call: float = 5.0,
+        slow_ratio: float = 0.8,
+        open_for: float = 30.0,
+        max_open_for: float = 300.0,
+        probes: int = 1
+    ):
+        """
+        Args:
+            name (str): The endpoint, e.g. 'api.php'; labels the metrics.
+            window (int): Most recent calls the ratios are computed from.
+            horizon (float): Seconds after which a call leaves the window.
+            min_calls (int): Calls in the window needed before the circuit may open.
+            failure_ratio (float): Share of failed calls that opens the circuit.
+            slow_call (float): Seconds after which a successful call counts as slow.
+            slow_ratio (float): Share of slow calls that opens the circuit.
+            open_for (float): Seconds the circuit first stays open before probing.
+            max_open_for (float): Longest time the circuit stays open after repeated failed probes.
+            probes (int): Calls let through at once while half-open.
+        """
+        self.name = name
+        self.horizon = horizon
+        self.min_calls = min_calls
+        self.failure_ratio = failure_ratio
+        self.slow_call = slow_call
+        self.slow_ratio = slow_ratio
+        self.open_for = open_for
+        self.max_open_for = max_open_for
+        self.probes = probes
+
+        # (finished at, ok, latency) of recent calls
+        self._calls: deque = deque(maxlen=window)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._cooldown = open_for
+        self._probing = 0
+        self._rejected = 0
+        CIRCUIT_STATE.labels(name).set(STATE_VALUES[CLOSED])
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self._cooldown:
+            self._transition(HALF_OPEN)
+        return self._state
+
+    def allows(self) -> bool:
+        """Whether a call would currently be let through."""
+        state = self.state
+        return state == CLOSED or (state == HALF_OPEN and self._probing < self.probes)
+
+    def acquire(self) -> bool:
+        """
+        Admits a call.
+
+        Returns:
+            bool: Whether the call is a half-open probe.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with all probes taken.
+        """
+        if not self.allows():
+            self._rejected += 1
+            CIRCUIT_REJECTED.labels(self.name).inc()
+            raise CircuitOpenError(self.name, self.retry_in)
+        if self._state == HALF_OPEN:
+            self._probing += 1
+            return True
+        return False
+
+    def release(self, probe: bool) -> None:
+        """Gives back an admitted call that ended without an outcome (e.g. it was cancelled)."""
+        if probe:
+            self._probing = max(0, self._probing - 1)
+
+    def record(self, ok: bool, latency: float, probe: bool = False) -> None:
+        """
+        Records the outcome of an admitted call and opens or closes the circuit accordingly.
+
+        Args:
+            ok (bool): Whether the endpoint answered properly.
+            latency (float): Seconds the call took.
+            probe (bool): Whether the call was admitted as a half-open probe.
+        """
+        if probe:
+            self.release(probe)
+            if self._state == HALF_OPEN:
+                if ok:
+                    self._calls.clear()
+                    self._cooldown = self.open_for
+                    self._transition(CLOSED)
+                else:
+                    self._cooldown = min(self.max_open_for, self._cooldown * 2)
+                    self._open()
+                return
+
+        self._calls.append((time.monotonic(), ok, latency))
+        if self._state != CLOSED:
+            return
+        calls, failures, slow = self._counts()
+        if calls >= self.min_calls and (failures >= calls * self.failure_ratio or slow >= calls * self.slow_ratio):
+            self._open()
+
+    @contextmanager
+    def guard(self, is_failure: Optional[Callable[[Exception], bool]] = None) -> Iterator[None]:
+        """
+        Admits a call and records its outcome: success unless the block raises.
+
+        Args:
+            is_failure (Optional[Callable[[Exception], bool]]): Decides whether an exception
+                means the endpoint is unhealthy (default: every exception does).
+
+        Raises:
+            CircuitOpenError: If the circuit does not admit the call.
+        """
+        probe = self.acquire()
+        started = time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            failed = is_failure(e) if is_failure else True
+            self.record(not failed, time.monotonic() - started, probe)
+            raise
+        except BaseException:
+            self.release(probe)
+            raise
+        else:
+            self.record(True, time.monotonic() - started, probe)
+
+    @property
+    def retry_in(self) -> float:
+        """Seconds until an open circuit turns half-open."""
+        if self._state != OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self._cooldown - time.monotonic())
+
+    def health(self) -> float:
+        """Health score in [0, 1]: the success rate, halved for slow calls, 0 while open."""
+        state = self.state
+        if state == OPEN:
+            return 0.0
+        calls, failures, slow = self._counts()
+        if not calls:
+            return 1.0 if state == CLOSED else 0.5
+        score = (1 - failures / calls) * (1 - slow / calls / 2)
+        return score / 2 if state == HALF_OPEN else score
+
+    def stats(self) -> Dict[str, Any]:
+        calls, failures, slow = self._counts()
+        latencies = sorted(latency for _, ok, latency in self._calls if ok)
+        return {
+            "state": self.state,
+            "health": round(self.health(), 3),
+            "calls": calls,
+            "error_rate": round(failures / calls, 3) if calls else 0.0,
+            "slow_rate": round(slow / calls, 3) if calls else 0.0,
+            "p50_ms": round(latencies[len(latencies) // 2] * 1000, 1) if latencies else None,
+            "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000, 1) if latencies else None,
+            "rejected": self._rejected,
+            "retry_in": round(self.retry_in, 1),
+        }
+
+    def _counts(self):
+        """Calls, failures and slow successes in the window, dropping calls older than the horizon."""
+        cutoff = time.monotonic() - self.horizon
+        while self._calls and self._calls[0][0] < cutoff:
+            self._calls.popleft()
+        failures = sum(1 for _, ok, _ in self._calls if not ok)
+        slow = sum(1 for _, ok, latency in self._calls if ok and latency >= self.slow_call)
+        return len(self._calls), failures, slow
+
+    def _open(self) -> None:
+        self._opened_at = time.monotonic()
+        self._transition(OPEN)
+
+    def _transition(self, state: str) -> None:
+        if state == self._state:
+            return
+        if state == OPEN:
+            logger.warning("🔌 Circuit of %s opened, retrying it in %.0fs", self.name, self._cooldown)
+        elif state == CLOSED:
+            logger.info("✅ Circuit of %s closed", self.name)
+        self._state = state
+        CIRCUIT_STATE.labels(self.name).set(STATE_VALUES[state])
+        CIRCUIT_TRANSITIONS.labels(self.name, state).inc()
+
+
+class BreakerRegistry:
+    """Circuit breakers created on first use, one per endpoint, sharing the same settings."""
+
+    def __init__(self, enabled: bool = True, **settings):
+        """
+        Args:
+            enabled (bool): Whether calls are guarded at all.
+            **settings: Keyword arguments of every `CircuitBreaker`.
+        """
+        self.enabled = enabled
+        self.settings = settings
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def configure(self, enabled: bool = True, **settings) -> None:
+        """Replaces the settings and forgets the existing breakers."""
+        self.enabled = enabled
+        self.settings = settings
+        self._breakers.clear()
+
+    def get(self, name: str) -> CircuitBreaker:
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            breaker = self._breakers[name] = CircuitBreaker(name, **self.settings)
+        return breaker
+
+    @contextmanager
+    def guard(self, name: str, is_failure: Optional[Callable[[Exception], bool]] = None) -> Iterator[None]:
+        """`CircuitBreaker.guard` of the endpoint's breaker, or nothing when disabled."""
+        if not self.enabled:
+            yield
+            return
+        with self.get(name).guard(is_failure):
+            yield
+
+    def allows(self, name: str) -> bool:
+        """Whether the endpoint currently accepts calls; endpoints never called do."""
+        breaker = self._breakers.get(name)
+        return not self.enabled or breaker is None or breaker.allows()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: breaker.stats() for name, breaker in sorted(self._breakers.items())}
+
+
+def is_upstream_failure(error: Exception) -> bool:
+    """Whether an error means the endpoint is unhealthy, rather than that the requested item is missing."""
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status >= 500 or error.status == 429
+    return True
+
+
+def cdn_endpoint(url: str) -> str:
+    """Reduces a media URL to the CDN host serving it, e.g. `cdn:aac.saavncdn.com`."""
+    return f"cdn:{urlsplit(url).netloc}"
+
+
+# Shared by both API clients and media downloads
+breakers = BreakerRegistry()
@@ -0,0 +1,176 @@
+"""
+Response caching for the JioSaavn API clients.
+"""
+import time
+import json
+import inspect
+import functools
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from . import codec
+from .metrics import CACHE_LOOKUPS
+
+
+class BaseCache:
+    """
+    Interface for asynchronous response caches.
+
+    Implementations store JSON-compatible values under string keys and must return
+    a fresh copy on every `get`, so callers are free to mutate what they receive.
+    """
+
+    async def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        raise NotImplementedError
+
+    async def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    async def clear(self) -> None:
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+
+class MemoryCache(BaseCache):
+    """
+    In-process LRU cache with per-entry expiry and a bounded memory budget.
+
+    Values are kept JSON-encoded, which both isolates cached data from callers that
+    mutate responses and lets the budget be enforced on real payload sizes.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        """
+        Args:
+            max_bytes (int): Total size of encoded payloads the cache may hold before evicting.
+        """
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._max_bytes = max_bytes
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, payload = entry
+        if expires_at < time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return codec.loads(payload)
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        payload = codec.dumps(value)
+        if len(payload) > self._max_bytes:
+            return
+
+        self._remove(key)
+        self._entries[key] = (time.monotonic() + ttl, payload)
+        self._size += len(payload)
+
+        # Evict least recently used entries until we are back under budget
+        while self._size > self._max_bytes:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+    async def delete(self, key: str) -> None:
+        self._remove(key)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+        self._size = 0
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry:
+            self._size -= len(entry[1])
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._size,
+            "max_bytes": self._max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def make_key(kind: str, params: Dict[str, Any]) -> str:
+    """
+    Builds a cache key from a call type and its request parameters.
+
+    Parameters are normalized so that equivalent requests share a key: `None` values
+    are dropped, strings are stripped and the parameters are ordered by name.
+    """
+    normalized = {
+        name: value.strip() if isinstance(value, str) else value
+        for name, value in params.items()
+        if value is not None
+    }
+    return f"{kind}:{json.dumps(normalized, sort_keys=True, default=str)}"
+
+
+def is_cacheable(result: Any) -> bool:
+    """Default check for results worth caching: non-empty and not an API error payload."""
+    if not result:
+        return False
+    return not (isinstance(result, dict) and result.get("error"))
+
+
+def cached(kind: str, ignore: Iterable[str] = (), when: Callable[[Any], bool] = is_cacheable) -> Callable:
+    """
+    Caches the result of an async API method in the owner's `cache`.
+
+    Args:
+        kind (str): The call type; selects the TTL from the owner's `cache_ttls`.
+        ignore (Iterable[str]): Arguments that are only hints and must not be part of the key.
+        when (Callable[[Any], bool]): Decides whether a result should be stored.
+    """
+    ignored = set(ignore) | {"self"}
+
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            cache: Optional[BaseCache] = self.cache
+            if cache is None:
+                return await func(self, *args, **kwargs)
+
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            params = {name: value for name, value in bound.arguments.items() if name not in ignored}
+            key = make_key(kind, params)
+
+            result = await cache.get(key)
+            if result is not None:
+                CACHE_LOOKUPS.labels(kind, "hit").inc()
+                return result
+
+            CACHE_LOOKUPS.labels(kind, "miss").inc()
+            result = await func(self, *args, **kwargs)
+            ttl = self.cache_ttls.get(kind, 0)
+            if ttl > 0 and when(result):
+                await cache.set(key, result, ttl)
+            return result
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,61 @@
+"""
+JSON decoding and encoding of upstream responses and cached values.
+
+Uses `orjson` when it is installed, which parses straight from the response bytes, and the
+standard library otherwise. Both raise `json.JSONDecodeError` (orjson's error subclasses it)
+on invalid input, including bytes that are not valid UTF-8, so callers handle either backend
+the same way.
+"""
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # Optional dependency
+    orjson = None
+
+BACKEND = "orjson" if orjson else "json"
+
+# Prefixes of the HTML error and block pages served instead of JSON, lowercased
+HTML_PREFIXES = (b"<!doctype", b"<html")
+SNIFF_BYTES = 64
+WHITESPACE = b" \t\r\n\xef\xbb\xbf"  # including a UTF-8 byte order mark
+
+
+def looks_like_html(body: bytes) -> bool:
+    """
+    Whether a response body is an HTML page, judged from its first bytes only.
+
+    Args:
+        body (bytes): The raw response body.
+
+    Returns:
+        bool: True if the body starts (after whitespace) with a doctype or an `<html>` tag.
+    """
+    return body[:SNIFF_BYTES].lstrip(WHITESPACE).lower().startswith(HTML_PREFIXES)
+
+
+if orjson:
+    def loads(data: Union[bytes, str]) -> Any:
+        """Decodes a JSON document from bytes or text."""
+        return orjson.loads(data)
+
+    def dumps(value: Any) -> bytes:
+        """Encodes a value as compact UTF-8 JSON."""
+        try:
+            return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # e.g. integers beyond 64 bits, which only the standard library encodes
+            return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode()
+else:
+    def loads(data: Union[bytes, str]) -> Any:
+        """Decodes a JSON document from bytes or text."""
+        try:
+            return json.loads(data)
+        except UnicodeDecodeError as e:
+            # Invalid UTF-8 is a decoding error of the document, as orjson reports it
+            raise json.JSONDecodeError(f"Invalid UTF-8 ({e.reason})", e.object.decode("utf-8", "replace"), e.start) from e
+
+    def dumps(value: Any) -> bytes:
+        """Encodes a value as compact UTF-8 JSON."""
+        return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode()
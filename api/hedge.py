@@ -0,0 +1,173 @@
+"""
+Hedging of official JioSaavn lookups with the fallback API.
+"""
+import time
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from .metrics import HEDGED_LOOKUPS, HEDGE_DELAY
+
+Primary = Callable[[], Awaitable[Any]]
+# Receives the official response when it already came back unusable, None when started as a hedge
+Secondary = Callable[[Optional[Any]], Awaitable[Any]]
+
+
+async def first_usable(
+    primary: Primary,
+    secondary: Optional[Secondary],
+    usable: Callable[[Any], bool],
+    delay: Optional[float] = None
+) -> Tuple[str, Any, bool, Optional[float]]:
+    """
+    Runs the official lookup and, if needed, the fallback one, returning the first usable result.
+
+    The fallback starts as soon as the official lookup comes back unusable, or alongside it
+    once `delay` seconds have passed without an answer. Whichever lookup is still running
+    when the other one wins is cancelled.
+
+    Args:
+        primary (Primary): Starts the official lookup.
+        secondary (Optional[Secondary]): Starts the fallback lookup, or None if there is none.
+        usable (Callable[[Any], bool]): Decides whether a result answers the lookup.
+        delay (Optional[float]): Seconds to wait for the official lookup before hedging,
+            or None to only fall back once it has answered.
+
+    Returns:
+        Tuple[str, Any, bool, Optional[float]]: The winning source ('official', 'fallback' or
+        'none'), its result (the official one when neither was usable), whether the fallback was
+        started as a hedge, and the official latency (a lower bound if it was cancelled,
+        None if it failed).
+
+    Raises:
+        Exception: The official lookup's error, when the fallback did not produce a usable result.
+    """
+    started = time.monotonic()
+    official = asyncio.ensure_future(primary())
+    running: Dict[asyncio.Future, str] = {official: "official"}
+    official_result = official_error = latency = None
+    hedged = fallback_started = False
+
+    def start_fallback(response: Optional[Any]):
+        nonlocal fallback_started
+        fallback_started = True
+        if secondary:
+            running[asyncio.ensure_future(secondary(response))] = "fallback"
+
+    try:
+        done, _ = await asyncio.wait({official}, timeout=delay)
+        if not done:
+            hedged = True
+            start_fallback(None)
+
+        while running:
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                source = running.pop(task)
+                try:
+                    result = task.result()
+                except Exception as e:
+                    if source == "fallback":
+                        continue
+                    official_error, result = e, None
+                else:
+                    if source == "official":
+                        latency = time.monotonic() - started
+                        official_result = result
+                if usable(result):
+                    if latency is None and not official.done():
+                        # The official lookup is about to be cancelled; it took at least this long
+                        latency = time.monotonic() - started
+                    return source, result, hedged, latency
+
+            if not fallback_started:
+                start_fallback(official_result)
+
+        if official_error:
+            raise official_error
+        return "none", official_result, hedged, latency
+    finally:
+        for task in running:
+            task.cancel()
+
+
+class HedgePolicy:
+    """
+    Adaptive hedge delay for one kind of lookup.
+
+    The delay follows a high percentile of recent official latencies, clamped to
+    `[min_delay, max_delay]`, so only the slowest official answers get hedged. While
+    the fallback keeps winning most lookups the official API is struggling, and the
+    delay is halved to hedge sooner. Until enough latencies are known, `max_delay` is used.
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        percentile: float = 95,
+        min_delay: float = 0.25,
+        max_delay: float = 3.0,
+        window: int = 200,
+        min_samples: int = 20
+    ):
+        """
+        Args:
+            kind (str): The lookup kind, e.g. 'song'; labels the metrics.
+            percentile (float): Percentile of official latencies used as the delay.
+            min_delay (float): Shortest delay in seconds.
+            max_delay (float): Longest delay in seconds.
+            window (int): Number of recent lookups the delay is computed from.
+            min_samples (int): Official latencies needed before the delay adapts.
+        """
+        self.kind = kind
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.min_samples = min_samples
+        self._latencies: deque = deque(maxlen=window)
+        self._winners: deque = deque(maxlen=window)
+        self._delay = max_delay
+        HEDGE_DELAY.labels(kind).set(self._delay)
+
+    @property
+    def delay(self) -> float:
+        return self._delay
+
+    async def run(self, primary: Primary, secondary: Optional[Secondary], usable: Callable[[Any], bool]) -> Tuple[str, Any]:
+        """
+        Runs a hedged lookup (see `first_usable`) and learns from its outcome.
+
+        Returns:
+            Tuple[str, Any]: The winning source and its result.
+        """
+        try:
+            source, result, hedged, latency = await first_usable(primary, secondary, usable, self._delay)
+        except Exception:
+            HEDGED_LOOKUPS.labels(self.kind, "unknown", "none").inc()
+            self.observe("none")
+            raise
+        HEDGED_LOOKUPS.labels(self.kind, str(hedged).lower(), source).inc()
+        self.observe(source, latency)
+        return source, result
+
+    def observe(self, winner: str, latency: Optional[float] = None) -> None:
+        """Records the winner of a lookup and the official latency, and updates the delay."""
+        self._winners.append(winner)
+        if latency is not None:
+            self._latencies.append(latency)
+        if len(self._latencies) < self.min_samples:
+            return
+
+        latencies = sorted(self._latencies)
+        delay = latencies[min(len(latencies) - 1, int(len(latencies) * self.percentile / 100))]
+        if self._winners.count("fallback") * 2 > len(self._winners):
+            delay /= 2
+        self._delay = min(self.max_delay, max(self.min_delay, delay))
+        HEDGE_DELAY.labels(self.kind).set(self._delay)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "delay": round(self._delay, 3),
+            "samples": len(self._latencies),
+            "wins": {source: self._winners.count(source) for source in ("official", "fallback", "none")},
+        }
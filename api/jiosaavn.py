@@ -1,18 +1,76 @@
+import time
 import asyncio
 import json
-from typing import Dict, Literal, Optional, Any, Union, List
+from contextlib import nullcontext
+from typing import BinaryIO, Callable, Dict, Literal, Optional, Any, Tuple, Union, List
 
 import aiohttp
 import aiofiles
 
+from . import codec
+from .session import client_session
+from .cache import BaseCache, MemoryCache, cached, make_key
+from .singleflight import SingleFlight
+from .hedge import HedgePolicy, Primary, Secondary, first_usable
+from .strategies import StrategyRace
+from .breaker import BreakerRegistry, CircuitOpenError, breakers, cdn_endpoint, is_upstream_failure
+from .metrics import (
+    API_LATENCY, FALLBACK_LATENCY, LOOKUPS, DOWNLOAD_BYTES, DOWNLOAD_LATENCY, fallback_endpoint
+)
+
+
+def paginate(entity: Dict[str, Any], field: str, page_no: int, page_size: int) -> Dict[str, Any]:
+    """
+    Returns one page of an entity's track list, leaving the entity itself untouched.
+
+    Args:
+        entity (Dict[str, Any]): A playlist, album or artist holding its whole track list.
+        field (str): The field holding the track list, e.g. 'list' or 'topSongs'.
+        page_no (int): The page number, starting at 1.
+        page_size (int): The number of tracks per page.
+
+    Returns:
+        Dict[str, Any]: A shallow copy of the entity with only the page's tracks in `field`.
+    """
+    start_index = (page_no - 1) * page_size
+    return {**entity, field: (entity.get(field) or [])[start_index:start_index + page_size]}
+
 class JioSaavnFallback:
     """
     Fallback API class for better playlist and artist support.
     """
     
     BASE_URL = "https://jiosavanwave.vercel.app"
+
+    # Identical requests in flight at the same time share a single upstream call
+    inflight = SingleFlight()
+
+    # Circuit breakers shared with the official API client, one per fallback endpoint
+    breakers: BreakerRegistry = breakers
+
+    # Staggered lookups by URL and by ID, learning which one finds each kind of item first
+    strategies: Dict[str, StrategyRace] = {
+        kind: StrategyRace(kind) for kind in ("song", "album", "playlist", "artist")
+    }
+
+    @classmethod
+    def configure_strategies(cls, stagger: float = 0.3) -> None:
+        """
+        Replaces the lookup strategy races.
+
+        Args:
+            stagger (float): Seconds to wait for a lookup strategy before also trying the next one
+                (0 tries them all at once).
+        """
+        cls.strategies = {
+            kind: StrategyRace(kind, stagger) for kind in ("song", "album", "playlist", "artist")
+        }
     
     async def _request_data(self, url: str, params: Dict[str, Any] = None) -> Union[Dict[str, Any], List[Any]]:
+        """Make request to fallback API, joining an identical request if one is already running"""
+        return await self.inflight.do(make_key(url, params or {}), lambda: self._fetch(url, params))
+
+    async def _fetch(self, url: str, params: Dict[str, Any] = None) -> Union[Dict[str, Any], List[Any]]:
         """Make request to fallback API"""
         import logging
         logger = logging.getLogger(__name__)
@@ -22,149 +80,107 @@ class JioSaavnFallback:
             'Accept': 'application/json',
         }
         
-        logger.info(f"🔄 Fallback API Request: {url}")
-        logger.info(f"📋 Parameters: {params}")
+        logger.info("🔄 Fallback API Request: %s", url)
+        logger.info("📋 Parameters: %s", params)
         
+        started = time.perf_counter()
+        outcome = "error"
         try:
-            async with aiohttp.ClientSession(headers=headers) as session:
-                async with session.get(url=url, params=params) as response:
-                    logger.info(f"📡 Response Status: {response.status}")
-                    response.raise_for_status()
+            with self.breakers.guard(f"fallback:{fallback_endpoint(url)}", is_upstream_failure):
+                async with client_session() as session:
+                    async with session.get(url=url, params=params, headers=headers) as response:
+                        logger.info("📡 Response Status: %s", response.status)
+                        response.raise_for_status()
                     
-                    response_data = await response.json()
+                        response_data = codec.loads(await response.read())
                     
-                    # Handle both list and dict responses
-                    if isinstance(response_data, list):
-                        # Direct list response (like songs API)
-                        logger.info(f"✅ Fallback API Success: Direct list with {len(response_data)} items")
-                        return {"success": True, "data": response_data}
-                    elif isinstance(response_data, dict):
-                        # Standard dict response
-                        logger.info(f"✅ Fallback API Success: {response_data.get('success', False)}")
+                        # Handle both list and dict responses
+                        if isinstance(response_data, list):
+                            # Direct list response (like songs API)
+                            logger.info("✅ Fallback API Success: Direct list with %s items", len(response_data))
+                            outcome = "ok"
+                            return {"success": True, "data": response_data}
+                        elif isinstance(response_data, dict):
+                            # Standard dict response
+                            logger.info("✅ Fallback API Success: %s", response_data.get('success', False))
                         
-                        if response_data.get('success') and response_data.get('data'):
-                            data = response_data['data']
-                            # Log specific info based on data type
-                            if isinstance(data, dict):
-                                logger.info(f"📊 Data keys: {list(data.keys())}")
-                                if 'songs' in data:
-                                    logger.info(f"🎵 Songs found: {len(data.get('songs', []))}")
-                                if 'topSongs' in data:
-                                    logger.info(f"🎵 Top songs found: {len(data.get('topSongs', []))}")
-                                if 'name' in data:
-                                    logger.info(f"📝 Name: {data.get('name')}")
-                            elif isinstance(data, list):
-                                logger.info(f"📊 Data is list with {len(data)} items")
-                        else:
-                            logger.warning(f"⚠️ Fallback API returned unsuccessful response")
+                            if response_data.get('success') and response_data.get('data'):
+                                data = response_data['data']
+                                # Log specific info based on data type
+                                if isinstance(data, dict):
+                                    logger.info("📊 Data keys: %s", list(data.keys()))
+                                    if 'songs' in data:
+                                        logger.info("🎵 Songs found: %s", len(data.get('songs', [])))
+                                    if 'topSongs' in data:
+                                        logger.info("🎵 Top songs found: %s", len(data.get('topSongs', [])))
+                                    if 'name' in data:
+                                        logger.info("📝 Name: %s", data.get('name'))
+                                elif isinstance(data, list):
+                                    logger.info("📊 Data is list with %s items", len(data))
+                            else:
+                                logger.warning("⚠️ Fallback API returned unsuccessful response")
                         
-                        return response_data
-                    else:
-                        logger.warning(f"⚠️ Unexpected response type: {type(response_data)}")
-                        return None
+                            outcome = "ok" if response_data.get('success') else "unsuccessful"
+                            return response_data
+                        else:
+                            logger.warning("⚠️ Unexpected response type: %s", type(response_data))
+                            return None
                     
+        except CircuitOpenError as e:
+            outcome = "rejected"
+            logger.warning("⏭️ Skipping fallback API request: %s", e)
+            return None
         except Exception as e:
-            logger.error(f"❌ Fallback API request failed: {e}")
-            logger.error(f"🔗 Failed URL: {url}")
-            logger.error(f"📋 Failed params: {params}")
+            logger.error("❌ Fallback API request failed: %s", e)
+            logger.error("🔗 Failed URL: %s", url)
+            logger.error("📋 Failed params: %s", params)
             return None
+        finally:
+            FALLBACK_LATENCY.labels(fallback_endpoint(url), outcome).observe(time.perf_counter() - started)
     
-    async def get_playlist(self, playlist_id: str, playlist_url: str = None) -> Optional[Dict[str, Any]]:
-        """Get playlist from fallback API"""
+    async def get_playlist(self, playlist_id: str, playlist_url: str = None, limit: int = 50) -> Optional[Dict[str, Any]]:
+        """Get playlist from fallback API, by URL and by ID"""
         url = f"{self.BASE_URL}/api/playlists"
-        
-        # Try with URL first if provided, as it seems more reliable
+        strategies = []
         if playlist_url:
-            params = {'link': playlist_url, 'page': 0, 'limit': 50}
-            response = await self._request_data(url, params)
-            if response and response.get('success'):
-                return response
-        
-        # If playlist_id looks like a numeric ID, use it directly
-        if playlist_id and playlist_id.isdigit():
-            params = {'id': playlist_id, 'page': 0, 'limit': 50}
-            return await self._request_data(url, params)
-        
-        # If not numeric and no URL, try to extract numeric ID from the alphanumeric one
-        # This might need to be improved based on JioSaavn's ID format
-        params = {'id': playlist_id, 'page': 0, 'limit': 50}
-        return await self._request_data(url, params)
+            strategies.append(("link", lambda: self._request_data(url, {'link': playlist_url, 'page': 0, 'limit': limit})))
+        strategies.append(("id", lambda: self._request_data(url, {'id': playlist_id, 'page': 0, 'limit': limit})))
+        return await self.strategies["playlist"].run(playlist_id, strategies)
     
-    async def get_album(self, album_id: str, album_url: str = None) -> Optional[Dict[str, Any]]:
-        """Get album from fallback API"""
+    async def get_album(self, album_id: str, album_url: str = None, limit: int = 50) -> Optional[Dict[str, Any]]:
+        """Get album from fallback API, by URL and by ID"""
         url = f"{self.BASE_URL}/api/albums"
-        
-        # Try with URL first if provided, as it seems more reliable
+        strategies = []
         if album_url:
-            params = {'link': album_url, 'page': 0, 'limit': 50}
-            response = await self._request_data(url, params)
-            if response and response.get('success'):
-                return response
-        
-        # If album_id looks like a numeric ID, use it directly
-        if album_id and album_id.isdigit():
-            params = {'id': album_id, 'page': 0, 'limit': 50}
-            return await self._request_data(url, params)
-        
-        # If not numeric and no URL, try to extract numeric ID from the alphanumeric one
-        # This might need to be improved based on JioSaavn's ID format
-        params = {'id': album_id, 'page': 0, 'limit': 50}
-        return await self._request_data(url, params)
+            strategies.append(("link", lambda: self._request_data(url, {'link': album_url, 'page': 0, 'limit': limit})))
+        strategies.append(("id", lambda: self._request_data(url, {'id': album_id, 'page': 0, 'limit': limit})))
+        return await self.strategies["album"].run(album_id, strategies)
     
     async def get_artist_songs(self, artist_id: str, page: int = 1, song_count: int = 20, album_count: int = 10, artist_url: str = None) -> Optional[Dict[str, Any]]:
-        """Get artist songs from fallback API"""
+        """Get artist songs from fallback API, by URL, by a URL built from an alphanumeric ID and by ID"""
         url = f"{self.BASE_URL}/api/artists"
-        
-        # Try with URL first if provided, as it seems more reliable
+        paging = {'page': page, 'songCount': song_count, 'albumCount': album_count, 'sortBy': 'popularity', 'sortOrder': 'desc'}
+        # Remove None values
+        paging = {k: v for k, v in paging.items() if v is not None}
+
+        strategies = []
         if artist_url:
-            params = {'link': artist_url, 'page': page, 'songCount': song_count, 'albumCount': album_count, 'sortBy': 'popularity', 'sortOrder': 'desc'}
-            # Remove None values
-            params = {k: v for k, v in params.items() if v is not None}
-            response = await self._request_data(url, params)
-            if response and response.get('success'):
-                return response
-        
-        # For alphanumeric artist IDs, try to construct artist URL
+            strategies.append(("link", lambda: self._request_data(url, {'link': artist_url, **paging})))
         if artist_id and not artist_id.isdigit():
-            # Try with constructed URL for alphanumeric IDs
-            try:
-                constructed_url = f"https://www.jiosaavn.com/artist/songs/{artist_id}"
-                params = {'link': constructed_url, 'page': page, 'songCount': song_count, 'albumCount': album_count, 'sortBy': 'popularity', 'sortOrder': 'desc'}
-                # Remove None values
-                params = {k: v for k, v in params.items() if v is not None}
-                response = await self._request_data(url, params)
-                if response and response.get('success'):
-                    return response
-            except Exception:
-                pass
-        
-        # If artist_id looks like a numeric ID, use it directly
-        if artist_id and artist_id.isdigit():
-            params = {'id': artist_id, 'page': page, 'songCount': song_count, 'albumCount': album_count, 'sortBy': 'popularity', 'sortOrder': 'desc'}
-            # Remove None values
-            params = {k: v for k, v in params.items() if v is not None}
-            return await self._request_data(url, params)
-        
-        # Try with the original ID anyway
-        params = {'id': artist_id, 'page': page, 'songCount': song_count, 'albumCount': album_count, 'sortBy': 'popularity', 'sortOrder': 'desc'}
-        # Remove None values
-        params = {k: v for k, v in params.items() if v is not None}
-        return await self._request_data(url, params)
+            constructed_url = f"https://www.jiosaavn.com/artist/songs/{artist_id}"
+            strategies.append(("constructed", lambda: self._request_data(url, {'link': constructed_url, **paging})))
+        strategies.append(("id", lambda: self._request_data(url, {'id': artist_id, **paging})))
+        return await self.strategies["artist"].run(artist_id, strategies)
     
     async def get_song(self, song_id: str, song_url: str = None) -> Optional[Dict[str, Any]]:
-        """Get song from fallback API"""
+        """Get song from fallback API, by URL and by ID"""
         url = f"{self.BASE_URL}/api/songs"
-        
-        # Try with URL first if provided, as it seems more reliable
+        strategies = []
         if song_url:
-            params = {'link': song_url}
-            response = await self._request_data(url, params)
-            if response and response.get('success'):
-                return response
-        
-        # Try with song ID (note: API expects 'ids' parameter)
-        params = {'ids': song_id}
-        return await self._request_data(url, params)
+            strategies.append(("link", lambda: self._request_data(url, {'link': song_url})))
+        # Note: API expects 'ids' parameter
+        strategies.append(("id", lambda: self._request_data(url, {'ids': song_id})))
+        return await self.strategies["song"].run(song_id, strategies)
 
 
 class Jiosaavn:
@@ -174,14 +190,154 @@ class Jiosaavn:
 
     BASE_URL = "https://www.jiosaavn.com"
     API_URL = f"{BASE_URL}/api.php"
+
+    # Songs fetched at once per playlist, album or artist; pages are sliced from them locally
+    COLLECTION_LIMIT = 500
+
+    # Identical requests in flight at the same time share a single upstream call
+    inflight = SingleFlight()
+
+    # Response cache shared by every instance, and its TTL (seconds) per call type
+    cache: Optional[BaseCache] = MemoryCache()
+    cache_ttls: Dict[str, float] = {
+        "search": 600,
+        "search_all_types": 600,
+        "song": 3600,
+        "playlist_or_album": 1800,
+        "artist": 1800,
+    }
+
+    # Adaptive hedging of official lookups with the fallback API, per lookup kind (None: fall back serially)
+    hedging: Optional[Dict[str, HedgePolicy]] = {
+        kind: HedgePolicy(kind) for kind in ("song", "album", "playlist", "artist")
+    }
+
+    # Circuit breakers of api.php, the fallback endpoints and the CDN hosts (shared with JioSaavnFallback)
+    breakers: BreakerRegistry = breakers
     
     def __init__(self):
         self.fallback = JioSaavnFallback()
 
+    @classmethod
+    def configure_cache(cls, cache: Optional[BaseCache], ttls: Optional[Dict[str, float]] = None) -> None:
+        """
+        Replaces the shared response cache and optionally overrides TTLs.
+
+        Args:
+            cache (Optional[BaseCache]): The cache to use, or None to disable caching.
+            ttls (Optional[Dict[str, float]]): TTL overrides per call type.
+        """
+        cls.cache = cache
+        if ttls:
+            cls.cache_ttls = {**cls.cache_ttls, **ttls}
+
+    @classmethod
+    def configure_hedging(
+        cls,
+        enabled: bool = True,
+        percentile: float = 95,
+        min_delay: float = 0.25,
+        max_delay: float = 3.0
+    ) -> None:
+        """
+        Replaces the hedging policies of the official lookups.
+
+        Args:
+            enabled (bool): Whether the fallback API may be queried before the official API has answered.
+            percentile (float): Percentile of recent official latencies used as the hedge delay.
+            min_delay (float): Shortest hedge delay in seconds.
+            max_delay (float): Longest hedge delay in seconds, used until latencies are known.
+        """
+        cls.hedging = {
+            kind: HedgePolicy(kind, percentile, min_delay, max_delay)
+            for kind in ("song", "album", "playlist", "artist")
+        } if enabled else None
+
+    @classmethod
+    def configure_breakers(
+        cls,
+        enabled: bool = True,
+        failure_ratio: float = 0.5,
+        min_calls: int = 10,
+        slow_call: float = 5.0,
+        open_for: float = 30.0
+    ) -> None:
+        """
+        Replaces the settings of the upstream circuit breakers.
+
+        Args:
+            enabled (bool): Whether endpoints that keep failing are skipped for a while.
+            failure_ratio (float): Share of failed calls in the rolling window that opens a circuit.
+            min_calls (int): Calls in the window needed before a circuit may open.
+            slow_call (float): Seconds after which a call counts as slow.
+            open_for (float): Seconds a circuit stays open before a probe call is let through.
+        """
+        cls.breakers.configure(
+            enabled,
+            failure_ratio=failure_ratio,
+            min_calls=min_calls,
+            slow_call=slow_call,
+            open_for=open_for,
+            max_open_for=max(open_for, 300.0)
+        )
+
+    async def _lookup(
+        self,
+        kind: str,
+        primary: Primary,
+        secondary: Optional[Secondary],
+        usable: Callable[[Any], bool]
+    ) -> Tuple[str, Any]:
+        """
+        Runs an official lookup, using the fallback API when the official one is slow or unusable.
+
+        Args:
+            kind (str): The lookup kind, selecting the hedging policy.
+            primary (Primary): Starts the official lookup.
+            secondary (Optional[Secondary]): Starts the fallback lookup, given the official
+                response if it already came back unusable.
+            usable (Callable[[Any], bool]): Decides whether a result answers the lookup.
+
+        Returns:
+            Tuple[str, Any]: The source that answered ('official', 'fallback' or 'none') and its
+            result; the official result when neither was usable.
+
+        Raises:
+            RuntimeError: If the official request failed and the fallback found nothing.
+        """
+        policy = (self.hedging or {}).get(kind)
+        if policy:
+            return await policy.run(primary, secondary, usable)
+        source, result, _, _ = await first_usable(primary, secondary, usable)
+        return source, result
+
     async def _request_data(
         self,
         url: str,
         params: Dict[str, Any] = None
+    ) -> Union[Dict[str, Any], List[Any]]:
+        """
+        Makes a GET request, coalescing it with an identical request that is already in flight.
+
+        Concurrent callers asking for the same URL and parameters (e.g. the same `__call` and
+        `token`) share one upstream request. Errors are raised to every waiter and are not cached.
+
+        Args:
+            url (str): The URL to send the GET request to.
+            params (Dict[str, Any]): The query parameters for the GET request.
+
+        Returns:
+            Union[Dict[str, Any], List[Any]]: The JSON response from the request.
+
+        Raises:
+            RuntimeError: If there is an error during the request or if the response cannot be decoded as JSON.
+        """
+        return await self.inflight.do(make_key(url, params or {}), lambda: self._fetch(url, params))
+
+    async def _fetch(
+        self,
+        url: str,
+        params: Dict[str, Any] = None
     ) -> Union[Dict[str, Any], List[Any]]:
         """
         Makes an asynchronous GET request to the specified URL with the given parameters.
@@ -206,35 +362,52 @@ class Jiosaavn:
             'Origin': 'https://www.jiosaavn.com'
         }
         
+        started = time.perf_counter()
+        outcome = "error"
         try:
-            async with aiohttp.ClientSession(headers=headers) as session:
-                async with session.get(url=url, params=params) as response:
-                    response.raise_for_status()  # Raise an exception for HTTP errors
-                    response_text = await response.text()
-                    
-                    # Check if response is HTML (not JSON) - this handles the web interface check
-                    if response_text.strip().startswith('<!DOCTYPE') or response_text.strip().startswith('<html'):
-                        # Return a simple status for web interface health checks
-                        return {"status": "ok", "message": "Bot web interface is running"}
-                    
-                    # Try to parse JSON
-                    try:
-                        return json.loads(response_text)
-                    except json.JSONDecodeError:
-                        # If JSON parsing fails, check if it's likely a blocked request
-                        if 'blocked' in response_text.lower() or 'forbidden' in response_text.lower():
-                            raise RuntimeError("Request blocked by JioSaavn. Try again later.")
-                        else:
-                            # Log the response for debugging but don't expose it to user
-                            import logging
-                            logger = logging.getLogger(__name__)
-                            logger.debug(f"Non-JSON response from {url}: {response_text[:200]}...")
-                            raise RuntimeError("JioSaavn API returned invalid response format.")
+            # Only the official API is guarded; the bot also pings its own web interface through here
+            with self.breakers.guard("api.php") if url == self.API_URL else nullcontext():
+                async with client_session() as session:
+                    async with session.get(url=url, params=params, headers=headers) as response:
+                        response.raise_for_status()  # Raise an exception for HTTP errors
+                        body = await response.read()
+
+                        # Check if response is HTML (not JSON) - this handles the web interface check
+                        if codec.looks_like_html(body):
+                            outcome = "html"
+                            if url == self.API_URL:
+                                # An HTML page from the API itself is an error or block page
+                                raise RuntimeError("Request blocked by JioSaavn. Try again later.")
+                            # Return a simple status for web interface health checks
+                            return {"status": "ok", "message": "Bot web interface is running"}
+
+                        # Try to parse JSON
+                        try:
+                            data = codec.loads(body)
+                            outcome = "ok"
+                            return data
+                        except json.JSONDecodeError:
+                            # If JSON parsing fails, check if it's likely a blocked request
+                            response_text = body.decode(response.get_encoding(), errors="replace")
+                            if 'blocked' in response_text.lower() or 'forbidden' in response_text.lower():
+                                raise RuntimeError("Request blocked by JioSaavn. Try again later.")
+                            else:
+                                # Log the response for debugging but don't expose it to user
+                                import logging
+                                logger = logging.getLogger(__name__)
+                                logger.debug("Non-JSON response from %s: %s...", url, response_text[:200])
+                                raise RuntimeError("JioSaavn API returned invalid response format.")
+        except CircuitOpenError:
+            outcome = "rejected"
+            raise
         except aiohttp.ClientError as e:
             raise RuntimeError(f"Request to {url} failed: {e}")
         except Exception as e:
             raise RuntimeError(f"Unexpected error during request to {url}: {e}")
+        finally:
+            API_LATENCY.labels((params or {}).get('__call', 'unknown'), outcome).observe(time.perf_counter() - started)
 
+    @cached("search")
     async def search(
         self,
         query: str,
@@ -286,6 +459,7 @@ class Jiosaavn:
 
         return await self._request_data(self.API_URL, params=params)
 
+    @cached("search_all_types")
     async def search_all_types(
         self,
         query: str
@@ -320,6 +494,9 @@ class Jiosaavn:
         Since the artist details API often returns empty data, this method
         searches for songs by the artist and constructs the response.
 
+        Pages of an artist known by ID are sliced from its catalog (see `get_artist_catalog`),
+        so paging through an artist fetches it from upstream only once.
+
         Args:
             artist_id (Optional[str]): The unique identifier for the artist. Defaults to None.
             artist_name (Optional[str]): The name of the artist. Defaults to None.
@@ -337,99 +514,18 @@ class Jiosaavn:
         if page_size < 1:
             raise ValueError("`page_size` must be a positive integer.")
 
-        # First try to get artist details using the official API
-        if artist_id:
-            params = {
-                '__call': 'webapi.get',
-                'token': artist_id,
-                'type': "artist",
-                'p': page_no,
-                'n_song': page_size,
-                'n_album': page_size,
-                'includeMetaTags': 0,
-                'ctx': 'web6dot0',
-                'api_version': 4,
-                '_format': 'json',
-                '_marker': 0
-            }
-
-            response = await self._request_data(self.API_URL, params=params)
-            
-            # Check if we got meaningful artist data
-            if response and response.get("topSongs") and len(response["topSongs"]) > 0:
-                start_index = (page_no - 1) * page_size
-                end_index = page_no * page_size
-                response["topSongs"] += response.get("topAlbums", [])
-                response['count'] = len(response["topSongs"])
-                response['topSongs'] = response["topSongs"][start_index:end_index]
-                return response
+        import logging
+        logger = logging.getLogger(__name__)
 
-        # Use fallback API directly for better artist support since it's more reliable
         if artist_id:
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.info(f"🎤 Using fallback API directly for artist {artist_id}")
-            
-            # Try to get artist URL from the response if available
-            artist_url = None
-            if response and response.get("perma_url"):
-                artist_url = response["perma_url"]
-            
-            fallback_response = await self.fallback.get_artist_songs(artist_id, page_no, page_size, 10, artist_url)
-            
-            if fallback_response and fallback_response.get('success') and fallback_response.get('data'):
-                # Convert fallback format to expected format
-                artist_info = fallback_response['data']
-                songs = artist_info.get('topSongs', [])
-                albums = artist_info.get('topAlbums', [])
-                
-                # Combine songs and albums for compatibility
-                all_items = songs + albums
-                
-                # Extract image URL properly
-                image_url = ''
-                if artist_info.get('image') and isinstance(artist_info['image'], list) and len(artist_info['image']) > 0:
-                    # Get the highest quality image
-                    image_url = artist_info['image'][-1].get('url', '')
-                elif artist_info.get('image') and isinstance(artist_info['image'], str):
-                    image_url = artist_info['image']
-                
-                # Apply pagination to items
-                start_index = (page_no - 1) * page_size
-                end_index = start_index + page_size
-                paginated_items = all_items[start_index:end_index]
-                
-                artist_response = {
-                    "artistId": artist_id,
-                    "name": artist_info.get('name', artist_name or 'Unknown'),
-                    "image": image_url,
-                    "type": "artist",
-                    "topSongs": paginated_items,  # Include both songs and albums
-                    "count": len(all_items),  # Total count, not paginated count
-                    "follower_count": str(artist_info.get('followerCount', 0)),
-                    "fan_count": str(artist_info.get('fanCount', 0)),
-                    "is_verified": artist_info.get('isVerified', False),
-                    "dominant_language": artist_info.get('dominantLanguage', ''),
-                    "dominant_type": artist_info.get('dominantType', ''),
-                    "bio": artist_info.get('bio', ''),
-                    "dob": artist_info.get('dob', ''),
-                    "urls": {
-                        "songs": artist_info.get('url', f"https://www.jiosaavn.com/artist/{artist_info.get('name', '').lower().replace(' ', '-')}-songs/")
-                    }
-                }
-                logger.info(f"✅ Fallback API returned {len(songs)} songs and {len(albums)} albums for artist {artist_info.get('name')}")
-                return artist_response
-            else:
-                logger.warning(f"⚠️ Fallback API failed for artist {artist_id}")
-                if fallback_response:
-                    logger.debug(f"Fallback response: {fallback_response}")
-                else:
-                    logger.debug("No response from fallback API")
+            catalog = await self.get_artist_catalog(artist_id=artist_id, artist_name=artist_name)
+            if catalog:
+                return paginate(catalog, "topSongs", page_no, page_size)
 
         # If fallback fails or no artist_id, fall back to song search
         if artist_id and not artist_name:
             # We can't search for an artist by ID easily, so return None
-            logger.debug(f"Artist ID {artist_id} provided but no artist name. Cannot fetch songs.")
+            logger.debug("Artist ID %s provided but no artist name. Cannot fetch songs.", artist_id)
             return None
 
         if not artist_name:
@@ -466,8 +562,137 @@ class Jiosaavn:
             }
         }
         
+        LOOKUPS.labels("artist", "search").inc()
         return artist_response
 
+    @cached("artist")
+    async def get_artist_catalog(
+        self,
+        artist_id: str,
+        artist_name: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Retrieves an artist with all of its top songs and albums (up to `COLLECTION_LIMIT` songs).
+
+        The whole catalog is fetched once and kept in the response cache; pages shown to the
+        user and album uploads are served from it. `artist_name` is part of the cache key, as
+        the fallback API's response falls back to it for the artist's name.
+
+        Args:
+            artist_id (str): The unique identifier for the artist.
+            artist_name (Optional[str]): The name of the artist, used when the fallback API has none.
+
+        Returns:
+            Optional[Dict[str, Any]]: The artist with every item in `topSongs` and their number
+            in `count`, or None if neither API knows the artist.
+        """
+        # First try to get artist details using the official API, hedged with the fallback API
+        # which is more reliable for artists
+        params = {
+            '__call': 'webapi.get',
+            'token': artist_id,
+            'type': "artist",
+            'p': 1,
+            'n_song': self.COLLECTION_LIMIT,
+            'n_album': 20,
+            'includeMetaTags': 0,
+            'ctx': 'web6dot0',
+            'api_version': 4,
+            '_format': 'json',
+            '_marker': 0
+        }
+
+        source, response = await self._lookup(
+            "artist",
+            lambda: self._request_data(self.API_URL, params=params),
+            lambda official: self._fallback_artist(artist_id, artist_name, official),
+            lambda response: bool(response and response.get("topSongs"))
+        )
+
+        if source == "fallback":
+            LOOKUPS.labels("artist", "fallback").inc()
+            return response
+        if source == "official":
+            response["topSongs"] += response.get("topAlbums", [])
+            response['count'] = len(response["topSongs"])
+            LOOKUPS.labels("artist", "official").inc()
+            return response
+        return None
+
+    async def _fallback_artist(
+        self,
+        artist_id: str,
+        artist_name: Optional[str],
+        response: Optional[Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Fetches an artist from the fallback API, converted to the official response format.
+
+        Args:
+            artist_id (str): The unique identifier for the artist.
+            artist_name (Optional[str]): The name of the artist, used when the fallback API has none.
+            response (Optional[Dict[str, Any]]): The unusable official response, if it already came back;
+                its artist link is preferred by the fallback API.
+
+        Returns:
+            Optional[Dict[str, Any]]: The converted response, or None if the fallback API has nothing.
+        """
+        import logging
+        logger = logging.getLogger(__name__)
+        logger.info("🎤 Using fallback API for artist %s", artist_id)
+
+        # Try to get artist URL from the response if available
+        artist_url = None
+        if response and response.get("perma_url"):
+            artist_url = response["perma_url"]
+
+        fallback_response = await self.fallback.get_artist_songs(artist_id, 1, self.COLLECTION_LIMIT, 10, artist_url)
+
+        if fallback_response and fallback_response.get('success') and fallback_response.get('data'):
+            # Convert fallback format to expected format
+            artist_info = fallback_response['data']
+            songs = artist_info.get('topSongs', [])
+            albums = artist_info.get('topAlbums', [])
+
+            # Combine songs and albums for compatibility
+            all_items = songs + albums
+
+            # Extract image URL properly
+            image_url = ''
+            if artist_info.get('image') and isinstance(artist_info['image'], list) and len(artist_info['image']) > 0:
+                # Get the highest quality image
+                image_url = artist_info['image'][-1].get('url', '')
+            elif artist_info.get('image') and isinstance(artist_info['image'], str):
+                image_url = artist_info['image']
+
+            artist_response = {
+                "artistId": artist_id,
+                "name": artist_info.get('name', artist_name or 'Unknown'),
+                "image": image_url,
+                "type": "artist",
+                "topSongs": all_items,  # Include both songs and albums
+                "count": len(all_items),
+                "follower_count": str(artist_info.get('followerCount', 0)),
+                "fan_count": str(artist_info.get('fanCount', 0)),
+                "is_verified": artist_info.get('isVerified', False),
+                "dominant_language": artist_info.get('dominantLanguage', ''),
+                "dominant_type": artist_info.get('dominantType', ''),
+                "bio": artist_info.get('bio', ''),
+                "dob": artist_info.get('dob', ''),
+                "urls": {
+                    "songs": artist_info.get('url', f"https://www.jiosaavn.com/artist/{artist_info.get('name', '').lower().replace(' ', '-')}-songs/")
+                }
+            }
+            logger.info("✅ Fallback API returned %s songs and %s albums for artist %s", len(songs), len(albums), artist_info.get('name'))
+            return artist_response
+        else:
+            logger.warning("⚠️ Fallback API failed for artist %s", artist_id)
+            if fallback_response:
+                logger.debug("Fallback response: %s", fallback_response)
+            else:
+                logger.debug("No response from fallback API")
+        return None
+
     async def get_playlist_or_album(
         self,
         album_id: Optional[str] = None,
@@ -479,11 +704,15 @@ class Jiosaavn:
         """
         Retrieves the details of a playlist or album based on the provided ID.
 
+        Pages are sliced from the whole track list (see `get_collection`), so paging through
+        a playlist or album fetches it from upstream only once.
+
         Args:
             album_id (Optional[str]): The unique identifier for the album. Defaults to None.
             playlist_id (Optional[str]): The unique identifier for the playlist. Defaults to None.
             page_no (Optional[int]): The page number for paginated results. Defaults to 1.
             page_size (Optional[int]): The number of results per page. Defaults to 10.
+            original_url (Optional[str]): The JioSaavn link the user sent, a hint for the fallback API.
 
         Returns:
             Optional[Dict[str, Any]]: The details from the API or None if no response or empty list for albums.
@@ -495,6 +724,35 @@ class Jiosaavn:
             raise ValueError("`page_no` must be a positive integer.")
         if page_size < 1:
             raise ValueError("`page_size` must be a positive integer.")
+
+        collection = await self.get_collection(album_id=album_id, playlist_id=playlist_id, original_url=original_url)
+        return paginate(collection, "list", page_no, page_size) if collection else None
+
+    @cached("playlist_or_album", ignore=("original_url",))
+    async def get_collection(
+        self,
+        album_id: Optional[str] = None,
+        playlist_id: Optional[str] = None,
+        original_url: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Retrieves a playlist or album with its whole track list (up to `COLLECTION_LIMIT` songs).
+
+        The track list is fetched once and kept in the response cache; pages shown to the
+        user and album uploads are served from it.
+
+        Args:
+            album_id (Optional[str]): The unique identifier for the album. Defaults to None.
+            playlist_id (Optional[str]): The unique identifier for the playlist. Defaults to None.
+            original_url (Optional[str]): The JioSaavn link the user sent, a hint for the fallback API.
+
+        Returns:
+            Optional[Dict[str, Any]]: The playlist or album with every song in `list`, or None if
+            neither API has songs for it.
+
+        Raises:
+            ValueError: If both `album_id` and `playlist_id` are None.
+        """
         if not album_id and not playlist_id:
             raise ValueError("Either `album_id` or `playlist_id` must be provided.")
 
@@ -505,8 +763,8 @@ class Jiosaavn:
             '__call': 'webapi.get',
             'token': token,
             'type': search_type,
-            'p': page_no,
-            'n': page_size,
+            'p': 1,
+            'n': self.COLLECTION_LIMIT,
             'includeMetaTags': 0,
             'ctx': 'web6dot0',
             'api_version': 4,
@@ -516,140 +774,56 @@ class Jiosaavn:
 
         import logging
         logger = logging.getLogger(__name__)
-        logger.info(f"🌐 Official API Request: {search_type} with token {token}")
-        logger.info(f"📋 Official API params: {params}")
-        
-        response = await self._request_data(self.API_URL, params=params)
+        logger.info("🌐 Official API Request: %s with token %s", search_type, token)
+        logger.info("📋 Official API params: %s", params)
         
+        def usable(response: Optional[Dict[str, Any]]) -> bool:
+            # The official API often returns an empty list even when the playlist exists
+            return bool(response) and not (
+                (not response.get("list") and not response.get("songs")) or
+                (response.get("list") == "" or response.get("list") == []) or
+                response.get("list_count") == "0"
+            )
+
+        async def fallback(official: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+            logger.info("🔄 Trying fallback API for %s %s...", search_type, token)
+            logger.debug("📋 Original response: %s", official)
+            return await self._fallback_playlist_or_album(search_type, token, official, original_url)
+
+        # Official API first; the fallback API covers for it when it is slow or returns nothing
+        source, response = await self._lookup(
+            search_type,
+            lambda: self._request_data(self.API_URL, params=params),
+            fallback,
+            usable
+        )
+        if source == "fallback":
+            LOOKUPS.labels(search_type, "fallback").inc()
+            return response
+
         if response:
-            logger.info(f"✅ Official API Response received with keys: {list(response.keys())}")
+            logger.info("✅ Official API Response received with keys: %s", list(response.keys()))
         else:
-            logger.warning(f"❌ Official API returned None/empty response")
-        
-        # For playlists and artists, use fallback API directly since it's more reliable
-        # The logs show official API returns empty list even when playlist exists
-        should_use_fallback = (
-            not response or 
-            (not response.get("list") and not response.get("songs")) or
-            (response.get("list") == "" or response.get("list") == []) or
-            (search_type in ["playlist", "album"] and response.get("list_count") == "0")
-        )
-        
-        if should_use_fallback:
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.info(f"🔄 Official API failed for {search_type} {token}, trying fallback API...")
-            logger.info(f"📋 Original response: {response}")
-            
-            if search_type == "playlist":
-                # Try to get numeric ID from the original response if available
-                numeric_id = None
-                if response and response.get('id'):
-                    numeric_id = response['id']
-                
-                # Use numeric ID if available, otherwise use token and original_url
-                if numeric_id and numeric_id.isdigit():
-                    logger.info(f"🔢 Using numeric ID {numeric_id} for fallback API")
-                    fallback_response = await self.fallback.get_playlist(numeric_id, original_url)
-                else:
-                    logger.info(f"🌐 Using token {token} and URL for fallback API")
-                    fallback_response = await self.fallback.get_playlist(token, original_url)
-                
-                if fallback_response and fallback_response.get('success') and fallback_response.get('data'):
-                    # Convert fallback format to expected format
-                    data = fallback_response['data']
-                    songs = data.get('songs', [])
-                    
-                    # Extract image URL properly
-                    image_url = ''
-                    if data.get('image') and isinstance(data['image'], list) and len(data['image']) > 0:
-                        # Get the highest quality image
-                        image_url = data['image'][-1].get('url', '')
-                    
-                    # Apply pagination to songs
-                    start_index = (page_no - 1) * page_size
-                    end_index = start_index + page_size
-                    paginated_songs = songs[start_index:end_index]
-                    
-                    response = {
-                        "id": numeric_id or token,
-                        "title": data.get('name', 'Unknown Playlist'),
-                        "image": image_url,
-                        "list": paginated_songs,
-                        "list_count": data.get('songCount', len(songs)),
-                        "perma_url": data.get('url', f"https://www.jiosaavn.com/featured/{token}"),
-                        "more_info": {
-                            "follower_count": 0  # Not provided in this API
-                        }
-                    }
-                    logger.info(f"✅ Fallback API SUCCESS: Converted playlist '{data.get('name')}' with {len(songs)} songs")
-                    # Return immediately after successful fallback conversion
-                    return response
-            
-            elif search_type == "album":
-                # Try to get numeric ID from the original response if available
-                numeric_id = None
-                if response and response.get('id'):
-                    numeric_id = response['id']
-                
-                # Use numeric ID if available, otherwise use token and original_url
-                if numeric_id and numeric_id.isdigit():
-                    logger.info(f"🔢 Using numeric ID {numeric_id} for fallback API")
-                    fallback_response = await self.fallback.get_album(numeric_id, original_url)
-                else:
-                    logger.info(f"🌐 Using token {token} and URL for fallback API")
-                    fallback_response = await self.fallback.get_album(token, original_url)
-                
-                if fallback_response and fallback_response.get('success') and fallback_response.get('data'):
-                    # Convert fallback format to expected format
-                    data = fallback_response['data']
-                    songs = data.get('songs', [])
-                    
-                    # Extract image URL properly
-                    image_url = ''
-                    if data.get('image') and isinstance(data['image'], list) and len(data['image']) > 0:
-                        # Get the highest quality image
-                        image_url = data['image'][-1].get('url', '')
-                    
-                    # Apply pagination to songs
-                    start_index = (page_no - 1) * page_size
-                    end_index = start_index + page_size
-                    paginated_songs = songs[start_index:end_index]
-                    
-                    response = {
-                        "id": numeric_id or token,
-                        "title": data.get('name', 'Unknown Album'),
-                        "image": image_url,
-                        "list": paginated_songs,
-                        "list_count": data.get('songCount', len(songs)),
-                        "perma_url": data.get('url', f"https://www.jiosaavn.com/album/{token}"),
-                        "year": data.get('releaseDate', '').split('-')[0] if data.get('releaseDate') else '',
-                        "more_info": {
-                            "album_url": data.get('url', f"https://www.jiosaavn.com/album/{token}")
-                        }
-                    }
-                    logger.info(f"✅ Fallback API SUCCESS: Converted album '{data.get('name')}' with {len(songs)} songs")
-                    # Return immediately after successful fallback conversion
-                    return response
-        
+            logger.warning("❌ Official API returned None/empty response")
+
         if not response:
             return None
 
         # Debug logging to understand response structure
         import logging
         logger = logging.getLogger(__name__)
-        logger.debug(f"Final response for {search_type} (token={token}): keys={list(response.keys()) if response else 'None'}")
+        logger.debug("Final response for %s (token=%s): keys=%s", search_type, token, list(response.keys()) if response else 'None')
         
         # Log more details for debugging
         if response:
             if 'list' in response:
-                logger.debug(f"Response has 'list' with {len(response['list'])} items")
+                logger.debug("Response has 'list' with %s items", len(response['list']))
             if 'songs' in response:
-                logger.debug(f"Response has 'songs' with {len(response['songs'])} items")
+                logger.debug("Response has 'songs' with %s items", len(response['songs']))
             if 'title' in response:
-                logger.debug(f"Response title: {response['title']}")
+                logger.debug("Response title: %s", response['title'])
             if 'error' in response:
-                logger.debug(f"Response has error: {response['error']}")
+                logger.debug("Response has error: %s", response['error'])
         else:
             logger.debug("Response is None or empty")
 
@@ -665,6 +839,7 @@ class Jiosaavn:
                 response["list"] = response["songs"]
                 response["list_count"] = len(response["songs"])
             
+            LOOKUPS.labels("playlist", "official").inc()
             return response
 
         # For albums
@@ -675,11 +850,6 @@ class Jiosaavn:
         # Some albums use 'songs' instead of 'list'  
         if response.get("songs") and not response.get("list"):
             response["list"] = response["songs"]
-
-        # Apply pagination
-        start_index = (page_no - 1) * page_size
-        end_index = page_no * page_size
-        response['list'] = response["list"][start_index:end_index]
         
         # Set additional metadata
         more_info = response.get("more_info", {})
@@ -688,8 +858,113 @@ class Jiosaavn:
         if album_url:
             response["perma_url"] = album_url
             
+        LOOKUPS.labels("album", "official").inc()
         return response
 
+    async def _fallback_playlist_or_album(
+        self,
+        search_type: str,
+        token: str,
+        response: Optional[Dict[str, Any]],
+        original_url: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Fetches a playlist or album from the fallback API, converted to the official response format.
+
+        Args:
+            search_type (str): 'playlist' or 'album'.
+            token (str): The ID the official API was asked for.
+            response (Optional[Dict[str, Any]]): The unusable official response, if it already came back;
+                its numeric ID is preferred by the fallback API.
+            original_url (Optional[str]): The JioSaavn link the user sent.
+
+        Returns:
+            Optional[Dict[str, Any]]: The converted response, or None if the fallback API has nothing.
+        """
+        import logging
+        logger = logging.getLogger(__name__)
+
+        if search_type == "playlist":
+            # Try to get numeric ID from the original response if available
+            numeric_id = None
+            if response and response.get('id'):
+                numeric_id = response['id']
+
+            # Use numeric ID if available, otherwise use token and original_url
+            if numeric_id and numeric_id.isdigit():
+                logger.info("🔢 Using numeric ID %s for fallback API", numeric_id)
+                fallback_response = await self.fallback.get_playlist(numeric_id, original_url, self.COLLECTION_LIMIT)
+            else:
+                logger.info("🌐 Using token %s and URL for fallback API", token)
+                fallback_response = await self.fallback.get_playlist(token, original_url, self.COLLECTION_LIMIT)
+
+            if fallback_response and fallback_response.get('success') and fallback_response.get('data'):
+                # Convert fallback format to expected format
+                data = fallback_response['data']
+                songs = data.get('songs', [])
+
+                # Extract image URL properly
+                image_url = ''
+                if data.get('image') and isinstance(data['image'], list) and len(data['image']) > 0:
+                    # Get the highest quality image
+                    image_url = data['image'][-1].get('url', '')
+
+                response = {
+                    "id": numeric_id or token,
+                    "title": data.get('name', 'Unknown Playlist'),
+                    "image": image_url,
+                    "list": songs,
+                    "list_count": data.get('songCount', len(songs)),
+                    "perma_url": data.get('url', f"https://www.jiosaavn.com/featured/{token}"),
+                    "more_info": {
+                        "follower_count": 0  # Not provided in this API
+                    }
+                }
+                logger.info("✅ Fallback API SUCCESS: Converted playlist '%s' with %s songs", data.get('name'), len(songs))
+                return response
+
+        elif search_type == "album":
+            # Try to get numeric ID from the original response if available
+            numeric_id = None
+            if response and response.get('id'):
+                numeric_id = response['id']
+
+            # Use numeric ID if available, otherwise use token and original_url
+            if numeric_id and numeric_id.isdigit():
+                logger.info("🔢 Using numeric ID %s for fallback API", numeric_id)
+                fallback_response = await self.fallback.get_album(numeric_id, original_url, self.COLLECTION_LIMIT)
+            else:
+                logger.info("🌐 Using token %s and URL for fallback API", token)
+                fallback_response = await self.fallback.get_album(token, original_url, self.COLLECTION_LIMIT)
+
+            if fallback_response and fallback_response.get('success') and fallback_response.get('data'):
+                # Convert fallback format to expected format
+                data = fallback_response['data']
+                songs = data.get('songs', [])
+
+                # Extract image URL properly
+                image_url = ''
+                if data.get('image') and isinstance(data['image'], list) and len(data['image']) > 0:
+                    # Get the highest quality image
+                    image_url = data['image'][-1].get('url', '')
+
+                response = {
+                    "id": numeric_id or token,
+                    "title": data.get('name', 'Unknown Album'),
+                    "image": image_url,
+                    "list": songs,
+                    "list_count": data.get('songCount', len(songs)),
+                    "perma_url": data.get('url', f"https://www.jiosaavn.com/album/{token}"),
+                    "year": data.get('releaseDate', '').split('-')[0] if data.get('releaseDate') else '',
+                    "more_info": {
+                        "album_url": data.get('url', f"https://www.jiosaavn.com/album/{token}")
+                    }
+                }
+                logger.info("✅ Fallback API SUCCESS: Converted album '%s' with %s songs", data.get('name'), len(songs))
+                return response
+        return None
+
+    @cached("song", when=lambda response: bool(response and response.get("songs")))
     async def get_song(
         self,
         song_id: str
@@ -714,28 +989,27 @@ class Jiosaavn:
             '_marker': 0
         }
         
-        # Try official API first
-        response = await self._request_data(self.API_URL, params=params)
-        
-        # If official API fails or returns empty, try fallback API
-        if not response or not response.get("songs"):
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.info(f"🔄 Official song API failed for {song_id}, trying fallback API...")
-            
+        import logging
+        logger = logging.getLogger(__name__)
+
+        async def fallback(official: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+            logger.info("🔄 Trying fallback API for song %s...", song_id)
             fallback_response = await self.fallback.get_song(song_id)
             if fallback_response and fallback_response.get('success') and fallback_response.get('data'):
-                # Convert fallback format to expected format
+                # Convert fallback format to expected format - the data should be an array of songs
                 data = fallback_response['data']
-                
-                # Convert to expected format - the data should be an array of songs
-                if isinstance(data, list):
-                    response = {"songs": data}
-                else:
-                    response = {"songs": [data]}
-                    
-                logger.info(f"✅ Fallback song API success for {song_id}")
-        
+                logger.info("✅ Fallback song API success for %s", song_id)
+                return {"songs": data if isinstance(data, list) else [data]}
+            return None
+
+        # Official API first; the fallback API covers for it when it is slow or returns nothing
+        source, response = await self._lookup(
+            "song",
+            lambda: self._request_data(self.API_URL, params=params),
+            fallback,
+            lambda response: bool(response and response.get("songs"))
+        )
+        LOOKUPS.labels("song", source).inc()
         return response
 
     async def get_song_lyrics(
@@ -806,15 +1080,16 @@ class Jiosaavn:
         self,
         song_id: str,
         bitrate: Literal[160, 320],
-        download_location: str
-    ) -> None:
+        download_location: Union[str, BinaryIO]
+    ) -> Union[str, BinaryIO]:
         """
         Downloads a song based on the song ID and bitrate.
 
         Args:
             song_id (str): The unique identifier for the song.
             bitrate (Literal[160, 320]): The desired bitrate for the download.
-            download_location (str): The file path where the song will be saved.
+            download_location (Union[str, BinaryIO]): The file path where the song will be saved,
+                or a writable binary buffer to stream the audio into.
 
         Raises:
             ValueError: If the song download URL cannot be retrieved.
@@ -840,24 +1115,65 @@ class Jiosaavn:
             'Sec-Ch-Ua-Mobile': '?0',
             'Sec-Ch-Ua-Platform': '"Windows"'
         }
+        return await self.download_file(url, download_location, headers=headers)
 
-        # Retry logic for downloads
-        max_retries = 3
+    async def download_file(
+        self,
+        url: str,
+        download_location: Union[str, BinaryIO],
+        headers: Optional[Dict[str, str]] = None,
+        max_retries: int = 3
+    ) -> Union[str, BinaryIO]:
+        """
+        Downloads a media file, retrying transient failures with exponential backoff.
+
+        Args:
+            url (str): The URL of the file.
+            download_location (Union[str, BinaryIO]): A file path, or a writable binary buffer
+                (e.g. an in-memory or spooled buffer) that receives the body without touching disk.
+            headers (Optional[Dict[str, str]]): Extra request headers.
+            max_retries (int): Number of attempts before giving up.
+
+        Returns:
+            Union[str, BinaryIO]: The `download_location` that was written.
+
+        Raises:
+            ValueError: If the file could not be downloaded, or its host's circuit is open.
+        """
+        started = time.perf_counter()
+        endpoint = cdn_endpoint(url)
         for attempt in range(max_retries):
+            size = 0
             try:
                 timeout = aiohttp.ClientTimeout(total=300)  # 5 minutes timeout
-                async with aiohttp.ClientSession(headers=headers, timeout=timeout) as session:
-                    async with session.get(url) as response:
-                        response.raise_for_status()
-                        async with aiofiles.open(download_location, "wb") as file:
-                            while True:
-                                chunk = await response.content.read(4 * 1024 * 1024)  # 4 MB chunk size
-                                if not chunk:
-                                    break
-                                await file.write(chunk)
+                with self.breakers.guard(endpoint, is_upstream_failure):
+                    async with client_session() as session:
+                        async with session.get(url, headers=headers, timeout=timeout) as response:
+                            response.raise_for_status()
+                            if isinstance(download_location, str):
+                                async with aiofiles.open(download_location, "wb") as file:
+                                    async for chunk in response.content.iter_chunked(4 * 1024 * 1024):  # 4 MB chunk size
+                                        await file.write(chunk)
+                                        size += len(chunk)
+                            else:
+                                # Start over if a previous attempt wrote part of the body
+                                download_location.seek(0)
+                                download_location.truncate()
+                                async for chunk in response.content.iter_chunked(4 * 1024 * 1024):
+                                    download_location.write(chunk)
+                                    size += len(chunk)
+                                download_location.seek(0)
                 break  # Success, exit retry loop
+            except CircuitOpenError as e:
+                # The host keeps failing; retrying it now would only add to the wait
+                DOWNLOAD_LATENCY.labels("rejected").observe(time.perf_counter() - started)
+                raise ValueError(f"Failed to download song: {e}")
             except aiohttp.ClientError as e:
+                DOWNLOAD_BYTES.inc(size)
                 if attempt == max_retries - 1:  # Last attempt
+                    DOWNLOAD_LATENCY.labels("error").observe(time.perf_counter() - started)
                     raise ValueError(f"Failed to download song after {max_retries} attempts: {e}")
                 await asyncio.sleep(2 ** attempt)  # Exponential backoff
+        DOWNLOAD_BYTES.inc(size)
+        DOWNLOAD_LATENCY.labels("ok").observe(time.perf_counter() - started)
         return download_location
@@ -0,0 +1,77 @@
+"""
+Prometheus metrics of the JioSaavn API clients.
+"""
+from urllib.parse import urlsplit
+
+from prometheus_client import Counter, Gauge, Histogram
+
+# Upstream calls take from tens of milliseconds to the 5 minute download timeout
+LATENCY_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+API_LATENCY = Histogram(
+    "jiosaavn_api_request_seconds",
+    "Latency of official JioSaavn API requests per __call.",
+    ["call", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+FALLBACK_LATENCY = Histogram(
+    "jiosaavn_fallback_request_seconds",
+    "Latency of fallback API requests per endpoint.",
+    ["endpoint", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+LOOKUPS = Counter(
+    "jiosaavn_lookups_total",
+    "Entity lookups by the source that answered them (official, fallback, search or none).",
+    ["kind", "source"],
+)
+CACHE_LOOKUPS = Counter(
+    "jiosaavn_response_cache_lookups_total",
+    "Response cache lookups per call type.",
+    ["kind", "result"],
+)
+HEDGED_LOOKUPS = Counter(
+    "jiosaavn_hedged_lookups_total",
+    "Official/fallback lookups by whether the fallback was started as a hedge and the source that won.",
+    ["kind", "hedged", "winner"],
+)
+HEDGE_DELAY = Gauge(
+    "jiosaavn_hedge_delay_seconds",
+    "Current delay before an official lookup is hedged with the fallback API.",
+    ["kind"],
+)
+FALLBACK_STRATEGY_WINS = Counter(
+    "jiosaavn_fallback_strategy_wins_total",
+    "Fallback API lookups by the strategy that found the item first, per ID format (numeric or token).",
+    ["kind", "id_format", "strategy"],
+)
+CIRCUIT_STATE = Gauge(
+    "jiosaavn_circuit_state",
+    "Circuit breaker state per upstream endpoint (0 closed, 1 half-open, 2 open).",
+    ["endpoint"],
+)
+CIRCUIT_TRANSITIONS = Counter(
+    "jiosaavn_circuit_transitions_total",
+    "Circuit breaker state changes per upstream endpoint and new state.",
+    ["endpoint", "state"],
+)
+CIRCUIT_REJECTED = Counter(
+    "jiosaavn_circuit_rejected_total",
+    "Calls not sent to an upstream endpoint because its circuit was open.",
+    ["endpoint"],
+)
+DOWNLOAD_BYTES = Counter(
+    "jiosaavn_download_bytes_total",
+    "Bytes of media downloaded from JioSaavn.",
+)
+DOWNLOAD_LATENCY = Histogram(
+    "jiosaavn_download_seconds",
+    "Duration of media downloads from JioSaavn.",
+    ["outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+
+
+def fallback_endpoint(url: str) -> str:
+    """Reduces a fallback API URL to its endpoint, e.g. `/api/songs`."""
+    return urlsplit(url).path or "/"
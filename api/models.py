@@ -0,0 +1,326 @@
+"""
+Compact records of the songs, albums, playlists and artists the bot shows and downloads.
+
+The official API and the fallback API describe the same items with different shapes
+(`title` vs `name`, `more_info.artistMap` vs `artists`, image strings vs image lists, ...).
+Responses are converted once into these `__slots__` records, which keep only the fields
+the handlers use, with image URLs already resolved, so the upstream JSON can be dropped.
+"""
+import html
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def resolve_image(image: Any) -> str:
+    """
+    Picks the largest image URL out of either API's image field.
+
+    Args:
+        image (Any): An official image URL string, a fallback list of `{quality, url}`
+            objects (smallest first) or a single `{url}` object.
+
+    Returns:
+        str: The image URL, or an empty string if there is none.
+    """
+    if isinstance(image, str):
+        # Official API format - 150x150 thumbnail whose 500x500 version has the same URL
+        return image.replace("150x150", "500x500")
+    if isinstance(image, list) and image:
+        return (image[-1] or {}).get("url", "") if isinstance(image[-1], dict) else ""
+    if isinstance(image, dict):
+        return image.get("url", "")
+    return ""
+
+
+def to_int(value: Any) -> int:
+    """Converts a count or duration that may be a string, empty or missing into an int."""
+    try:
+        return int(value) if value else 0
+    except (TypeError, ValueError):
+        return 0
+
+
+def item_id(data: Dict[str, Any]) -> str:
+    """The ID of an item, taken from its link when the response has no `id`."""
+    if data.get("id"):
+        return str(data["id"])
+    url = data.get("perma_url") or data.get("url") or ""
+    return url.rsplit("/", 1)[-1] if "/" in url else ""
+
+
+def song_data(response: Any) -> Optional[Dict[str, Any]]:
+    """Finds the song in a `get_song` response of either API (`songs`, `data` or the song itself)."""
+    if not response or not isinstance(response, dict):
+        return None
+    for field in ("songs", "data"):
+        value = response.get(field)
+        if isinstance(value, list) and value:
+            return value[0]
+        if isinstance(value, dict) and value:
+            return value
+    return response
+
+
+def song_artists(data: Dict[str, Any]) -> List[Any]:
+    """The role-tagged artists of a song in either API format."""
+    more_info = data.get("more_info") or {}
+    artists = (more_info.get("artistMap") or {}).get("artists")
+    if artists:
+        return artists
+
+    artists_data = data.get("artists")
+    if isinstance(artists_data, list):
+        return artists_data
+    if isinstance(artists_data, dict):
+        artists = []
+        for field in ("primary_artists", "featured_artists", "all"):
+            artists.extend(artists_data.get(field) or [])
+        # If no structured data, treat as single artist
+        return artists or [artists_data]
+    return []
+
+
+def names_by_role(artists: List[Any], role: str) -> str:
+    return ", ".join(
+        artist["name"] for artist in artists
+        if isinstance(artist, dict) and artist.get("role") == role and artist.get("name")
+    )
+
+
+class Song:
+    """A song with the metadata shown in its card and written to the uploaded audio."""
+
+    __slots__ = (
+        "id", "title", "album", "album_url", "language", "year", "release_date", "duration",
+        "play_count", "singers", "music", "lyricists", "actors", "image_url", "url", "has_lyrics",
+        "download_urls",
+    )
+
+    def __init__(
+        self,
+        id: str,
+        title: str = "",
+        album: str = "",
+        album_url: str = "",
+        language: str = "",
+        year: str = "",
+        release_date: str = "",
+        duration: int = 0,
+        play_count: int = 0,
+        singers: str = "",
+        music: str = "",
+        lyricists: str = "",
+        actors: str = "",
+        image_url: str = "",
+        url: str = "",
+        has_lyrics: bool = False,
+        download_urls: Tuple[Tuple[str, str], ...] = ()
+    ):
+        self.id = id
+        self.title = title
+        self.album = album
+        self.album_url = album_url
+        self.language = language
+        self.year = year
+        self.release_date = release_date
+        self.duration = duration
+        self.play_count = play_count
+        self.singers = singers
+        self.music = music
+        self.lyricists = lyricists
+        self.actors = actors
+        self.image_url = image_url
+        self.url = url
+        self.has_lyrics = has_lyrics
+        self.download_urls = download_urls
+
+    @classmethod
+    def from_response(cls, response: Any, song_id: Optional[str] = None) -> Optional["Song"]:
+        """
+        Converts a `get_song` response of either API.
+
+        Args:
+            response (Any): The response.
+            song_id (Optional[str]): The requested ID, used when the song has none.
+
+        Returns:
+            Optional[Song]: The song, or None if the response holds none.
+        """
+        data = song_data(response)
+        return cls.from_api(data, song_id) if data else None
+
+    @classmethod
+    def from_api(cls, data: Dict[str, Any], song_id: Optional[str] = None) -> "Song":
+        """
+        Converts one song object of either API.
+
+        Args:
+            data (Dict[str, Any]): The song, e.g. an entry of an album's `list`.
+            song_id (Optional[str]): The requested ID, used when the song has none.
+
+        Returns:
+            Song: The song.
+        """
+        more_info = data.get("more_info") or {}
+        id = item_id(data) or song_id or ""
+        title = html.unescape(str(data.get("title") or data.get("name") or ""))
+
+        album, album_url = "", ""
+        for album_data in (more_info.get("album"), data.get("album")):
+            if isinstance(album_data, dict):
+                album = album or album_data.get("name") or ""
+                album_url = album_url or album_data.get("url") or ""
+            elif isinstance(album_data, str):
+                album = album or album_data
+        album = html.unescape(album) if album else "Unknown"
+        album_url = album_url or more_info.get("album_url") or (
+            # Fallback: construct album URL if not provided
+            f"https://jiosaavn.com/album/{album.lower().replace(' ', '-')}" if album != "Unknown" else ""
+        )
+
+        artists = song_artists(data)
+        # Singers, else the primary artists, else the first few artists of any role
+        singers = names_by_role(artists, "singer") or names_by_role(artists, "primary_artists") or ", ".join(
+            name for name in (
+                artist.get("name", "") if isinstance(artist, dict) else artist if isinstance(artist, str) else ""
+                for artist in artists[:3]
+            ) if name
+        )
+
+        release_date = more_info.get("release_date") or data.get("releaseDate") or ""
+        downloads = data.get("downloadUrl")
+        return cls(
+            id=id,
+            title=title,
+            album=album,
+            album_url=album_url,
+            language=data.get("language", "Unknown"),
+            year=str(data.get("year") or (release_date.split("-")[0] if release_date else "")),
+            release_date=release_date,
+            duration=to_int(more_info.get("duration") or data.get("duration")),
+            play_count=to_int(data.get("play_count") or data.get("playCount")),
+            singers=singers,
+            music=more_info.get("music") or names_by_role(artists, "music"),
+            lyricists=names_by_role(artists, "lyricist"),
+            actors=names_by_role(artists, "starring"),
+            image_url=resolve_image(data.get("image")),
+            url=data.get("perma_url") or data.get("url") or f"https://jiosaavn.com/songs/{title.replace(' ', '-')}/{id}",
+            has_lyrics=more_info.get("has_lyrics") == "true" or data.get("hasLyrics") is True,
+            download_urls=tuple(
+                (download.get("quality", ""), download["url"])
+                for download in downloads if isinstance(download, dict) and download.get("url")
+            ) if isinstance(downloads, list) else (),
+        )
+
+    def download_url(self, bitrate: int) -> Optional[str]:
+        """
+        The direct media URL for a bitrate, as listed by the fallback API.
+
+        Returns:
+            Optional[str]: The URL of that quality, else of the highest quality, else None
+            (songs from the official API need `song.generateAuthToken`).
+        """
+        for quality, url in self.download_urls:
+            if str(bitrate) in quality:
+                return url
+        return self.download_urls[-1][1] if self.download_urls else None
+
+    def __repr__(self) -> str:
+        return f"Song(id={self.id!r}, title={self.title!r})"
+
+
+class Collection:
+    """An album or playlist and the songs on the requested page."""
+
+    __slots__ = ("id", "title", "url", "image_url", "song_count", "followers", "duration", "year", "songs")
+
+    def __init__(
+        self,
+        id: str,
+        title: str = "",
+        url: str = "",
+        image_url: str = "",
+        song_count: int = 0,
+        followers: int = 0,
+        duration: int = 0,
+        year: str = "",
+        songs: Tuple[Song, ...] = ()
+    ):
+        self.id = id
+        self.title = title
+        self.url = url
+        self.image_url = image_url
+        self.song_count = song_count
+        self.followers = followers
+        self.duration = duration
+        self.year = year
+        self.songs = songs
+
+    @classmethod
+    def from_api(cls, response: Dict[str, Any]) -> "Collection":
+        """
+        Converts a `get_playlist_or_album` or `get_collection` response.
+
+        Both APIs' answers come in the official shape, but their songs may be in either format.
+        """
+        more_info = response.get("more_info") or {}
+        songs = response.get("list") or response.get("songs") or []
+        if not isinstance(songs, list):
+            songs = []
+        return cls(
+            id=item_id(response),
+            title=html.unescape(str(response.get("title") or "")),
+            url=response.get("perma_url", ""),
+            image_url=resolve_image(response.get("image")),
+            song_count=to_int(response.get("list_count")) or len(songs),
+            followers=to_int(more_info.get("follower_count")),
+            duration=to_int(more_info.get("duration")),
+            year=str(response.get("year") or ""),
+            songs=tuple(Song.from_api(song) for song in songs if isinstance(song, dict)),
+        )
+
+    def __repr__(self) -> str:
+        return f"Collection(id={self.id!r}, title={self.title!r}, songs={len(self.songs)})"
+
+
+class Artist:
+    """An artist and the top songs and albums on the requested page."""
+
+    __slots__ = ("id", "name", "url", "image_url", "followers", "dob", "song_count", "songs")
+
+    def __init__(
+        self,
+        id: str,
+        name: str = "",
+        url: str = "",
+        image_url: str = "",
+        followers: int = 0,
+        dob: str = "",
+        song_count: int = 0,
+        songs: Tuple[Song, ...] = ()
+    ):
+        self.id = id
+        self.name = name
+        self.url = url
+        self.image_url = image_url
+        self.followers = followers
+        self.dob = dob
+        self.song_count = song_count
+        self.songs = songs
+
+    @classmethod
+    def from_api(cls, response: Dict[str, Any]) -> "Artist":
+        """Converts a `get_artist` or `get_artist_catalog` response."""
+        songs = response.get("topSongs") or []
+        return cls(
+            id=str(response.get("artistId") or ""),
+            name=html.unescape(str(response.get("name") or "")),
+            url=(response.get("urls") or {}).get("songs") or "",
+            image_url=resolve_image(response.get("image")),
+            followers=to_int(response.get("follower_count")),
+            dob=response.get("dob") or "",
+            song_count=to_int(response.get("count")) or len(songs),
+            songs=tuple(Song.from_api(song) for song in songs if isinstance(song, dict)),
+        )
+
+    def __repr__(self) -> str:
+        return f"Artist(id={self.id!r}, name={self.name!r}, songs={len(self.songs)})"
@@ -0,0 +1,89 @@
+"""
+Shared HTTP connection pool for the JioSaavn API clients.
+
+A single long-lived :class:`aiohttp.ClientSession` is opened by the bot on
+startup and reused by every API call, thumbnail fetch and audio download so
+that DNS lookups, TCP and TLS handshakes are paid once per host instead of
+once per request.
+"""
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+_session: Optional[aiohttp.ClientSession] = None
+
+
+async def open_session(
+    limit: int = 100,
+    limit_per_host: int = 20,
+    ttl_dns_cache: int = 300,
+    keepalive_timeout: float = 30.0
+) -> aiohttp.ClientSession:
+    """
+    Opens the shared client session if it is not already open.
+
+    Args:
+        limit (int): Maximum number of simultaneous connections in the pool.
+        limit_per_host (int): Maximum number of simultaneous connections to a single host.
+        ttl_dns_cache (int): Seconds a resolved DNS entry is kept in the cache.
+        keepalive_timeout (float): Seconds an idle connection is kept open for reuse.
+
+    Returns:
+        aiohttp.ClientSession: The shared client session.
+    """
+    global _session
+    if _session and not _session.closed:
+        return _session
+
+    connector = aiohttp.TCPConnector(
+        limit=limit,
+        limit_per_host=limit_per_host,
+        ttl_dns_cache=ttl_dns_cache,
+        keepalive_timeout=keepalive_timeout,
+    )
+    _session = aiohttp.ClientSession(connector=connector)
+    logger.info(
+        "🌐 HTTP pool opened (limit=%s, per_host=%s, dns_ttl=%ss, keepalive=%ss)",
+        limit, limit_per_host, ttl_dns_cache, keepalive_timeout
+    )
+    return _session
+
+
+async def close_session() -> None:
+    """Closes the shared client session and releases its pooled connections."""
+    global _session
+    if _session and not _session.closed:
+        await _session.close()
+        logger.info("🌐 HTTP pool closed")
+    _session = None
+
+
+def get_session() -> Optional[aiohttp.ClientSession]:
+    """
+    Returns the shared client session.
+
+    Returns:
+        Optional[aiohttp.ClientSession]: The open shared session, or None if the pool is not running.
+    """
+    if _session and not _session.closed:
+        return _session
+    return None
+
+
+@asynccontextmanager
+async def client_session() -> AsyncIterator[aiohttp.ClientSession]:
+    """
+    Yields the shared client session, or a short-lived one when the pool is not open
+    (for example when the API classes are used outside of the bot).
+    """
+    session = get_session()
+    if session:
+        yield session
+        return
+
+    async with aiohttp.ClientSession() as temp_session:
+        yield temp_session
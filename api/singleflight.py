@@ -0,0 +1,67 @@
+"""
+Coalescing of identical in-flight requests.
+"""
+import copy
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class SingleFlight:
+    """
+    Lets concurrent callers asking for the same key share one in-flight request.
+
+    The first caller for a key starts the request; everyone arriving while it is still
+    running awaits the same future. Results are never kept after the request settles,
+    so a failure is raised to every waiter but the next caller starts a fresh attempt.
+    The request is cancelled once every caller waiting for it has been cancelled.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._waiters: Dict[str, int] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Runs `factory()` for `key`, or joins the request already running for it.
+
+        Args:
+            key (str): Identity of the request.
+            factory (Callable[[], Awaitable[Any]]): Starts the request when no identical one is running.
+
+        Returns:
+            Any: The request result. Joined callers receive their own copy, since callers
+            commonly mutate the responses they get back.
+        """
+        future = self._inflight.get(key)
+        is_leader = future is None
+        if is_leader:
+            future = asyncio.ensure_future(factory())
+            self._inflight[key] = future
+            self._waiters[key] = 0
+            future.add_done_callback(lambda done: self._forget(key, done))
+            self.started += 1
+        else:
+            self.coalesced += 1
+
+        self._waiters[key] += 1
+        try:
+            # Shield so one cancelled caller does not cancel the request for everyone else
+            result = await asyncio.shield(future)
+        except asyncio.CancelledError:
+            if self._inflight.get(key) is future and self._waiters[key] == 1:
+                future.cancel()
+            raise
+        finally:
+            if self._inflight.get(key) is future:
+                self._waiters[key] -= 1
+        return result if is_leader else copy.deepcopy(result)
+
+    def _forget(self, key: str, future: asyncio.Future) -> None:
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+            del self._waiters[key]
+
+    def __len__(self) -> int:
+        return len(self._inflight)
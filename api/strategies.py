@@ -0,0 +1,106 @@
+"""
+Staggered racing of the alternative ways the fallback API can look up the same item.
+"""
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .metrics import FALLBACK_STRATEGY_WINS
+
+Strategy = Callable[[], Awaitable[Any]]
+
+
+def id_format(item_id: Optional[str]) -> str:
+    """Classifies an ID as 'numeric' (e.g. '1234567') or 'token' (e.g. 'ABmPzRYz')."""
+    return "numeric" if item_id and item_id.isdigit() else "token"
+
+
+def succeeded(response: Any) -> bool:
+    """Whether a fallback API response holds the item."""
+    return bool(response) and isinstance(response, dict) and bool(response.get('success'))
+
+
+class StrategyRace:
+    """
+    Runs the lookup strategies of one kind of item (e.g. by `link`, then by `id`) staggered.
+
+    The first strategy starts at once; each next one starts when the previous ones came back
+    without the item, or after `stagger` seconds without an answer. The first successful
+    response wins and the strategies still running are cancelled. Wins are remembered per
+    ID format, and the strategy that usually wins for a format is started first next time.
+    """
+
+    def __init__(self, kind: str, stagger: float = 0.3, window: int = 100):
+        """
+        Args:
+            kind (str): The item kind, e.g. 'album'; labels the metrics.
+            stagger (float): Seconds to wait for a strategy before starting the next one (0 starts all at once).
+            window (int): Number of recent wins per ID format the order is learned from.
+        """
+        self.kind = kind
+        self.stagger = stagger
+        self.window = window
+        self._wins: Dict[str, deque] = {}
+
+    def order(self, fmt: str, names: List[str]) -> List[str]:
+        """Orders strategy names by recent wins for the ID format, keeping the given order on ties."""
+        wins = self._wins.get(fmt)
+        if not wins:
+            return list(names)
+        return sorted(names, key=lambda name: -wins.count(name))
+
+    async def run(self, item_id: Optional[str], strategies: List[Tuple[str, Strategy]]) -> Optional[Any]:
+        """
+        Races the strategies for an item.
+
+        Args:
+            item_id (Optional[str]): The item's ID, whose format selects the learned order.
+            strategies (List[Tuple[str, Strategy]]): Named strategies in their default order.
+
+        Returns:
+            Optional[Any]: The first successful response, else the last response of the
+            default order that came back (as the sequential lookups returned), else None.
+        """
+        fmt = id_format(item_id)
+        named = dict(strategies)
+        pending = [(name, named[name]) for name in self.order(fmt, [name for name, _ in strategies])]
+        default_rank = {name: rank for rank, (name, _) in enumerate(strategies)}
+        running: Dict[asyncio.Future, str] = {}
+        fallback: Tuple[int, Any] = (-1, None)
+
+        try:
+            while pending or running:
+                if pending:
+                    name, strategy = pending.pop(0)
+                    running[asyncio.ensure_future(strategy())] = name
+                    if pending and not self.stagger:
+                        continue
+                done, _ = await asyncio.wait(
+                    running, timeout=self.stagger if pending else None, return_when=asyncio.FIRST_COMPLETED
+                )
+
+                for task in done:
+                    name = running.pop(task)
+                    try:
+                        response = task.result()
+                    except Exception:
+                        continue
+                    if succeeded(response):
+                        self._win(fmt, name)
+                        return response
+                    if response is not None and default_rank[name] > fallback[0]:
+                        fallback = (default_rank[name], response)
+            return fallback[1]
+        finally:
+            for task in running:
+                task.cancel()
+
+    def _win(self, fmt: str, name: str) -> None:
+        wins = self._wins.get(fmt)
+        if wins is None:
+            wins = self._wins[fmt] = deque(maxlen=self.window)
+        wins.append(name)
+        FALLBACK_STRATEGY_WINS.labels(self.kind, fmt, name).inc()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {fmt: {name: wins.count(name) for name in set(wins)} for fmt, wins in self._wins.items()}
@@ -0,0 +1,3 @@
+"""
+Offline benchmarks of the bot: a local JioSaavn stand-in and a load runner (the fake Telegram client is in `tests.fakes`).
+"""
@@ -0,0 +1,100 @@
+"""
+Micro-benchmarks of decoding upstream responses: time and allocations per response.
+
+Usage:
+    python -m benchmarks.decode
+    python -m benchmarks.decode --number 500 --json decode.json
+
+Each recorded `api/examples` response is decoded the way `Jiosaavn._fetch` used to (text,
+two stripped HTML checks, `json.loads`) and the way it does now (HTML sniffed from the first
+bytes, `api.codec.loads` on the bytes), with the standard library and, when installed, orjson.
+"""
+import json
+import timeit
+import argparse
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from api import codec
+
+EXAMPLES = Path(__file__).resolve().parent.parent / "api" / "examples"
+PAYLOADS = ("get_artist_response", "get_playlist_response", "search_response", "get_song_response")
+
+
+def text_path(body: bytes) -> Any:
+    """The previous decoding: the body as text, checked for HTML twice, then parsed."""
+    text = body.decode("utf-8")
+    if text.strip().startswith('<!DOCTYPE') or text.strip().startswith('<html'):
+        return None
+    return json.loads(text)
+
+
+def bytes_path(loads: Callable[[bytes], Any]) -> Callable[[bytes], Any]:
+    """The current decoding with a given parser: HTML sniffed from the first bytes, then parsed."""
+    def decode(body: bytes) -> Any:
+        if codec.looks_like_html(body):
+            return None
+        return loads(body)
+    return decode
+
+
+def decoders() -> List[Tuple[str, Callable[[bytes], Any]]]:
+    paths = [("text + json", text_path), ("bytes + json", bytes_path(json.loads))]
+    if codec.orjson:
+        paths.append(("bytes + orjson", bytes_path(codec.orjson.loads)))
+    return paths
+
+
+def allocations(decode: Callable[[bytes], Any], body: bytes) -> Tuple[int, int]:
+    """Peak bytes allocated while decoding, and bytes still held by the result."""
+    tracemalloc.start()
+    result = decode(body)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak, retained
+
+
+def measure(payload: str, body: bytes, name: str, decode: Callable[[bytes], Any], number: int) -> Dict[str, Any]:
+    seconds = min(timeit.repeat(lambda: decode(body), number=number, repeat=3))
+    peak, retained = allocations(decode, body)
+    return {
+        "payload": payload,
+        "size_kb": round(len(body) / 1024, 1),
+        "decoder": name,
+        "decode_us": round(seconds / number * 1e6, 1),
+        "peak_kb": round(peak / 1024, 1),
+        "retained_kb": round(retained / 1024, 1),
+    }
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--number", type=int, default=200, help="decodes timed per payload and decoder")
+    parser.add_argument("--json", metavar="PATH", help="also write the results as JSON")
+    args = parser.parse_args(argv)
+
+    results = []
+    for payload in PAYLOADS:
+        body = (EXAMPLES / f"{payload}.json").read_bytes()
+        baseline = None
+        for name, decode in decoders():
+            result = measure(payload, body, name, decode, args.number)
+            baseline = baseline or result["decode_us"]
+            result["speedup"] = round(baseline / result["decode_us"], 2) if result["decode_us"] else None
+            results.append(result)
+
+    print(f"{'payload':<24} {'KB':>7} {'decoder':<16} {'decode µs':>10} {'peak KB':>9} {'retained KB':>12} {'speedup':>8}")
+    for result in results:
+        print(
+            f"{result['payload']:<24} {result['size_kb']:>7.1f} {result['decoder']:<16} {result['decode_us']:>10.1f} "
+            f"{result['peak_kb']:>9.1f} {result['retained_kb']:>12.1f} {result['speedup']:>7}x"
+        )
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump({"config": {**vars(args), "backend": codec.BACKEND}, "results": results}, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Measures event-loop lag while the benchmark scenarios run, with each logging setup.
+
+Usage:
+    python -m benchmarks.loop_lag --scenario download --requests 200 --fallback
+    python -m benchmarks.loop_lag --logging sync --json before.json -- --scenario album --requests 20
+
+A monitor task sleeps `--interval` ms in a loop and records how late it wakes up; that delay is
+time the loop spent busy in callbacks (formatting, disk writes, parsing) instead of serving
+other requests. The `sync` setup attaches the handlers of `logging.conf` to the root logger as
+the bot did before (every record is formatted and written on the loop); the `queue` setup is
+`jiosaavn.logs.setup_logging` with the `LOG_*` settings. Options not listed here are passed to
+`benchmarks.run`. Logs are written to a temporary directory, which is removed afterwards.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import socket
+import asyncio
+import logging
+import argparse
+import tempfile
+import subprocess
+import logging.config
+import logging.handlers
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from benchmarks import run
+from benchmarks.run import percentile
+
+LOGGING_CONF = Path(__file__).resolve().parent.parent / "logging.conf"
+MODES = ("sync", "queue")
+
+
+async def monitor(samples: List[float], interval: float):
+    """Records how many seconds past `interval` every wake-up of the loop comes."""
+    while True:
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(time.perf_counter() - started - interval)
+
+
+async def measure(run_args: argparse.Namespace, interval: float) -> Dict[str, Any]:
+    samples: List[float] = []
+    task = asyncio.create_task(monitor(samples, interval))
+    try:
+        report = await run.run(run_args)
+    finally:
+        task.cancel()
+    lag = sorted(samples)
+    return {
+        **{f"lag_p{pct}_ms": round(percentile(lag, pct) * 1000, 2) for pct in run.PERCENTILES},
+        "lag_max_ms": round(lag[-1] * 1000, 2) if lag else 0.0,
+        "wakeups": len(lag),
+        "req_per_s": {name: result["req_per_s"] for name, result in report["scenarios"].items()},
+    }
+
+
+def configure(mode: str, level: str):
+    """Sets up one logging mode in the current directory; returns the queue listener, if any."""
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+
+    listener = None
+    if mode == "sync":
+        logging.config.fileConfig(LOGGING_CONF, disable_existing_loggers=False)
+    else:
+        from jiosaavn.logs import setup_logging
+        from jiosaavn.config.settings import LOG_QUEUE_SIZE, LOG_RATE_LIMIT, LOG_SAMPLE_EVERY, LOG_HOT_LOGGERS
+        listener = setup_logging(
+            str(LOGGING_CONF),
+            queue_size=LOG_QUEUE_SIZE,
+            rate_limit=LOG_RATE_LIMIT,
+            sample_every=LOG_SAMPLE_EVERY,
+            hot_loggers=LOG_HOT_LOGGERS
+        )
+    root.setLevel(level)
+    logging.getLogger("pyrogram").setLevel(logging.WARNING)
+
+    # Console output goes to a file too, so that it neither floods the report nor costs nothing
+    handlers = listener.handlers if listener else root.handlers
+    for handler in handlers:
+        if type(handler) is logging.StreamHandler:
+            handler.setStream(open("console.log", "w", encoding="utf-8"))
+    return listener
+
+
+def reset(listener: Optional[logging.handlers.QueueListener]):
+    if listener:
+        listener.stop()
+    handlers = list(listener.handlers) if listener else []
+    root = logging.getLogger()
+    for handler in handlers + list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    for logger in logging.Logger.manager.loggerDict.values():
+        if isinstance(logger, logging.Logger):
+            logger.filters.clear()
+
+
+def dropped_records() -> int:
+    from jiosaavn.metrics import LOG_RECORDS_DROPPED
+    return int(sum(
+        sample.value for metric in LOG_RECORDS_DROPPED.collect() for sample in metric.samples
+        if sample.name.endswith("_total")
+    ))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_mode(mode: str, args: argparse.Namespace, run_argv: List[str]) -> Dict[str, Any]:
+    """Runs the scenarios with one logging setup, in this process."""
+    # The settings are read before the stand-in starts, so it is given a port known in advance
+    port = free_port()
+    os.environ["HOST"], os.environ["PORT"] = "127.0.0.1", str(port)
+    run_args = run.parse_args(run_argv + ["--port", str(port)])
+
+    cwd = os.getcwd()
+    workdir = tempfile.mkdtemp(prefix=f"loop-lag-{mode}-")
+    os.chdir(workdir)
+    listener = configure(mode, args.level.upper())
+    try:
+        print(f"── logging: {mode}", flush=True)
+        result = asyncio.run(measure(run_args, args.interval / 1000))
+    finally:
+        reset(listener)
+        os.chdir(cwd)
+    result["log_lines"] = sum(
+        sum(1 for _ in open(path, encoding="utf-8", errors="replace"))
+        for path in Path(workdir).iterdir() if path.is_file()
+    )
+    result["dropped_records"] = dropped_records()
+    shutil.rmtree(workdir, ignore_errors=True)
+    return result
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--logging", choices=MODES + ("both",), default="both", help="logging setup to measure")
+    parser.add_argument("--interval", type=float, default=5.0, help="ms the monitor sleeps between wake-ups")
+    parser.add_argument("--level", default="INFO", help="root log level (the bot runs at INFO)")
+    parser.add_argument("--json", metavar="PATH", help="also write the results as JSON")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args, rest = parser.parse_known_args(argv)
+    run_argv = [arg for arg in rest if arg != "--"]
+
+    if args.logging != "both":
+        results = {args.logging: measure_mode(args.logging, args, run_argv)}
+    else:
+        # Every setup runs in a fresh process, so neither inherits the other's imports, caches or memory
+        results = {}
+        with tempfile.TemporaryDirectory() as tmp:
+            for mode in MODES:
+                path = os.path.join(tmp, f"{mode}.json")
+                subprocess.run(
+                    [sys.executable, "-m", "benchmarks.loop_lag", "--logging", mode, "--interval", str(args.interval),
+                     "--level", args.level, "--json", path, "--child", "--", *run_argv],
+                    check=True
+                )
+                with open(path, encoding="utf-8") as file:
+                    results[mode] = json.load(file)["results"][mode]
+
+    if args.child:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump({"results": results}, file)
+        return
+
+    print(f"\n{'logging':<8} {'lag p50':>9} {'p90':>8} {'p95':>8} {'p99':>8} {'max':>9} {'log lines':>10} {'dropped':>8}  req/s")
+    for mode, result in results.items():
+        print(
+            f"{mode:<8} {result['lag_p50_ms']:>7.2f}ms {result['lag_p90_ms']:>6.2f}ms {result['lag_p95_ms']:>6.2f}ms "
+            f"{result['lag_p99_ms']:>6.2f}ms {result['lag_max_ms']:>7.2f}ms {result['log_lines']:>10,} "
+            f"{result['dropped_records']:>8,}  {result['req_per_s']}"
+        )
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump({"config": {**vars(args), "run": run_argv}, "results": results}, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
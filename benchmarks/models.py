@@ -0,0 +1,90 @@
+"""
+Micro-benchmarks of the `api.models` records: parse cost and memory per object.
+
+Usage:
+    python -m benchmarks.models
+    python -m benchmarks.models --number 5000 --json models.json
+
+Each case converts a recorded response (or a stand-in fallback response) into its record.
+Memory compares what stays alive per object: the decoded upstream JSON tree versus the record
+built from it, both measured with `tracemalloc` over `--copies` instances.
+"""
+import gc
+import json
+import timeit
+import argparse
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+from api.models import Artist, Collection, Song
+from benchmarks.stand_in import StandIn, load_example
+
+
+def cases() -> List[Tuple[str, Any, Callable[[Any], Any]]]:
+    """The benchmarked conversions: a name, the decoded response and the function converting it."""
+    stand_in = StandIn(album_size=50)
+    stand_in.base_url = "http://127.0.0.1:8080"
+    fallback_album = {
+        **stand_in.official_collection("bench", "album"),
+        "list": [stand_in.fallback_song(f"bench-{i}") for i in range(50)],
+    }
+    return [
+        ("song (official)", load_example("get_song_response"), Song.from_response),
+        ("song (fallback)", {"success": True, "data": [stand_in.fallback_song("bench")]}, Song.from_response),
+        ("playlist, 10 songs (official)", load_example("get_playlist_response"), Collection.from_api),
+        ("album, 50 songs (official)", stand_in.official_collection("bench", "album"), Collection.from_api),
+        ("album, 50 songs (fallback)", fallback_album, Collection.from_api),
+        ("artist (official)", load_example("get_artist_response"), Artist.from_api),
+    ]
+
+
+def retained_bytes(build: Callable[[], Any], copies: int) -> float:
+    """Average bytes still allocated per object after building `copies` of them."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [build() for _ in range(copies)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return (after - before) / copies
+
+
+def measure(name: str, response: Any, convert: Callable[[Any], Any], number: int, copies: int) -> Dict[str, Any]:
+    payload = json.dumps(response)
+    # The conversions do not modify the response, so the same decoded one is reused
+    seconds = min(timeit.repeat(lambda: convert(response), number=number, repeat=3))
+    decode = min(timeit.repeat(lambda: json.loads(payload), number=number, repeat=3))
+    raw = retained_bytes(lambda: json.loads(payload), copies)
+    record = retained_bytes(lambda: convert(json.loads(payload)), copies)
+    return {
+        "case": name,
+        "parse_us": round(seconds / number * 1e6, 2),
+        "decode_us": round(decode / number * 1e6, 2),
+        "raw_bytes": round(raw),
+        "record_bytes": round(record),
+        "ratio": round(raw / record, 1) if record else None,
+    }
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--number", type=int, default=2000, help="conversions timed per case")
+    parser.add_argument("--copies", type=int, default=200, help="objects kept alive to measure memory")
+    parser.add_argument("--json", metavar="PATH", help="also write the results as JSON")
+    args = parser.parse_args(argv)
+
+    results = [measure(name, response, convert, args.number, args.copies) for name, response, convert in cases()]
+    print(f"{'case':<32} {'parse µs':>10} {'decode µs':>10} {'raw bytes':>11} {'record bytes':>13} {'ratio':>7}")
+    for result in results:
+        print(
+            f"{result['case']:<32} {result['parse_us']:>10.1f} {result['decode_us']:>10.1f} "
+            f"{result['raw_bytes']:>11,} {result['record_bytes']:>13,} {result['ratio']:>6}x"
+        )
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump({"config": vars(args), "results": results}, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""
+Drives the bot's handlers against the local stand-ins and reports throughput and latency.
+
+Usage:
+    python -m benchmarks.run --scenario all --requests 200 --concurrency 20
+    python -m benchmarks.run --scenario download --distinct 10 --json before.json
+
+Every scenario starts from an empty database and response cache. Requests are issued by
+`--concurrency` workers until `--requests` have completed; `--distinct` controls how many
+different songs, albums or queries they ask for, and so how warm the caches get.
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+import itertools
+import resource
+from typing import Any, Awaitable, Callable, Dict, List
+
+from benchmarks.stand_in import StandIn
+from tests.fakes import FakeCallbackQuery, FakeClient, FakeDatabase
+
+logger = logging.getLogger("benchmarks")
+
+SCENARIOS = ("search", "song", "download", "album")
+PERCENTILES = (50, 90, 95, 99)
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of already sorted samples."""
+    if not samples:
+        return 0.0
+    rank = max(0, min(len(samples) - 1, round(pct / 100 * len(samples) + 0.5) - 1))
+    return samples[rank]
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far, in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+async def measure(action: Callable[[int], Awaitable[Any]], requests: int, concurrency: int) -> Dict[str, Any]:
+    """
+    Runs `action(i)` for i in range(requests) on `concurrency` workers.
+
+    Returns:
+        Dict[str, Any]: Request and error counts, req/s and latency percentiles in milliseconds.
+    """
+    latencies: List[float] = []
+    errors = 0
+    numbers = itertools.count()
+
+    async def worker():
+        nonlocal errors
+        while (i := next(numbers)) < requests:
+            started = time.perf_counter()
+            try:
+                await action(i)
+            except Exception as e:
+                errors += 1
+                logger.debug(f"Request {i} failed: {e!r}")
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    result = {
+        "requests": requests,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "req_per_s": round(requests / elapsed, 2) if elapsed else 0.0,
+    }
+    for pct in PERCENTILES:
+        result[f"p{pct}_ms"] = round(percentile(latencies, pct) * 1000, 2)
+    result["max_ms"] = round(latencies[-1] * 1000, 2) if latencies else 0.0
+    return result
+
+
+def scenario_action(name: str, client: FakeClient, args: argparse.Namespace) -> Callable[[int], Awaitable[Any]]:
+    """Builds the coroutine function issuing request `i` of a scenario through the real handler."""
+    from jiosaavn.plugins.search_handler import search
+    from jiosaavn.plugins.songs_handler import handle_song_callback
+    from jiosaavn.plugins.download_handler import download, download_tool
+
+    def user_id(i: int) -> int:
+        return 1000 + i % args.users
+
+    def item_id(i: int) -> str:
+        return f"bench{i % args.distinct if args.distinct else i}"
+
+    async def run_search(i: int):
+        message = client.new_message(user_id(i), f"stand-in query {item_id(i)}")
+        await search(client, message)
+
+    async def run_song(i: int):
+        message = client.new_message(user_id(i), "results")
+        await handle_song_callback(client, FakeCallbackQuery(client, message, f"song#{item_id(i)}"))
+
+    async def run_download(i: int):
+        message = client.new_message(user_id(i), f"https://www.jiosaavn.com/song/stand-in/{item_id(i)}")
+        status = client.new_message(user_id(i), "**Processing...**", reply_to_message=message)
+        await download_tool(client, message, status, item_id(i))
+
+    async def run_album(i: int):
+        message = client.new_message(user_id(i), "album")
+        await download(client, FakeCallbackQuery(client, message, f"upload#{item_id(i)}#album"))
+
+    return {"search": run_search, "song": run_song, "download": run_download, "album": run_album}[name]
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    stand_in = StandIn(
+        latency=args.api_latency / 1000,
+        audio_size=args.audio_kb * 1024,
+        album_size=args.album_size,
+        fallback_only=args.fallback,
+        official_latency=args.official_latency / 1000,
+        official_down=args.official_down,
+        port=args.port,
+    )
+    base_url = await stand_in.start()
+
+    # The song view pings the bot's own web page; point it at the stand-in before the settings load
+    os.environ["HOST"], os.environ["PORT"] = stand_in.host, str(stand_in.port)
+    from api.cache import MemoryCache
+    from api.jiosaavn import Jiosaavn, JioSaavnFallback
+    from api.session import open_session, close_session
+    from jiosaavn.config.settings import (
+        HTTP_POOL_LIMIT, HTTP_LIMIT_PER_HOST, HTTP_DNS_CACHE_TTL, HTTP_KEEPALIVE_TIMEOUT, RESPONSE_CACHE_MAX_MB,
+        HEDGE_REQUESTS, HEDGE_PERCENTILE, HEDGE_MIN_DELAY, HEDGE_MAX_DELAY,
+        CIRCUIT_BREAKERS, CIRCUIT_FAILURE_RATIO, CIRCUIT_MIN_CALLS, CIRCUIT_SLOW_CALL, CIRCUIT_OPEN_SECONDS,
+        FALLBACK_STAGGER
+    )
+
+    Jiosaavn.BASE_URL = base_url
+    Jiosaavn.API_URL = f"{base_url}/api.php"
+    JioSaavnFallback.BASE_URL = base_url
+    Jiosaavn.configure_hedging(HEDGE_REQUESTS, HEDGE_PERCENTILE, HEDGE_MIN_DELAY, HEDGE_MAX_DELAY)
+    Jiosaavn.configure_breakers(
+        CIRCUIT_BREAKERS, CIRCUIT_FAILURE_RATIO, CIRCUIT_MIN_CALLS, CIRCUIT_SLOW_CALL, CIRCUIT_OPEN_SECONDS
+    )
+    JioSaavnFallback.configure_strategies(FALLBACK_STAGGER)
+    await open_session(
+        limit=HTTP_POOL_LIMIT,
+        limit_per_host=HTTP_LIMIT_PER_HOST,
+        ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+        keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT
+    )
+
+    report: Dict[str, Any] = {"config": vars(args), "scenarios": {}}
+    try:
+        for name in (SCENARIOS if args.scenario == "all" else (args.scenario,)):
+            Jiosaavn.configure_cache(None if args.no_cache else MemoryCache(max_bytes=RESPONSE_CACHE_MAX_MB * 1024 * 1024))
+            client = FakeClient(FakeDatabase(search_type=args.search_type), upload_latency=args.upload_latency / 1000)
+            upstream_before = dict(stand_in.hits)
+
+            result = await measure(scenario_action(name, client, args), args.requests, args.concurrency)
+            result["peak_rss_mb"] = round(peak_rss_mb(), 1)
+            result["uploaded_mb"] = round(client.uploaded_bytes / 1024 / 1024, 1)
+            result["telegram_calls"] = dict(sorted(client.calls.items()))
+            result["upstream_calls"] = {
+                key: count - upstream_before.get(key, 0)
+                for key, count in sorted(stand_in.hits.items())
+                if count - upstream_before.get(key, 0)
+            }
+            result["circuits"] = {name: breaker["state"] for name, breaker in Jiosaavn.breakers.stats().items()}
+            report["scenarios"][name] = result
+            print_result(name, result)
+    finally:
+        await close_session()
+        await stand_in.stop()
+    return report
+
+
+def print_result(name: str, result: Dict[str, Any]):
+    latency = "  ".join(f"p{pct} {result[f'p{pct}_ms']:.1f}" for pct in PERCENTILES)
+    print(
+        f"{name:<9} {result['requests']:>6} req  {result['errors']:>3} err  {result['req_per_s']:>9.1f} req/s  "
+        f"{latency}  max {result['max_ms']:.1f} ms  peak RSS {result['peak_rss_mb']:.1f} MB"
+    )
+    print(f"{'':<9} telegram {result['telegram_calls']}")
+    print(f"{'':<9} upstream {result['upstream_calls']}")
+    print(f"{'':<9} circuits {result['circuits']}")
+
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--scenario", choices=SCENARIOS + ("all",), default="all")
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=20, help="requests in flight at once")
+    parser.add_argument("--distinct", type=int, default=0, help="different songs/albums/queries asked for (0: all different)")
+    parser.add_argument("--users", type=int, default=50, help="different users sending requests")
+    parser.add_argument("--search-type", default="songs", choices=("all", "songs", "albums", "artists", "playlists"))
+    parser.add_argument("--album-size", type=int, default=20, help="songs in every album")
+    parser.add_argument("--audio-kb", type=int, default=4096, help="size of every audio file")
+    parser.add_argument("--api-latency", type=float, default=0.0, help="ms added to every upstream response")
+    parser.add_argument("--official-latency", type=float, default=0.0, help="extra ms the official API takes to answer lookups")
+    parser.add_argument("--upload-latency", type=float, default=0.0, help="ms added to every Telegram upload")
+    parser.add_argument("--fallback", action="store_true", help="resolve songs and albums through the fallback API")
+    parser.add_argument("--official-down", action="store_true", help="answer every api.php call with an HTML block page")
+    parser.add_argument("--no-cache", action="store_true", help="disable the JioSaavn response cache")
+    parser.add_argument("--json", metavar="PATH", help="also write the report as JSON, to compare runs")
+    parser.add_argument("--port", type=int, default=0, help="port of the stand-in (0 picks a free one)")
+    parser.add_argument("--log-level", default="WARNING")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] = None):
+    args = parse_args(argv)
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    report = asyncio.run(run(args))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
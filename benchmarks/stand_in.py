@@ -0,0 +1,265 @@
+"""
+Local stand-in for the JioSaavn API, the fallback API and the JioSaavn CDN.
+
+`api.php` answers are the recorded responses in `api/examples`, with IDs, images and media
+URLs rewritten to point back at the stand-in. Fallback answers follow the shapes described
+in `jiosaavn-api.json`. Audio is a synthetic MP3 payload of a configurable size.
+"""
+import copy
+import json
+import asyncio
+import logging
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+EXAMPLES_DIR = Path(__file__).resolve().parent.parent / "api" / "examples"
+
+# One MPEG-1 Layer III frame header (128 kbps, 44.1 kHz); frames of that format are 417 bytes
+MP3_FRAME = b"\xff\xfb\x90\x64" + bytes(413)
+# Smallest well-formed JPEG markers, enough for anything that only moves the bytes around
+JPEG = b"\xff\xd8\xff\xe0\x00\x10JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00\xff\xd9"
+QUALITIES = ("12kbps", "48kbps", "96kbps", "160kbps", "320kbps")
+
+
+def load_example(name: str) -> Any:
+    """Reads a recorded API response from `api/examples`."""
+    with open(EXAMPLES_DIR / f"{name}.json", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def mp3_payload(size: int) -> bytes:
+    """Builds a synthetic MP3 body of about `size` bytes out of repeated frames."""
+    return MP3_FRAME * max(1, size // len(MP3_FRAME))
+
+
+class StandIn:
+    """
+    aiohttp application impersonating every upstream the bot talks to.
+
+    Both the official and the fallback base URL of the API clients are pointed at it,
+    so the whole request path (shared session, coalescing, caching, JSON decoding,
+    streaming downloads) runs unchanged against loopback.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        audio_size: int = 4 * 1024 * 1024,
+        album_size: int = 20,
+        fallback_only: bool = False,
+        official_latency: float = 0.0,
+        official_down: bool = False
+    ):
+        """
+        Args:
+            host (str): Interface to listen on.
+            port (int): Port to listen on (0 picks a free one).
+            latency (float): Seconds added before answering every API and media request.
+            audio_size (int): Size in bytes of the served audio files.
+            album_size (int): Number of songs in every album or playlist.
+            fallback_only (bool): Answer `webapi.get` with empty results, so songs and
+                collections are resolved through the fallback API.
+            official_latency (float): Extra seconds `webapi.get` takes, to exercise hedged lookups.
+            official_down (bool): Answer every `api.php` call with an HTML block page, to exercise
+                the circuit breakers.
+        """
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.album_size = album_size
+        self.fallback_only = fallback_only
+        self.official_latency = official_latency
+        self.official_down = official_down
+        self.audio = mp3_payload(audio_size)
+        self.hits: Counter = Counter()
+        self.base_url = ""
+
+        self._song = load_example("get_song_response")["songs"][0]
+        self._collection = load_example("get_playlist_or_album_response")
+        self._search = load_example("search_response")
+        self._search_all = load_example("search_all_types_response")
+        self._lyrics = load_example("get_song_lyrics_response")
+        self._runner: Optional[web.AppRunner] = None
+
+    async def start(self) -> str:
+        """
+        Starts serving.
+
+        Returns:
+            str: The base URL of the stand-in.
+        """
+        app = web.Application(middlewares=[self._delay])
+        app.router.add_get("/", self.home)
+        app.router.add_get("/api.php", self.api)
+        app.router.add_get("/api/songs", self.fallback_songs)
+        app.router.add_get("/api/albums", self.fallback_collection)
+        app.router.add_get("/api/playlists", self.fallback_collection)
+        app.router.add_get("/audio/{name}", self.media_audio)
+        app.router.add_get("/image/{name}", self.media_image)
+
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        self.base_url = f"http://{self.host}:{self.port}"
+        logger.info(f"🧪 JioSaavn stand-in listening on {self.base_url}")
+        return self.base_url
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    @web.middleware
+    async def _delay(self, request: web.Request, handler):
+        # Counted per API call or route, e.g. `webapi.get` or `/audio/{name}`
+        resource = request.match_info.route.resource
+        route = resource.canonical if resource else request.path
+        self.hits[request.query.get("__call", route) if route == "/api.php" else route] += 1
+        if self.latency and request.path != "/":
+            await asyncio.sleep(self.latency)
+        return await handler(request)
+
+    async def home(self, request: web.Request) -> web.Response:
+        # The bot pings its own web page after showing a song; answer like the dashboard does
+        return web.Response(text="<!DOCTYPE html><html><body>stand-in</body></html>", content_type="text/html")
+
+    async def api(self, request: web.Request) -> web.Response:
+        query = request.query
+        call = query.get("__call")
+        if self.official_down:
+            return web.Response(text="<!DOCTYPE html><html><body>Access blocked</body></html>", content_type="text/html")
+        if call == "webapi.get":
+            token = query.get("token", "")
+            item_type = query.get("type")
+            if self.official_latency:
+                await asyncio.sleep(self.official_latency)
+            if self.fallback_only:
+                return web.json_response({})
+            if item_type == "song":
+                return web.json_response({"songs": [self.official_song(token)], "modules": None})
+            if item_type in ("album", "playlist"):
+                return web.json_response(self.official_collection(token, item_type))
+            return web.json_response({})
+        if call and call.startswith("search."):
+            return web.json_response(self._search)
+        if call == "autocomplete.get":
+            return web.json_response(self._search_all)
+        if call == "song.generateAuthToken":
+            name = query.get("url", "song")
+            return web.json_response({
+                "auth_url": f"{self.base_url}/audio/{name}_{query.get('bitrate', 160)}.mp4",
+                "type": "mp4",
+                "status": "success",
+            })
+        if call == "lyrics.getLyrics":
+            return web.json_response(self._lyrics)
+        return web.json_response({"error": {"code": "INVALID_CALL", "msg": f"Unknown call {call}"}})
+
+    async def fallback_songs(self, request: web.Request) -> web.Response:
+        song_id = request.query.get("ids") or request.query.get("link", "song").rstrip("/").rsplit("/", 1)[-1]
+        return web.json_response({"success": True, "data": [self.fallback_song(song_id)]})
+
+    async def fallback_collection(self, request: web.Request) -> web.Response:
+        item_id = request.query.get("id") or request.query.get("link", "collection").rstrip("/").rsplit("/", 1)[-1]
+        item_type = "album" if request.path.endswith("albums") else "playlist"
+        songs = [self.fallback_song(f"{item_id}-{i}") for i in range(self.album_size)]
+        return web.json_response({
+            "success": True,
+            "data": {
+                "id": item_id,
+                "name": self._collection["title"],
+                "description": self._collection.get("header_desc", ""),
+                "year": int(self._collection.get("year") or 0),
+                "type": item_type,
+                "playCount": None,
+                "language": self._collection.get("language", ""),
+                "explicitContent": False,
+                "artists": {"primary": [], "featured": [], "all": []},
+                "songCount": len(songs),
+                "url": f"https://www.jiosaavn.com/{item_type}/stand-in/{item_id}",
+                "image": self.fallback_images(item_id),
+                "songs": songs,
+            },
+        })
+
+    async def media_audio(self, request: web.Request) -> web.Response:
+        return web.Response(body=self.audio, content_type="audio/mpeg")
+
+    async def media_image(self, request: web.Request) -> web.Response:
+        return web.Response(body=JPEG, content_type="image/jpeg")
+
+    def official_song(self, song_id: str) -> Dict[str, Any]:
+        """The recorded `webapi.get` song, renamed to `song_id` and served from the stand-in."""
+        song = copy.deepcopy(self._song)
+        song["id"] = song_id
+        song["perma_url"] = f"https://www.jiosaavn.com/song/stand-in/{song_id}"
+        song["image"] = f"{self.base_url}/image/{song_id}-150x150.jpg"
+        song["more_info"]["encrypted_media_url"] = song_id
+        return song
+
+    def official_collection(self, token: str, item_type: str) -> Dict[str, Any]:
+        """The recorded `webapi.get` album, holding `album_size` songs of its own."""
+        collection = copy.deepcopy(self._collection)
+        collection.pop("modules", None)
+        collection["type"] = item_type
+        collection["perma_url"] = f"https://www.jiosaavn.com/{item_type}/stand-in/{token}"
+        collection["list"] = [self.official_song(f"{token}-{i}") for i in range(self.album_size)]
+        collection["list_count"] = str(self.album_size)
+        return collection
+
+    def fallback_song(self, song_id: str) -> Dict[str, Any]:
+        """The recorded song in the fallback API song shape."""
+        song = self._song
+        more_info = song["more_info"]
+        artists = [
+            {
+                "id": artist["id"],
+                "name": artist["name"],
+                "role": artist["role"],
+                "type": artist["type"],
+                "image": [],
+                "url": artist["perma_url"],
+            }
+            for artist in more_info["artistMap"]["primary_artists"]
+        ]
+        return {
+            "id": song_id,
+            "name": song["title"],
+            "type": "song",
+            "year": song["year"],
+            "releaseDate": more_info.get("release_date"),
+            "duration": int(more_info.get("duration") or 0),
+            "label": more_info.get("label"),
+            "explicitContent": False,
+            "playCount": int(song.get("play_count") or 0),
+            "language": song["language"],
+            "hasLyrics": more_info.get("has_lyrics") == "true",
+            "lyricsId": None,
+            "url": f"https://www.jiosaavn.com/song/stand-in/{song_id}",
+            "copyright": more_info.get("copyright_text"),
+            "album": {"id": more_info.get("album_id"), "name": more_info.get("album"), "url": more_info.get("album_url")},
+            "artists": {"primary": artists, "featured": [], "all": artists},
+            "image": self.fallback_images(song_id),
+            "downloadUrl": self.fallback_download_urls(song_id),
+        }
+
+    def fallback_images(self, item_id: str) -> List[Dict[str, str]]:
+        return [
+            {"quality": size, "url": f"{self.base_url}/image/{item_id}-{size}.jpg"}
+            for size in ("50x50", "150x150", "500x500")
+        ]
+
+    def fallback_download_urls(self, song_id: str) -> List[Dict[str, str]]:
+        return [
+            {"quality": quality, "url": f"{self.base_url}/audio/{song_id}_{quality}.mp4"}
+            for quality in QUALITIES
+        ]
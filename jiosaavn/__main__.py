@@ -1,5 +1,4 @@
 import logging
-import logging.config
 
 import uvloop
 uvloop.install()
@@ -9,14 +8,25 @@ from dotenv import load_dotenv
 
 
 def main():
-    # Get logging configurations
-    logging.config.fileConfig('logging.conf')
+    load_dotenv()
+
+    # Get logging configurations; handlers run on a separate thread
+    settings = importlib.import_module("jiosaavn.config.settings")
+    listener = importlib.import_module("jiosaavn.logs").setup_logging(
+        'logging.conf',
+        queue_size=settings.LOG_QUEUE_SIZE,
+        rate_limit=settings.LOG_RATE_LIMIT,
+        sample_every=settings.LOG_SAMPLE_EVERY,
+        hot_loggers=settings.LOG_HOT_LOGGERS
+    )
     logging.getLogger().setLevel(logging.INFO)
     logging.getLogger("pyrogram").setLevel(logging.WARNING)
 
-    load_dotenv()
-    bot = importlib.import_module("jiosaavn.bot").Bot
-    bot().run()
+    try:
+        bot = importlib.import_module("jiosaavn.bot").Bot
+        bot().run()
+    finally:
+        listener.stop()
 
 
 if __name__ == "__main__" :
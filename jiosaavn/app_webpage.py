@@ -1,9 +1,11 @@
-from aiohttp.web import Application, AppRunner, TCPSite, RouteTableDef, Request, json_response, FileResponse
+from aiohttp.web import Application, AppRunner, TCPSite, RouteTableDef, Request, Response, json_response, FileResponse
 import os
 import json
 import datetime
 
 from jiosaavn.config.settings import HOST, PORT
+from jiosaavn.metrics import render_metrics, CONTENT_TYPE_LATEST
+from api.jiosaavn import Jiosaavn, JioSaavnFallback
 
 routes = RouteTableDef()
 
@@ -29,39 +31,20 @@ async def stats_api_handler(request: Request):
         if not bot:
             return json_response({"error": "Bot not available"}, status=503)
         
-        # Get statistics from database
-        total_users = await bot.db.get_total_users()
-        banned_users = await bot.db.get_banned_users_count()
-        active_users = total_users - banned_users
-        
-        # Get today's stats
-        today = datetime.date.today().isoformat()
-        today_users = await bot.db.get_users_by_date(today)
-        
-        # Get quality distribution
-        quality_stats = {
-            "320kbps": await bot.db.get_users_by_quality('320kbps'),
-            "160kbps": await bot.db.get_users_by_quality('160kbps'),
-            "96kbps": await bot.db.get_users_by_quality('96kbps'),
-            "48kbps": await bot.db.get_users_by_quality('48kbps')
-        }
-        
-        # Get type distribution
-        type_stats = {
-            "all": await bot.db.get_users_by_type('all'),
-            "song": await bot.db.get_users_by_type('song')
-        }
+        # Get statistics from the shared, periodically refreshed snapshot
+        snapshot = await bot.db.get_stats_snapshot()
         
         stats = {
             "users": {
-                "total": total_users,
-                "active": active_users,
-                "banned": banned_users,
-                "today": today_users
+                "total": snapshot['total'],
+                "active": snapshot['active'],
+                "banned": snapshot['banned'],
+                "today": snapshot['today']
             },
-            "quality_distribution": quality_stats,
-            "type_distribution": type_stats,
-            "last_updated": datetime.datetime.now().isoformat()
+            "quality_distribution": snapshot['quality'],
+            "type_distribution": snapshot['type'],
+            "user_cache": bot.db.user_cache.stats(),
+            "last_updated": snapshot['updated_at']
         }
         
         return json_response(stats)
@@ -69,6 +52,23 @@ async def stats_api_handler(request: Request):
     except Exception as e:
         return json_response({"error": str(e)}, status=500)
 
+@routes.get("/api/health", allow_head=True)
+async def health_api_handler(request: Request):
+    """ API endpoint for the circuit breakers, hedging and fallback lookup strategies of the upstream endpoints. """
+    breakers = Jiosaavn.breakers.stats()
+    states = {breaker['state'] for breaker in breakers.values()}
+    return json_response({
+        "status": "degraded" if states - {"closed"} else "ok",
+        "breakers": breakers,
+        "hedging": {kind: policy.stats() for kind, policy in Jiosaavn.hedging.items()} if Jiosaavn.hedging else None,
+        "fallback_strategies": {kind: race.stats() for kind, race in JioSaavnFallback.strategies.items()}
+    })
+
+@routes.get("/metrics")
+async def metrics_handler(request: Request):
+    """ Prometheus metrics endpoint. """
+    return Response(body=render_metrics(), headers={"Content-Type": CONTENT_TYPE_LATEST})
+
 @routes.get("/statis/{filename}", allow_head=True)
 @routes.get("/{filename:styles\\.css|script\\.js}", allow_head=True)
 async def static_files_handler(request: Request):
@@ -1,10 +1,29 @@
+import asyncio
+import logging
+
 from .database import Database
-from .config.settings import API_ID, API_HASH, BOT_TOKEN, DATABASE_URL, BOT_COMMANDS, OWNER_ID
+from .config.settings import (
+    API_ID, API_HASH, BOT_TOKEN, DATABASE_URL, BOT_COMMANDS, OWNER_ID, USER_CACHE_SIZE, USER_CACHE_TTL, STATS_CACHE_TTL,
+    COUNTERS_RECONCILE_INTERVAL,
+    HTTP_POOL_LIMIT, HTTP_LIMIT_PER_HOST, HTTP_DNS_CACHE_TTL, HTTP_KEEPALIVE_TIMEOUT,
+    RESPONSE_CACHE_MAX_MB, CACHE_TTL_SEARCH, CACHE_TTL_SONG, CACHE_TTL_COLLECTION,
+    HEDGE_REQUESTS, HEDGE_PERCENTILE, HEDGE_MIN_DELAY, HEDGE_MAX_DELAY,
+    CIRCUIT_BREAKERS, CIRCUIT_FAILURE_RATIO, CIRCUIT_MIN_CALLS, CIRCUIT_SLOW_CALL, CIRCUIT_OPEN_SECONDS,
+    FALLBACK_STAGGER,
+    STORAGE_CHANNEL, PREWARM_INTERVAL, PREWARM_TOP, PREWARM_RATE, PREWARM_QUALITIES
+)
 from .app_webpage import start_web, stop_web
+from .migrations import backfill_file_ids, dedupe_song_ids, reconcile_counters_loop
+from .prewarm import prewarm_loop
+from .metrics import StatsCollector, register_stats, timed_handler
+from api.cache import MemoryCache
+from api.jiosaavn import Jiosaavn, JioSaavnFallback
+from api.session import open_session, close_session
 
 from pyrogram import Client
 from pyrogram.types import BotCommand, BotCommandScopeAllPrivateChats
 
+logger = logging.getLogger(__name__)
 
 class Bot(Client):
 
@@ -20,19 +39,101 @@ class Bot(Client):
                 "root": "jiosaavn/plugins"
             }
         )
-        self.db = Database(DATABASE_URL)
+        self.db = Database(
+            DATABASE_URL,
+            user_cache_size=USER_CACHE_SIZE,
+            user_cache_ttl=USER_CACHE_TTL,
+            stats_cache_ttl=STATS_CACHE_TTL
+        )
+        self.background_tasks = set()
+        Jiosaavn.configure_cache(
+            MemoryCache(max_bytes=RESPONSE_CACHE_MAX_MB * 1024 * 1024) if RESPONSE_CACHE_MAX_MB > 0 else None,
+            ttls={
+                "search": CACHE_TTL_SEARCH,
+                "search_all_types": CACHE_TTL_SEARCH,
+                "song": CACHE_TTL_SONG,
+                "playlist_or_album": CACHE_TTL_COLLECTION,
+                "artist": CACHE_TTL_COLLECTION,
+            }
+        )
+        Jiosaavn.configure_hedging(HEDGE_REQUESTS, HEDGE_PERCENTILE, HEDGE_MIN_DELAY, HEDGE_MAX_DELAY)
+        Jiosaavn.configure_breakers(
+            CIRCUIT_BREAKERS, CIRCUIT_FAILURE_RATIO, CIRCUIT_MIN_CALLS, CIRCUIT_SLOW_CALL, CIRCUIT_OPEN_SECONDS
+        )
+        JioSaavnFallback.configure_strategies(FALLBACK_STAGGER)
+
+        register_stats(StatsCollector(
+            caches={
+                "response": lambda: Jiosaavn.cache.stats() if Jiosaavn.cache else {},
+                "users": self.db.user_cache.stats,
+            },
+            gauges={
+                "jiosaavn_requests_in_flight": (
+                    "Distinct JioSaavn API requests currently in flight.",
+                    lambda: len(Jiosaavn.inflight) + len(JioSaavnFallback.inflight)
+                ),
+            },
+            counters={
+                "jiosaavn_requests_coalesced": (
+                    "JioSaavn API requests that joined an identical one in flight, since startup.",
+                    lambda: Jiosaavn.inflight.coalesced + JioSaavnFallback.inflight.coalesced
+                ),
+            }
+        ))
+
+    def add_handler(self, handler, group: int = 0):
+        # Time every update handler, including those loaded from plugins
+        if asyncio.iscoroutinefunction(handler.callback):
+            handler.callback = timed_handler(handler.callback)
+        return super().add_handler(handler, group)
 
     async def start(self):
+        await open_session(
+            limit=HTTP_POOL_LIMIT,
+            limit_per_host=HTTP_LIMIT_PER_HOST,
+            ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+            keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT
+        )
+        await dedupe_song_ids(self)
+        await self.db.ensure_indexes()
         await super().start()
         self.web_runner = await start_web(self)
         print(f"New session started for {self.me.first_name}({self.me.username})")
         await self.add_commands()
+        self.run_in_background(backfill_file_ids(self), "file_id backfill")
+        self.run_in_background(reconcile_counters_loop(self, COUNTERS_RECONCILE_INTERVAL), "counter reconciliation")
+        if STORAGE_CHANNEL and PREWARM_INTERVAL > 0:
+            self.run_in_background(
+                prewarm_loop(self, PREWARM_INTERVAL, PREWARM_TOP, PREWARM_QUALITIES, PREWARM_RATE),
+                "storage pre-warm"
+            )
 
     async def stop(self):
+        tasks = list(self.background_tasks)
+        for task in tasks:
+            task.cancel()
+        # Let them unwind before the database and the HTTP session they use are closed
+        await asyncio.gather(*tasks, return_exceptions=True)
         await super().stop()
         await stop_web(self.web_runner)
+        await close_session()
         print("Session stopped. Bye!!")
 
+    def run_in_background(self, coro, name: str) -> asyncio.Task:
+        """Runs a maintenance coroutine alongside the bot, logging it if it fails."""
+        async def runner():
+            try:
+                await coro
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Background task '%s' failed: %s", name, e)
+
+        task = asyncio.create_task(runner(), name=name)
+        self.background_tasks.add(task)
+        task.add_done_callback(self.background_tasks.discard)
+        return task
+
     async def add_commands(self):
         commands = [
             BotCommand(command.strip(), description.strip()) for command, description in BOT_COMMANDS
@@ -0,0 +1,173 @@
+"""
+Broadcast engine: rate-governed, concurrent delivery of a message to every user.
+"""
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Awaitable, Callable, Dict, Optional
+
+from pyrogram.errors import FloodWait, UserIsBlocked, InputUserDeactivated
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter shared by all broadcast senders.
+
+    Tokens refill at `rate` per second up to `capacity`. A FloodWait pauses the whole
+    bucket, since Telegram applies it to the bot rather than to a single chat.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Args:
+            rate (float): Messages allowed per second on average.
+            capacity (Optional[float]): Largest burst allowed (defaults to one second worth of tokens).
+        """
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Waits until a message may be sent."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if self._paused_until > now:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def pause(self, seconds: float):
+        """Stops handing out tokens for `seconds`."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = 0
+
+
+async def send_broadcast(
+    client,
+    broadcast: dict,
+    rate: float,
+    workers: int,
+    on_progress: Optional[Callable[[Dict[str, int]], Awaitable]] = None,
+    checkpoint_interval: float = 5.0,
+    max_attempts: int = 3
+) -> Dict[str, int]:
+    """
+    Copies the broadcast message to every user, resuming after each shard's cursor.
+
+    Every shard of the users is read in `_id` order by its own producer, and the users are
+    handed to `workers` concurrent senders, all drawing from one token bucket. Users hit by
+    a FloodWait are retried once it has passed. The shards' cursors are checkpointed to the
+    database every `checkpoint_interval` seconds, each only ever past users whose delivery
+    finished, so an interrupted broadcast resumes without skipping anyone. Users who blocked
+    the bot or deleted their account are flagged.
+
+    Args:
+        client (Bot): The running bot.
+        broadcast (dict): The broadcast document from `Database.create_broadcast`.
+        rate (float): Messages sent per second across all senders.
+        workers (int): Number of concurrent senders.
+        on_progress (Optional[Callable]): Called with the counts at every checkpoint.
+        checkpoint_interval (float): Seconds between checkpoints.
+        max_attempts (int): Send attempts per user before counting them as failed.
+
+    Returns:
+        Dict[str, int]: Number of users the message was `sent` to, `failed` for, `blocked` and `deleted`.
+    """
+    counts = dict(broadcast['counts'])
+    # Broadcasts started before sharding have a single cursor
+    shards = [dict(shard) for shard in broadcast.get('shards') or [
+        {'lower': None, 'upper': None, 'cursor': broadcast.get('cursor')}
+    ]]
+    bucket = TokenBucket(rate)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=workers * 2)
+    # Users of each shard in the order they were read, as [_id, done] entries, to advance its cursor in order
+    outstanding = [deque() for _ in shards]
+
+    async def deliver(user_id: int) -> str:
+        for _ in range(max_attempts):
+            await bucket.acquire()
+            try:
+                await client.copy_message(
+                    chat_id=user_id,
+                    from_chat_id=broadcast['from_chat_id'],
+                    message_id=broadcast['message_id']
+                )
+                return 'sent'
+            except FloodWait as e:
+                logger.warning("📢 FloodWait of %ss during broadcast, pausing senders", e.value)
+                bucket.pause(e.value)
+                await asyncio.sleep(e.value)
+            except UserIsBlocked:
+                await client.db.mark_user_unreachable(user_id, 'blocked')
+                return 'blocked'
+            except InputUserDeactivated:
+                await client.db.mark_user_unreachable(user_id, 'deactivated')
+                return 'deleted'
+            except Exception as e:
+                logger.debug("Error broadcasting to user %s: %s", user_id, e)
+                return 'failed'
+        return 'failed'
+
+    async def produce(shard: dict, pending: deque):
+        users = client.db.iter_broadcast_users(after=shard['cursor'], lower=shard['lower'], upper=shard['upper'])
+        async for doc_id, user_id in users:
+            entry = [doc_id, False]
+            pending.append(entry)
+            await queue.put((entry, user_id))
+
+    async def produce_all():
+        await asyncio.gather(*(produce(shard, pending) for shard, pending in zip(shards, outstanding)))
+        for _ in range(workers):
+            await queue.put(None)
+
+    async def send():
+        while (item := await queue.get()) is not None:
+            entry, user_id = item
+            counts[await deliver(user_id)] += 1
+            entry[1] = True
+
+    def advance():
+        for shard, pending in zip(shards, outstanding):
+            while pending and pending[0][1]:
+                shard['cursor'] = pending.popleft()[0]
+
+    async def checkpoint(status: Optional[str] = None):
+        advance()
+        await client.db.save_broadcast_progress(broadcast['_id'], shards, counts, status)
+        if on_progress:
+            await on_progress(dict(counts))
+
+    tasks = [asyncio.create_task(produce_all())] + [asyncio.create_task(send()) for _ in range(workers)]
+    senders = asyncio.gather(*tasks)
+    finished = False
+    try:
+        while True:
+            done, _ = await asyncio.wait({senders}, timeout=checkpoint_interval)
+            if done:
+                senders.result()
+                break
+            await checkpoint()
+        await checkpoint('done')
+        finished = True
+    finally:
+        senders.cancel()
+        # Retrieve the outcome so a cancelled gather is not logged as an unhandled error
+        senders.add_done_callback(lambda future: future.cancelled() or future.exception())
+        if not finished:
+            # Record how far we got, so the interrupted broadcast can be resumed
+            advance()
+            await asyncio.shield(client.db.save_broadcast_progress(broadcast['_id'], shards, counts))
+    return counts
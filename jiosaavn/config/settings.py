@@ -11,6 +11,7 @@ BOT_COMMANDS = (
     ("about", "Learn more about the bot and its features"),
     ("broadcast", "Send a message to all users (Admin Only)"),
     ("stats", "Get bot statistics (Admin Only)"),
+    ("prewarm", "Pre-upload songs to the storage channel (Admin Only)"),
 )
 
 DATABASE_URL = getenv("DATABASE_URL", None)
@@ -18,3 +19,76 @@ HOST = getenv("HOST", "0.0.0.0")
 # Allow custom port via environment variable, default to 8080 for development, 80 for production
 DEFAULT_PORT = "8080" if getenv("RENDER") is None else "80"
 PORT = int(getenv("PORT", DEFAULT_PORT))
+
+# In-process cache of user documents: number of users kept and seconds before re-reading one
+USER_CACHE_SIZE = int(getenv("USER_CACHE_SIZE", "100000"))
+USER_CACHE_TTL = float(getenv("USER_CACHE_TTL", "300"))
+# Seconds a /stats and /api/stats snapshot is reused before the user counts are recomputed
+STATS_CACHE_TTL = float(getenv("STATS_CACHE_TTL", "60"))
+# Hours between recomputing the user counters from scratch (0 only reconciles on startup)
+COUNTERS_RECONCILE_INTERVAL = float(getenv("COUNTERS_RECONCILE_INTERVAL", "24")) * 3600
+
+# Broadcasts: messages per second across all senders (Telegram allows bots about 30) and concurrent senders
+BROADCAST_RATE = float(getenv("BROADCAST_RATE", "25"))
+BROADCAST_WORKERS = max(1, int(getenv("BROADCAST_WORKERS", "8")))
+# `_id` ranges the users of a broadcast are split into, each read and checkpointed on its own
+BROADCAST_SHARDS = max(1, int(getenv("BROADCAST_SHARDS", "4")))
+
+# Shared HTTP connection pool used for JioSaavn API calls, thumbnails and audio downloads
+HTTP_POOL_LIMIT = int(getenv("HTTP_POOL_LIMIT", "100"))
+HTTP_LIMIT_PER_HOST = int(getenv("HTTP_LIMIT_PER_HOST", "20"))
+HTTP_DNS_CACHE_TTL = int(getenv("HTTP_DNS_CACHE_TTL", "300"))
+HTTP_KEEPALIVE_TIMEOUT = float(getenv("HTTP_KEEPALIVE_TIMEOUT", "30"))
+
+# JioSaavn response cache (memory budget in MB, TTLs in seconds; 0 disables a call type)
+RESPONSE_CACHE_MAX_MB = int(getenv("RESPONSE_CACHE_MAX_MB", "32"))
+CACHE_TTL_SEARCH = int(getenv("CACHE_TTL_SEARCH", "600"))
+CACHE_TTL_SONG = int(getenv("CACHE_TTL_SONG", "3600"))
+CACHE_TTL_COLLECTION = int(getenv("CACHE_TTL_COLLECTION", "1800"))
+
+# Hedged lookups: query the fallback API once the official API is slower than this percentile of its
+# recent latencies, clamped to the min/max delay in ms (false only falls back after the official answer)
+HEDGE_REQUESTS = getenv("HEDGE_REQUESTS", "true").lower() in ("1", "true", "yes")
+HEDGE_PERCENTILE = float(getenv("HEDGE_PERCENTILE", "95"))
+HEDGE_MIN_DELAY = float(getenv("HEDGE_MIN_DELAY_MS", "250")) / 1000
+HEDGE_MAX_DELAY = float(getenv("HEDGE_MAX_DELAY_MS", "3000")) / 1000
+
+# Circuit breakers: skip an upstream endpoint (api.php, a fallback route or a CDN host) for CIRCUIT_OPEN_SECONDS
+# once this share of its recent calls (at least CIRCUIT_MIN_CALLS) failed or took longer than CIRCUIT_SLOW_CALL_MS
+CIRCUIT_BREAKERS = getenv("CIRCUIT_BREAKERS", "true").lower() in ("1", "true", "yes")
+CIRCUIT_FAILURE_RATIO = float(getenv("CIRCUIT_FAILURE_RATIO", "0.5"))
+CIRCUIT_MIN_CALLS = int(getenv("CIRCUIT_MIN_CALLS", "10"))
+CIRCUIT_SLOW_CALL = float(getenv("CIRCUIT_SLOW_CALL_MS", "5000")) / 1000
+CIRCUIT_OPEN_SECONDS = float(getenv("CIRCUIT_OPEN_SECONDS", "30"))
+
+# Milliseconds the fallback API gets to find an item by URL before it is also looked up by ID (0: both at once)
+FALLBACK_STAGGER = float(getenv("FALLBACK_STAGGER_MS", "300")) / 1000
+
+# Seconds an upload lease is held before another bot process may take over the upload
+UPLOAD_LEASE_TTL = int(getenv("UPLOAD_LEASE_TTL", "600"))
+
+# Album/playlist/artist uploads: songs fetched ahead in parallel, and seconds between progress edits
+BATCH_CONCURRENCY = max(1, int(getenv("BATCH_CONCURRENCY", "4")))
+BATCH_PROGRESS_INTERVAL = float(getenv("BATCH_PROGRESS_INTERVAL", "3"))
+
+# Stream audio into memory-bounded buffers instead of ./download; tracks above the limit spill to a temp file
+STREAM_UPLOADS = getenv("STREAM_UPLOADS", "true").lower() in ("1", "true", "yes")
+STREAM_MEMORY_LIMIT = int(getenv("STREAM_MEMORY_LIMIT_MB", "20")) * 1024 * 1024
+
+# Channel every song is uploaded to once; users receive copies from it (0 uploads straight to users)
+STORAGE_CHANNEL = int(getenv("STORAGE_CHANNEL", "0"))
+# Storage channel pre-warming: hours between runs of the most requested songs (0 disables), how many, and songs per minute
+PREWARM_INTERVAL = float(getenv("PREWARM_INTERVAL", "0")) * 3600
+PREWARM_TOP = int(getenv("PREWARM_TOP", "100"))
+PREWARM_RATE = float(getenv("PREWARM_RATE", "20"))
+PREWARM_QUALITIES = tuple(q.strip() for q in getenv("PREWARM_QUALITIES", "320kbps").split(",") if q.strip())
+
+# Logging: records queued for the writer thread before new ones are dropped, and INFO/DEBUG records per minute
+# each line of the hot loggers may log (0: no limit), keeping one in LOG_SAMPLE_EVERY of those over the limit
+LOG_QUEUE_SIZE = int(getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_RATE_LIMIT = float(getenv("LOG_RATE_LIMIT", "60"))
+LOG_SAMPLE_EVERY = int(getenv("LOG_SAMPLE_EVERY", "100"))
+LOG_HOT_LOGGERS = tuple(
+    name.strip() for name in getenv("LOG_HOT_LOGGERS", "api.jiosaavn,jiosaavn.plugins.download_handler").split(",")
+    if name.strip()
+)
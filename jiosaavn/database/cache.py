@@ -0,0 +1,76 @@
+"""
+In-process caching of hot database documents.
+"""
+import copy
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class DocumentCache:
+    """
+    LRU cache of database documents with a per-entry expiry.
+
+    Documents are copied on the way in and out, so callers may freely mutate what they
+    receive. The TTL bounds how long a change written by another bot process can stay
+    unseen; writes made through this process update the cache directly.
+    """
+
+    def __init__(self, max_entries: int = 100_000, ttl: float = 300):
+        """
+        Args:
+            max_entries (int): Number of documents kept before the least recently used is evicted.
+            ttl (float): Seconds a document is served from memory before being read again.
+        """
+        self._entries: "OrderedDict[Hashable, Tuple[float, dict]]" = OrderedDict()
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, document = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return copy.deepcopy(document)
+
+    def set(self, key: Hashable, document: dict) -> None:
+        if self.max_entries <= 0:
+            return
+
+        self._entries[key] = (time.monotonic() + self.ttl, copy.deepcopy(document))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
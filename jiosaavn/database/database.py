@@ -1,19 +1,132 @@
+import copy
+import time
+import asyncio
+import logging
 import datetime
+from typing import Dict, List, Optional, Tuple
+
 import motor.motor_asyncio
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel, ReturnDocument
+from pymongo.errors import DuplicateKeyError, OperationFailure
+
+from .cache import DocumentCache
+from ..metrics import MongoCommandMetrics
+
+logger = logging.getLogger(__name__)
+
+SONG_QUALITIES = ("320kbps", "160kbps", "96kbps", "48kbps")
+
+# Indexes backing the per-message lookups (the stats come from the counters document)
+USER_INDEXES = [
+    IndexModel([('id', ASCENDING)], name='id_unique', unique=True),
+]
+# User indexes created by earlier versions for the stats queries, which now only slow down writes
+OBSOLETE_USER_INDEXES = ('join_date', 'quality', 'type', 'is_banned')
+SONG_INDEXES = [
+    IndexModel([('id', ASCENDING)], name='id_unique', unique=True),
+    IndexModel(
+        [('requests', DESCENDING)],
+        name='most_requested',
+        partialFilterExpression={'requests': {'$gt': 0}}
+    ),
+]
+
+# Users a broadcast is sent to: neither banned nor found unreachable by an earlier broadcast
+BROADCAST_USERS = {'ban_status.is_banned': False, 'unreachable': {'$exists': False}}
 
 class Database:
-    def __init__(self, uri: str):
+    def __init__(self, uri: str, user_cache_size: int = 100_000, user_cache_ttl: float = 300, stats_cache_ttl: float = 60):
         """
         Initializes the Database instance with the provided URI.
 
         Args:
             uri (str): The MongoDB URI.
+            user_cache_size (int): Number of user documents kept in memory (0 disables the cache).
+            user_cache_ttl (float): Seconds a cached user document is used before it is read again.
+            stats_cache_ttl (float): Seconds a statistics snapshot is served before it is recomputed.
         """
-        self._client = motor.motor_asyncio.AsyncIOMotorClient(uri)
+        self._client = motor.motor_asyncio.AsyncIOMotorClient(uri, event_listeners=[MongoCommandMetrics()])
         self.user_db = self._client['jiosaavnV2_users']
         self.id_db = self._client['jiosaavnV2_ids']
         self.user_collection = self.user_db.users
+        self.counter_collection = self.user_db.counters
+        self.broadcast_collection = self.user_db.broadcasts
         self.id_collection = self.id_db.ids
+        self.user_cache = DocumentCache(max_entries=user_cache_size, ttl=user_cache_ttl)
+        self.stats_cache_ttl = stats_cache_ttl
+        self._stats_snapshot: Optional[dict] = None
+        self._stats_expires_at = 0.0
+        self._stats_lock = asyncio.Lock()
+
+    async def ensure_indexes(self):
+        """
+        Creates the indexes the bot relies on and logs an index report.
+
+        Indexes whose key already exists are left alone, so this is safe to run on every
+        startup. When a unique index cannot be built because of existing duplicates, a
+        non-unique index on the same key is created instead so lookups still avoid
+        collection scans. Indexes no query needs any more are dropped.
+        """
+        existing_names = {index['name'] async for index in self.user_collection.list_indexes()}
+        for name in OBSOLETE_USER_INDEXES:
+            if name in existing_names:
+                await self.user_collection.drop_index(name)
+                logger.info("🗂 Dropped unused index %s.%s", self.user_collection.name, name)
+
+        for collection, indexes in ((self.user_collection, USER_INDEXES), (self.id_collection, SONG_INDEXES)):
+            existing_keys = [dict(index['key']) async for index in collection.list_indexes()]
+            for index in indexes:
+                document = index.document
+                # An index on the same key under another name already serves the lookups
+                if dict(document['key']) in existing_keys:
+                    continue
+                try:
+                    await collection.create_indexes([index])
+                except (DuplicateKeyError, OperationFailure) as e:
+                    if not document.get('unique'):
+                        logger.warning("⚠️ Could not create index %s.%s: %s", collection.name, document['name'], e)
+                        continue
+                    logger.warning(
+                        "⚠️ Duplicate values prevent unique index %s.%s, creating a non-unique one instead: %s",
+                        collection.name, document['name'], e
+                    )
+                    await collection.create_index(list(document['key'].items()), name=f"{document['name']}_dup")
+
+        report = await self.index_report()
+        for name, entry in report.items():
+            if entry['missing']:
+                logger.warning("⚠️ Missing indexes on %s: %s", name, ', '.join(entry['missing']))
+            if entry['unused']:
+                logger.info("🗂 Unused indexes on %s since last restart: %s", name, ', '.join(entry['unused']))
+
+    async def index_report(self) -> Dict[str, Dict[str, List[str]]]:
+        """
+        Compares the indexes present on each collection with the expected ones.
+
+        Returns:
+            Dict[str, Dict[str, List[str]]]: Per collection, the expected indexes that are
+            `missing` and the existing ones that have not served a query (`unused`).
+        """
+        report = {}
+        for collection, indexes in ((self.user_collection, USER_INDEXES), (self.id_collection, SONG_INDEXES)):
+            existing = {index['name']: dict(index['key']) async for index in collection.list_indexes()}
+            existing_keys = list(existing.values())
+            missing = [
+                index.document['name'] for index in indexes
+                if dict(index.document['key']) not in existing_keys
+            ]
+
+            unused = []
+            try:
+                async for stats in collection.aggregate([{'$indexStats': {}}]):
+                    if stats['name'] != '_id_' and stats['accesses']['ops'] == 0:
+                        unused.append(stats['name'])
+            except OperationFailure as e:
+                logger.debug("Index usage stats unavailable for %s: %s", collection.name, e)
+
+            report[collection.name] = {'missing': missing, 'unused': sorted(unused)}
+        return report
 
     @staticmethod
     def new_user(user_id: int) -> dict:
@@ -49,23 +162,54 @@ class Database:
         Returns:
             bool: True if the user exists, False otherwise.
         """
+        if self.user_cache.get(user_id) is not None:
+            return True
         user = await self.user_collection.find_one({'id': user_id})
+        if user:
+            self.user_cache.set(user_id, user)
         return bool(user)
 
-    async def add_user(self, user_id: int):
+    async def add_user(self, user_id: int) -> Optional[dict]:
         """
-        Adds a new user to the database.
+        Adds a user to the database, unless they are already registered.
+
+        The user is upserted on the unique `id`, so concurrent registrations of the same user
+        (e.g. a first /start racing `get_user`) insert and count them only once.
 
         Args:
             user_id (int): The unique identifier for the user.
+
+        Returns:
+            Optional[dict]: The new user document, or None if the user already existed.
         """
+        if self.user_cache.get(user_id) is not None:
+            return None
+
         user = self.new_user(user_id)
-        await self.user_collection.insert_one(user)
+        fields = {name: value for name, value in user.items() if name != 'id'}
+        try:
+            result = await self.user_collection.update_one({'id': user_id}, {'$setOnInsert': fields}, upsert=True)
+        except DuplicateKeyError:
+            # A concurrent upsert inserted the user first
+            return None
+        if result.upserted_id is None:
+            return None
+
+        user['_id'] = result.upserted_id
+        self.user_cache.set(user_id, user)
+        await self._count_users({
+            'total': 1,
+            f"joins.{user['join_date']}": 1,
+            f"quality.{user['quality']}": 1,
+            f"type.{user['type']}": 1,
+        })
         return user
 
     async def get_user(self, user_id: int) -> dict:
         """
-        Retrieves a user from the database.
+        Retrieves a user from the database, registering them if they are new.
+
+        Users are served from the in-process cache while their entry is fresh.
 
         Args:
             user_id (int): The unique identifier for the user.
@@ -73,9 +217,20 @@ class Database:
         Returns:
             dict: The user document from the database.
         """
+        user = self.user_cache.get(user_id)
+        if user is not None:
+            return user
+
         user = await self.user_collection.find_one({'id': user_id})
-        if not user:
-            user = await self.add_user(user_id)
+        if user:
+            self.user_cache.set(user_id, user)
+            return user
+
+        user = await self.add_user(user_id)
+        if user is None:
+            # A concurrent request registered the user first
+            user = await self.user_collection.find_one({'id': user_id})
+            self.user_cache.set(user_id, user)
         return user
 
     async def update_user(self, user_id: int, key: str, value: any):
@@ -87,22 +242,104 @@ class Database:
             key (str): The key to update.
             value (any): The value to set for the key.
         """
-        await self.user_collection.update_one({'id': user_id}, {'$set': {key: value}})
+        before = await self.user_collection.find_one_and_update(
+            {'id': user_id},
+            {'$set': {key: value}},
+            return_document=ReturnDocument.BEFORE
+        )
+        if not before:
+            self.user_cache.invalidate(user_id)
+            return
+
+        user = copy.deepcopy(before)
+        *parents, field = key.split('.')
+        target = user
+        for parent in parents:
+            target = target.setdefault(parent, {})
+        target[field] = value
+        self.user_cache.set(user_id, user)
+
+        # Move the user between the counter buckets the change affects
+        changes = {}
+        for name in ('quality', 'type'):
+            if before.get(name) != user.get(name):
+                # Documents without the setting were never counted in a bucket
+                if before.get(name) is not None:
+                    changes[f"{name}.{before.get(name)}"] = -1
+                if user.get(name) is not None:
+                    changes[f"{name}.{user.get(name)}"] = 1
+        was_banned = bool(before.get('ban_status', {}).get('is_banned'))
+        is_banned = bool(user.get('ban_status', {}).get('is_banned'))
+        if was_banned != is_banned:
+            changes['banned'] = 1 if is_banned else -1
+        if changes:
+            await self._count_users(changes)
+
+    async def _count_users(self, changes: Dict[str, int]):
+        await self.counter_collection.update_one({'_id': 'users'}, {'$inc': changes}, upsert=True)
+
+    async def reconcile_user_counters(self) -> dict:
+        """
+        Recomputes the user counters from the users collection.
+
+        Counters are kept up to date incrementally by `add_user` and `update_user`; this
+        corrects any drift (e.g. from writes made outside the bot) with one `$facet` pass.
+
+        Returns:
+            dict: The recomputed counters document.
+        """
+        pipeline = [{'$facet': {
+            'total': [{'$count': 'count'}],
+            'banned': [{'$match': {'ban_status.is_banned': True}}, {'$count': 'count'}],
+            'joins': [{'$group': {'_id': '$join_date', 'count': {'$sum': 1}}}],
+            'quality': [{'$group': {'_id': '$quality', 'count': {'$sum': 1}}}],
+            'type': [{'$group': {'_id': '$type', 'count': {'$sum': 1}}}],
+        }}]
+        facets = (await self.user_collection.aggregate(pipeline, allowDiskUse=True).to_list(length=1))[0]
+
+        def buckets(name: str) -> Dict[str, int]:
+            return {group['_id']: group['count'] for group in facets[name] if group['_id']}
+
+        counters = {
+            'total': facets['total'][0]['count'] if facets['total'] else 0,
+            'banned': facets['banned'][0]['count'] if facets['banned'] else 0,
+            'joins': buckets('joins'),
+            'quality': buckets('quality'),
+            'type': buckets('type'),
+        }
+        await self.counter_collection.replace_one({'_id': 'users'}, counters, upsert=True)
+        return counters
 
-    async def is_song_id_exist(self, item_id: str) -> bool:
+    async def register_song_request(self, song_id: str, quality: str, count: bool = True) -> dict:
         """
-        Checks if an song ID exists in the database.
+        Counts a request for a song and returns its stored upload in one round trip.
+
+        The song document is created on its first request, so later updates and upload
+        leases always find it.
 
         Args:
-            item_id (str): The unique identifier for the item.
+            song_id (str): The unique identifier for the song.
+            quality (str): The quality of the song (e.g., '320kbps').
+            count (bool): Whether this is a user request; internal lookups (pre-warming,
+                retries) pass False so they do not skew the request counts.
 
         Returns:
-            bool: True if the ID exists, False otherwise.
+            dict: The per-quality record of the song, empty if it was never uploaded in that quality.
         """
-        item = await self.id_collection.find_one({'id': item_id})
-        if not item:
-            await self.id_collection.insert_one({'id': item_id, 'chat_id': 0, 'message_id': 0})
-        return bool(item)
+        update = {'$setOnInsert': {'chat_id': 0, 'message_id': 0}}
+        if count:
+            update['$inc'] = {'requests': 1}
+        try:
+            song = await self.id_collection.find_one_and_update(
+                {'id': song_id}, update, projection={quality: 1}, upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # Lost a concurrent upsert for a new song; the document exists now
+            song = await self.id_collection.find_one_and_update(
+                {'id': song_id}, update, projection={quality: 1}, return_document=ReturnDocument.AFTER
+            )
+        return (song or {}).get(quality) or {}
 
     async def get_song(self, song_id: str) -> dict:
         """
@@ -117,82 +354,382 @@ class Database:
         song = await self.id_collection.find_one({'id': song_id})
         return song
 
-    async def update_song(self, song_id: str, quality: str, chat_id: int, message_id: int):
+    async def update_song(
+        self,
+        song_id: str,
+        quality: str,
+        chat_id: int,
+        message_id: int,
+        file_id: Optional[str] = None,
+        file_unique_id: Optional[str] = None,
+        duration: Optional[int] = None,
+        title: Optional[str] = None,
+        performer: Optional[str] = None,
+        caption: Optional[str] = None
+    ):
         """
         Updates a song's information in the database.
 
+        Besides the message holding the upload, the Telegram file reference and the audio
+        attributes are stored so the song can be re-sent with a single `send_audio(file_id)`.
+
         Args:
             song_id (str): The unique identifier for the song.
             quality (str): The quality of the song (e.g., '320kbps').
             chat_id (int): The chat ID.
             message_id (int): The message ID.
+            file_id (Optional[str]): The Telegram file ID of the uploaded audio.
+            file_unique_id (Optional[str]): The Telegram unique file ID of the uploaded audio.
+            duration (Optional[int]): The audio duration in seconds.
+            title (Optional[str]): The audio title.
+            performer (Optional[str]): The audio performer.
+            caption (Optional[str]): The markdown caption sent with the audio.
         """
         update_fields = {
             f'{quality}.chat_id': chat_id,
             f'{quality}.message_id': message_id
         }
+        audio_fields = {
+            'file_id': file_id,
+            'file_unique_id': file_unique_id,
+            'duration': duration,
+            'title': title,
+            'performer': performer,
+            'caption': caption,
+        }
+        update_fields.update({f'{quality}.{key}': value for key, value in audio_fields.items() if value is not None})
         await self.id_collection.update_one({'id': song_id}, {'$set': update_fields})
 
-    async def get_total_users(self) -> int:
+    async def get_most_requested_songs(self, limit: int = 100) -> list:
         """
-        Gets the total number of users in the database.
+        Gets the IDs of the most requested songs.
+
+        Args:
+            limit (int): Maximum number of song IDs to return.
 
         Returns:
-            int: Total number of users.
+            list: Song IDs, most requested first.
+        """
+        cursor = self.id_collection.find({'requests': {'$gt': 0}}, {'id': 1}).sort('requests', -1).limit(limit)
+        return [song['id'] async for song in cursor]
+
+    async def get_songs_without_file_id(self, quality: str, limit: int = 200, after: Optional[ObjectId] = None) -> list:
+        """
+        Gets uploaded songs of a quality that were stored before file IDs were recorded, in `_id` order.
+
+        Args:
+            quality (str): The quality of the song (e.g., '320kbps').
+            limit (int): Maximum number of songs to return.
+            after (Optional[ObjectId]): Only return songs after this `_id`, to page past songs skipped for now.
+
+        Returns:
+            list: Song documents with `_id`, `id` and the per-quality record.
+        """
+        query = {
+            f'{quality}.message_id': {'$gt': 0},
+            f'{quality}.file_id': {'$exists': False},
+            f'{quality}.file_id_missing': {'$exists': False}
+        }
+        if after is not None:
+            query['_id'] = {'$gt': after}
+        cursor = self.id_collection.find(query, {'id': 1, quality: 1}).sort('_id', ASCENDING).limit(limit)
+        return await cursor.to_list(length=limit)
+
+    async def mark_song_file_id_missing(self, song_id: str, quality: str):
+        """
+        Flags a stored upload whose message can no longer be read, so the backfill skips it.
+
+        Args:
+            song_id (str): The unique identifier for the song.
+            quality (str): The quality of the song (e.g., '320kbps').
         """
-        return await self.user_collection.count_documents({})
+        await self.id_collection.update_one({'id': song_id}, {'$set': {f'{quality}.file_id_missing': True}})
 
-    async def get_users_by_date(self, date: str) -> int:
+    async def acquire_song_lease(self, song_id: str, quality: str, owner: str, ttl: int) -> bool:
         """
-        Gets the number of users who joined on a specific date.
+        Tries to take the upload lease for a song and quality, so that only one bot
+        process downloads and uploads it at a time.
 
         Args:
-            date (str): The date in ISO format.
+            song_id (str): The unique identifier for the song.
+            quality (str): The quality of the song (e.g., '320kbps').
+            owner (str): Identifier of the process taking the lease.
+            ttl (int): Seconds after which an unreleased lease can be taken over.
 
         Returns:
-            int: Number of users who joined on that date.
+            bool: True if the lease is now held by `owner`, False if another process holds it.
+        """
+        now = time.time()
+        lease_key = f'{quality}.lease'
+        item = await self.id_collection.find_one_and_update(
+            {
+                'id': song_id,
+                '$or': [
+                    {lease_key: {'$exists': False}},
+                    {f'{lease_key}.expires_at': {'$lt': now}},
+                    {f'{lease_key}.owner': owner}
+                ]
+            },
+            {'$set': {lease_key: {'owner': owner, 'expires_at': now + ttl}}}
+        )
+        return item is not None
+
+    async def release_song_lease(self, song_id: str, quality: str, owner: str):
+        """
+        Releases an upload lease held by `owner`.
+
+        Args:
+            song_id (str): The unique identifier for the song.
+            quality (str): The quality of the song (e.g., '320kbps').
+            owner (str): Identifier of the process holding the lease.
         """
-        return await self.user_collection.count_documents({'join_date': date})
+        lease_key = f'{quality}.lease'
+        await self.id_collection.update_one(
+            {'id': song_id, f'{lease_key}.owner': owner},
+            {'$unset': {lease_key: ''}}
+        )
 
-    async def get_all_users(self):
+    async def wait_for_song(self, song_id: str, quality: str, timeout: float, interval: float = 2.0) -> Optional[dict]:
         """
-        Gets all users from the database for broadcasting.
+        Waits for another process to finish uploading a song.
+
+        Args:
+            song_id (str): The unique identifier for the song.
+            quality (str): The quality of the song (e.g., '320kbps').
+            timeout (float): Maximum number of seconds to wait.
+            interval (float): Seconds between polls.
 
         Returns:
-            AsyncGenerator: Generator of user documents.
+            Optional[dict]: The uploaded per-quality record, or None if the upload was abandoned
+            (its lease was released or expired without a result) or the timeout was reached.
+        """
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(interval)
+            song = (await self.get_song(song_id) or {}).get(quality) or {}
+            if song.get('message_id'):
+                return song
+            lease = song.get('lease')
+            if not lease or lease.get('expires_at', 0) < time.time():
+                return None
+        return None
+
+    async def get_stats_snapshot(self) -> dict:
         """
-        async for user in self.user_collection.find({'ban_status.is_banned': False}):
-            yield user
+        Gets the user statistics shown by /stats and the web dashboard.
 
-    async def get_banned_users_count(self) -> int:
+        All counts come from the incrementally maintained counters document, a single
+        point read. The result is shared for `stats_cache_ttl` seconds, and concurrent
+        callers wait for one read, so the query load does not grow with the number of
+        dashboard viewers.
+
+        Returns:
+            dict: `total`, `active`, `banned` and `today` user counts, the `quality` and
+            `type` distributions and the `updated_at` time of the snapshot.
         """
-        Gets the total number of banned users.
+        async with self._stats_lock:
+            if self._stats_snapshot is None or self._stats_expires_at < time.monotonic():
+                self._stats_snapshot = await self._compute_stats()
+                self._stats_expires_at = time.monotonic() + self.stats_cache_ttl
+            return copy.deepcopy(self._stats_snapshot)
+
+    async def _compute_stats(self) -> dict:
+        counters = await self.counter_collection.find_one({'_id': 'users'})
+        if counters is None:
+            counters = await self.reconcile_user_counters()
+
+        total, banned = counters.get('total', 0), counters.get('banned', 0)
+        return {
+            'total': total,
+            'active': total - banned,
+            'banned': banned,
+            'today': counters.get('joins', {}).get(datetime.date.today().isoformat(), 0),
+            'quality': {**{quality: 0 for quality in SONG_QUALITIES}, **counters.get('quality', {})},
+            'type': {'all': 0, 'song': 0, **counters.get('type', {})},
+            'updated_at': datetime.datetime.now().isoformat(),
+        }
+
+    async def get_total_users(self) -> int:
+        """
+        Gets the total number of users in the database.
+
+        Read from the counters document, a single point read, instead of counting the
+        users collection.
 
         Returns:
-            int: Number of banned users.
+            int: Total number of users.
+        """
+        counters = await self.counter_collection.find_one({'_id': 'users'}, projection={'total': 1})
+        if counters is None:
+            counters = await self.reconcile_user_counters()
+        return counters.get('total', 0)
+
+    async def iter_user_ids(
+        self,
+        query: Optional[dict] = None,
+        lower: Optional[ObjectId] = None,
+        upper: Optional[ObjectId] = None,
+        start_after: Optional[ObjectId] = None,
+        batch_size: int = 1000
+    ):
         """
-        return await self.user_collection.count_documents({'ban_status.is_banned': True})
+        Iterates user IDs in `_id` order, one batch at a time.
+
+        Only `_id` and `id` are read. Every batch is its own short query continuing after
+        the last `_id` seen, so no server cursor is held open while the caller works
+        through a batch, however long that takes.
+
+        Args:
+            query (Optional[dict]): Filter on the users to include.
+            lower (Optional[ObjectId]): Inclusive lower `_id` bound, e.g. from `user_id_ranges`.
+            upper (Optional[ObjectId]): Exclusive upper `_id` bound, e.g. from `user_id_ranges`.
+            start_after (Optional[ObjectId]): Resume after this `_id` (overrides `lower`).
+            batch_size (int): Number of users per batch.
 
-    async def get_users_by_quality(self, quality: str) -> int:
+        Returns:
+            AsyncGenerator: Generator of lists of `(_id, user_id)` tuples.
+        """
+        query = dict(query or {})
+        last = start_after
+        while True:
+            id_range = {'$gt': last} if last is not None else ({'$gte': lower} if lower is not None else {})
+            if upper is not None:
+                id_range['$lt'] = upper
+            if id_range:
+                query['_id'] = id_range
+
+            cursor = self.user_collection.find(query, {'id': 1}, batch_size=batch_size)
+            users = await cursor.sort('_id', ASCENDING).limit(batch_size).to_list(length=batch_size)
+            if not users:
+                return
+            yield [(user['_id'], user['id']) for user in users]
+            if len(users) < batch_size:
+                return
+            last = users[-1]['_id']
+
+    async def user_id_ranges(self, shards: int, query: Optional[dict] = None) -> List[Tuple[Optional[ObjectId], Optional[ObjectId]]]:
         """
-        Gets the number of users using a specific quality setting.
+        Splits the users into `_id` ranges of about the same size, so that several workers
+        or bot processes can each iterate one with `iter_user_ids`.
 
         Args:
-            quality (str): The quality setting.
+            shards (int): Number of ranges.
+            query (Optional[dict]): Filter on the users to include.
 
         Returns:
-            int: Number of users with that quality setting.
+            List[Tuple[Optional[ObjectId], Optional[ObjectId]]]: `(lower, upper)` bounds per
+            range; the first range is open below and the last one open above.
+        """
+        if shards <= 1:
+            return [(None, None)]
+
+        pipeline = [
+            {'$match': query or {}},
+            {'$project': {'_id': 1}},
+            {'$bucketAuto': {'groupBy': '$_id', 'buckets': shards}}
+        ]
+        buckets = await self.user_collection.aggregate(pipeline, allowDiskUse=True).to_list(length=shards)
+        bounds = [None] + [bucket['_id']['max'] for bucket in buckets[:-1]] + [None]
+        return list(zip(bounds[:-1], bounds[1:]))
+
+    async def iter_broadcast_users(
+        self,
+        after: Optional[ObjectId] = None,
+        lower: Optional[ObjectId] = None,
+        upper: Optional[ObjectId] = None,
+        batch_size: int = 1000
+    ):
         """
-        return await self.user_collection.count_documents({'quality': quality})
+        Iterates the users a broadcast is sent to, in `_id` order.
+
+        Users that are banned or were found unreachable by an earlier broadcast are skipped.
+
+        Args:
+            after (Optional[ObjectId]): Only yield users after this `_id`, to resume a broadcast.
+            lower (Optional[ObjectId]): Inclusive lower `_id` bound of the broadcast shard.
+            upper (Optional[ObjectId]): Exclusive upper `_id` bound of the broadcast shard.
+            batch_size (int): Number of users read from the database at a time.
 
-    async def get_users_by_type(self, user_type: str) -> int:
+        Returns:
+            AsyncGenerator: Generator of `(_id, user_id)` tuples.
+        """
+        async for users in self.iter_user_ids(BROADCAST_USERS, lower, upper, after, batch_size):
+            for user in users:
+                yield user
+
+    async def mark_user_unreachable(self, user_id: int, reason: str):
         """
-        Gets the number of users with a specific type setting.
+        Flags a user who blocked the bot or deleted their account, so broadcasts skip them
+        and they can be pruned.
 
         Args:
-            user_type (str): The user type setting.
+            user_id (int): The unique identifier for the user.
+            reason (str): Why the user cannot be reached (e.g. 'blocked', 'deactivated').
+        """
+        await self.user_collection.update_one(
+            {'id': user_id},
+            {'$set': {'unreachable': {'reason': reason, 'since': datetime.date.today().isoformat()}}}
+        )
+        self.user_cache.invalidate(user_id)
+
+    async def create_broadcast(self, from_chat_id: int, message_id: int, shards: int = 1) -> dict:
+        """
+        Registers a new broadcast of a message.
+
+        The users are split into `shards` `_id` ranges, each read by its own producer and
+        checkpointed with its own cursor.
+
+        Args:
+            from_chat_id (int): The chat holding the message to broadcast.
+            message_id (int): The message to broadcast.
+            shards (int): Number of `_id` ranges the users are split into.
+
+        Returns:
+            dict: The broadcast document.
+        """
+        ranges = await self.user_id_ranges(shards, BROADCAST_USERS)
+        broadcast = {
+            'from_chat_id': from_chat_id,
+            'message_id': message_id,
+            'status': 'running',
+            'shards': [{'lower': lower, 'upper': upper, 'cursor': None} for lower, upper in ranges],
+            'counts': {'sent': 0, 'failed': 0, 'blocked': 0, 'deleted': 0},
+            'started_at': datetime.datetime.now().isoformat(),
+        }
+        await self.broadcast_collection.insert_one(broadcast)
+        return broadcast
+
+    async def get_unfinished_broadcast(self) -> Optional[dict]:
+        """
+        Gets the most recent broadcast that was interrupted before completing.
 
         Returns:
-            int: Number of users with that type setting.
+            Optional[dict]: The broadcast document, or None if every broadcast finished.
+        """
+        return await self.broadcast_collection.find_one({'status': 'running'}, sort=[('_id', DESCENDING)])
+
+    async def save_broadcast_progress(self, broadcast_id: ObjectId, shards: List[dict], counts: dict, status: Optional[str] = None):
+        """
+        Checkpoints a broadcast, so every shard can resume after the last user known to be done.
+
+        Args:
+            broadcast_id (ObjectId): The broadcast document `_id`.
+            shards (List[dict]): The shards' `lower` and `upper` bounds, and their `cursor`: the
+                `_id` of the user up to which every user of the shard was handled.
+            counts (dict): Delivery counts so far.
+            status (Optional[str]): New status ('done' or 'cancelled'), if the broadcast ended.
+        """
+        update_fields = {'shards': shards, 'counts': counts, 'updated_at': datetime.datetime.now().isoformat()}
+        if status:
+            update_fields['status'] = status
+        await self.broadcast_collection.update_one({'_id': broadcast_id}, {'$set': update_fields})
+
+    async def set_broadcast_status(self, broadcast_id: ObjectId, status: str):
+        """
+        Changes the status of a broadcast (e.g. to 'cancelled', so it is not resumed).
+
+        Args:
+            broadcast_id (ObjectId): The broadcast document `_id`.
+            status (str): The new status.
         """
-        return await self.user_collection.count_documents({'type': user_type})
+        await self.broadcast_collection.update_one({'_id': broadcast_id}, {'$set': {'status': status}})
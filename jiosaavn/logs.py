@@ -0,0 +1,129 @@
+"""
+Logging pipeline that keeps log I/O and formatting off the event loop.
+
+The handlers configured in `logging.conf` (console and rotating file) are moved behind a
+`QueueListener` thread; the loggers only put records on a bounded queue. Records whose
+arguments are plain values are formatted by the listener thread, and the INFO and DEBUG
+records of the hot loggers are rate limited per call site.
+"""
+import time
+import queue
+import logging
+import logging.config
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Iterable, List, Tuple
+
+from .metrics import LOG_RECORDS_DROPPED
+
+# Argument types that cannot change between the log call and the listener formatting the record
+DEFERRABLE = (str, int, float, bool, type(None))
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Puts records on the queue without blocking, leaving their formatting to the listener.
+
+    `QueueHandler.prepare` formats every record on the calling thread; this one only merges
+    the message when an argument is mutable (e.g. a response dict the caller may still change).
+    Records that do not fit in a full queue are dropped and counted.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        args = record.args
+        if not isinstance(record.msg, str) or (
+            args and (isinstance(args, dict) or not all(isinstance(arg, DEFERRABLE) for arg in args))
+        ):
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.labels(record.name, "queue_full").inc()
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Rate limits the INFO and DEBUG records of each call site of a logger.
+
+    Every call site (logger and line) gets a token bucket of `per_minute` records that refills
+    continuously. Once it is empty, only every `sample_every`-th record goes through; the next
+    record let through notes how many were dropped in between. Warnings and errors always pass.
+    """
+
+    def __init__(self, per_minute: float, sample_every: int = 0):
+        """
+        Args:
+            per_minute (float): Records each call site may log per minute, and the burst it may log at once.
+            sample_every (int): Keep one in this many records over the limit (0 drops them all).
+        """
+        super().__init__()
+        self.per_minute = per_minute
+        self.sample_every = sample_every
+        # (logger, line) -> [tokens, last refill, dropped since the last record let through]
+        self._sites: Dict[Tuple[str, int], List[float]] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+
+        now = time.monotonic()
+        site = self._sites.get((record.name, record.lineno))
+        if site is None:
+            site = self._sites[(record.name, record.lineno)] = [self.per_minute, now, 0]
+        site[0] = min(self.per_minute, site[0] + (now - site[1]) * self.per_minute / 60)
+        site[1] = now
+
+        if site[0] >= 1:
+            site[0] -= 1
+        elif self.sample_every and (site[2] + 1) % self.sample_every == 0:
+            pass
+        else:
+            site[2] += 1
+            LOG_RECORDS_DROPPED.labels(record.name, "rate_limited").inc()
+            return False
+
+        if site[2] and isinstance(record.msg, str):
+            record.msg = f"{record.msg} [{int(site[2])} similar messages dropped]"
+        site[2] = 0
+        return True
+
+
+def setup_logging(
+    config_file: str,
+    queue_size: int = 10000,
+    rate_limit: float = 0,
+    sample_every: int = 0,
+    hot_loggers: Iterable[str] = ()
+) -> QueueListener:
+    """
+    Configures logging from a `fileConfig` file and moves its root handlers behind a queue.
+
+    Args:
+        config_file (str): The logging configuration, e.g. 'logging.conf'.
+        queue_size (int): Records the queue holds before new ones are dropped (0: unbounded).
+        rate_limit (float): INFO/DEBUG records per minute per call site of the hot loggers (0: no limit).
+        sample_every (int): Keep one in this many records over the rate limit (0 drops them all).
+        hot_loggers (Iterable[str]): Names of the loggers that are rate limited.
+
+    Returns:
+        QueueListener: The started listener; stop it on shutdown to flush the queue.
+    """
+    logging.config.fileConfig(config_file, disable_existing_loggers=False)
+    root = logging.getLogger()
+    handlers = list(root.handlers)
+
+    records = queue.Queue(maxsize=queue_size)
+    for handler in handlers:
+        root.removeHandler(handler)
+    root.addHandler(DeferredQueueHandler(records))
+    listener = QueueListener(records, *handlers, respect_handler_level=True)
+    listener.start()
+
+    if rate_limit > 0:
+        limiter = RateLimitFilter(rate_limit, sample_every)
+        for name in hot_loggers:
+            logging.getLogger(name).addFilter(limiter)
+    return listener
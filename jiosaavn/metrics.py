@@ -0,0 +1,150 @@
+"""
+Prometheus metrics of the bot: download pipeline stages, jobs, MongoDB and update handlers.
+
+API-level metrics live in `api.metrics`; both are exported by the `/metrics` route.
+"""
+import time
+import functools
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from prometheus_client import Counter, Gauge, Histogram, REGISTRY, generate_latest, CONTENT_TYPE_LATEST
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from pymongo import monitoring
+from pyrogram import ContinuePropagation, StopPropagation
+
+JOBS_IN_FLIGHT = Gauge(
+    "bot_jobs_in_flight",
+    "Song downloads and album/playlist/artist batches currently running.",
+    ["kind"],
+)
+DOWNLOAD_STAGE_LATENCY = Histogram(
+    "download_stage_seconds",
+    "Duration of each stage of the song download pipeline.",
+    ["stage", "outcome"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300),
+)
+DOWNLOAD_STAGE_BYTES = Counter(
+    "download_stage_bytes_total",
+    "Bytes moved by the stages of the song download pipeline.",
+    ["stage"],
+)
+MONGO_LATENCY = Histogram(
+    "mongo_command_seconds",
+    "Latency of MongoDB commands.",
+    ["command", "outcome"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+HANDLER_LATENCY = Histogram(
+    "bot_handler_seconds",
+    "Time spent in each Pyrogram update handler.",
+    ["handler", "outcome"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300),
+)
+LOG_RECORDS_DROPPED = Counter(
+    "log_records_dropped_total",
+    "Log records dropped by the rate limits of hot loggers or because the log queue was full.",
+    ["logger", "reason"],
+)
+
+# The collector of the bot running in this process, see `register_stats`
+_stats_collector: Optional["StatsCollector"] = None
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Records the latency of every command the MongoDB driver sends."""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        MONGO_LATENCY.labels(event.command_name, "ok").observe(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        MONGO_LATENCY.labels(event.command_name, "error").observe(event.duration_micros / 1e6)
+
+
+class StatsCollector:
+    """
+    Exports the hit and size statistics the in-process caches already keep.
+
+    Args:
+        caches (Dict[str, Callable[[], Dict[str, Any]]]): Per cache name, a function returning its `stats()`.
+        gauges (Dict[str, Tuple[str, Callable[[], float]]]): Extra values read on every scrape,
+            as a description and a function per metric name.
+        counters (Dict[str, Tuple[str, Callable[[], float]]]): Like `gauges`, for totals that only
+            ever increase; exported with a `_total` suffix.
+    """
+
+    def __init__(
+        self,
+        caches: Dict[str, Callable[[], Dict[str, Any]]],
+        gauges: Dict[str, Tuple[str, Callable[[], float]]],
+        counters: Optional[Dict[str, Tuple[str, Callable[[], float]]]] = None
+    ):
+        self.caches = caches
+        self.gauges = gauges
+        self.counters = counters or {}
+
+    def describe(self):
+        return []
+
+    def collect(self):
+        lookups = CounterMetricFamily("cache_lookups", "In-process cache lookups.", labels=["cache", "result"])
+        evictions = CounterMetricFamily("cache_evictions", "In-process cache evictions.", labels=["cache"])
+        entries = GaugeMetricFamily("cache_entries", "Entries held by an in-process cache.", labels=["cache"])
+        hit_ratio = GaugeMetricFamily("cache_hit_ratio", "Hit ratio of an in-process cache.", labels=["cache"])
+        for name, stats in self.caches.items():
+            stats = stats() or {}
+            if not stats:
+                continue
+            lookups.add_metric([name, "hit"], stats["hits"])
+            lookups.add_metric([name, "miss"], stats["misses"])
+            evictions.add_metric([name], stats["evictions"])
+            entries.add_metric([name], stats["entries"])
+            hit_ratio.add_metric([name], stats["hit_ratio"])
+        yield from (lookups, evictions, entries, hit_ratio)
+
+        for name, (description, value) in self.gauges.items():
+            yield GaugeMetricFamily(name, description, value=value())
+        for name, (description, value) in self.counters.items():
+            yield CounterMetricFamily(name, description, value=value())
+
+
+def register_stats(collector: StatsCollector) -> None:
+    """
+    Registers the statistics of the bot in this process, replacing those of an earlier bot.
+
+    Args:
+        collector (StatsCollector): The collector of the new bot.
+    """
+    global _stats_collector
+    if _stats_collector is not None:
+        REGISTRY.unregister(_stats_collector)
+    REGISTRY.register(collector)
+    _stats_collector = collector
+
+
+def timed_handler(callback: Callable) -> Callable:
+    """Wraps a Pyrogram handler callback to record its latency under the callback's name."""
+
+    @functools.wraps(callback)
+    async def wrapper(client, *args):
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            result = await callback(client, *args)
+            outcome = "ok"
+            return result
+        except (StopPropagation, ContinuePropagation):
+            outcome = "ok"
+            raise
+        finally:
+            HANDLER_LATENCY.labels(callback.__name__, outcome).observe(time.perf_counter() - started)
+
+    return wrapper
+
+
+def render_metrics() -> bytes:
+    """Renders every registered metric in the Prometheus text format."""
+    return generate_latest(REGISTRY)
+
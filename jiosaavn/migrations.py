@@ -0,0 +1,155 @@
+"""
+Background data migrations and maintenance jobs run by the bot.
+"""
+import asyncio
+import logging
+from collections import defaultdict
+from typing import List, Optional
+
+from pyrogram.errors import FloodWait
+
+from .utils import audio_fields
+from .database.database import SONG_QUALITIES
+
+logger = logging.getLogger(__name__)
+
+
+
+async def dedupe_song_ids(client):
+    """
+    Merges song documents that were registered more than once for the same song ID.
+
+    Concurrent requests for a new song used to insert one placeholder document each.
+    The duplicates are folded into the document holding the most uploads: missing
+    uploads are taken over from the others and their request counts are added up.
+    Runs before index creation, since duplicates block the unique index on `id`.
+
+    Args:
+        client (Bot): The bot whose database is cleaned up.
+    """
+    collection = client.db.id_collection
+    indexes = await collection.index_information()
+    if any(index['key'] == [('id', 1)] and index.get('unique') for index in indexes.values()):
+        return
+
+    def uploads(song: dict) -> int:
+        return sum(1 for quality in SONG_QUALITIES if (song.get(quality) or {}).get('message_id'))
+
+    merged = removed = 0
+    pipeline = [
+        {'$group': {'_id': '$id', 'count': {'$sum': 1}}},
+        {'$match': {'count': {'$gt': 1}}}
+    ]
+    async for group in collection.aggregate(pipeline, allowDiskUse=True):
+        songs = await collection.find({'id': group['_id']}).sort('_id', 1).to_list(length=None)
+        keeper = max(songs, key=uploads)
+        duplicates = [song for song in songs if song['_id'] != keeper['_id']]
+
+        update_fields = {'requests': sum(song.get('requests', 0) for song in songs)}
+        for quality in SONG_QUALITIES:
+            if (keeper.get(quality) or {}).get('message_id'):
+                continue
+            for song in duplicates:
+                if (song.get(quality) or {}).get('message_id'):
+                    update_fields[quality] = song[quality]
+                    break
+
+        await collection.update_one({'_id': keeper['_id']}, {'$set': update_fields})
+        result = await collection.delete_many({'_id': {'$in': [song['_id'] for song in duplicates]}})
+        merged += 1
+        removed += result.deleted_count
+
+    # Drop the non-unique stand-in so the unique index can be built
+    if 'id_unique_dup' in indexes:
+        await collection.drop_index('id_unique_dup')
+
+    if merged:
+        logger.info("🗂 Merged %s duplicated song IDs, removed %s duplicate documents", merged, removed)
+
+
+async def backfill_file_ids(client, batch_size: int = 200, delay: float = 2.0):
+    """
+    Stores Telegram file IDs for songs uploaded before they were recorded.
+
+    Stored messages are fetched in batches of up to `batch_size` per chat (one
+    `get_messages` call each), pausing `delay` seconds between batches to stay well
+    below Telegram's rate limits. Messages that Telegram reports as deleted or without
+    audio are flagged so they are not retried; songs whose chat could not be read are
+    left for the next run.
+
+    Args:
+        client (Bot): The running bot.
+        batch_size (int): Maximum number of messages fetched per call.
+        delay (float): Seconds to wait between batches.
+    """
+    total = 0
+    for quality in SONG_QUALITIES:
+        after = None
+        while True:
+            songs = await client.db.get_songs_without_file_id(quality, limit=batch_size, after=after)
+            if not songs:
+                break
+            after = songs[-1]['_id']
+
+            by_chat = defaultdict(dict)
+            for song in songs:
+                record = song[quality]
+                by_chat[int(record['chat_id'])][int(record['message_id'])] = song['id']
+
+            for chat_id, song_ids in by_chat.items():
+                messages = await fetch_stored_messages(client, chat_id, list(song_ids))
+                for song_msg in messages or []:
+                    song_id = song_ids.get(song_msg.id)
+                    if song_id is None:
+                        continue
+                    if song_msg.empty or not song_msg.audio:
+                        await client.db.mark_song_file_id_missing(song_id, quality)
+                        continue
+                    await client.db.update_song(song_id, quality, chat_id, song_msg.id, **audio_fields(song_msg))
+                    total += 1
+
+                await asyncio.sleep(delay)
+
+    if total:
+        logger.info("🗂 Backfilled file IDs for %s stored songs", total)
+
+
+async def fetch_stored_messages(client, chat_id: int, message_ids: List[int], attempts: int = 3) -> Optional[list]:
+    """
+    Fetches stored song messages, waiting out FloodWaits.
+
+    Args:
+        client (Bot): The running bot.
+        chat_id (int): The chat holding the messages.
+        message_ids (List[int]): The messages to fetch.
+        attempts (int): Calls made before giving up on FloodWaits.
+
+    Returns:
+        Optional[list]: The messages, or None if they could not be fetched.
+    """
+    for _ in range(attempts):
+        try:
+            return await client.get_messages(chat_id=chat_id, message_ids=message_ids)
+        except FloodWait as e:
+            logger.warning("⏳ FloodWait of %ss while backfilling file IDs", e.value)
+            await asyncio.sleep(e.value)
+        except Exception as e:
+            logger.warning("⚠️ Could not fetch stored songs in chat %s, retrying them on the next run: %s", chat_id, e)
+            return None
+    return None
+
+
+async def reconcile_counters_loop(client, interval: float):
+    """
+    Recomputes the user counters on startup and then every `interval` seconds.
+
+    Args:
+        client (Bot): The running bot.
+        interval (float): Seconds between reconciliations (0 runs it once).
+    """
+    while True:
+        counters = await client.db.reconcile_user_counters()
+        logger.info("🧮 Reconciled user counters: %s users, %s banned", counters['total'], counters['banned'])
+        if interval <= 0:
+            return
+        await asyncio.sleep(interval)
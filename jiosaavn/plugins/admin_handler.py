@@ -1,18 +1,29 @@
 import asyncio
 import datetime
+import functools
 import logging
+from typing import Optional
 
 from jiosaavn.bot import Bot
-from jiosaavn.config.settings import OWNER_ID
+from jiosaavn.config.settings import (
+    OWNER_ID, STORAGE_CHANNEL, PREWARM_QUALITIES, PREWARM_RATE, BROADCAST_RATE, BROADCAST_WORKERS,
+    BROADCAST_SHARDS
+)
+from jiosaavn.prewarm import prewarm
+from jiosaavn.broadcast import send_broadcast
+from jiosaavn.utils import safe_edit_text
 
 from pyrogram import filters
 from pyrogram.types import Message, InlineKeyboardButton, InlineKeyboardMarkup
-from pyrogram.errors import FloodWait, UserIsBlocked, InputUserDeactivated
 
 logger = logging.getLogger(__name__)
 
+# The broadcast currently running in this process
+broadcast_task: Optional[asyncio.Task] = None
+
 def is_owner(func):
     """Decorator to check if the user is the owner."""
+    @functools.wraps(func)
     async def wrapper(client: Bot, message: Message):
         if OWNER_ID == 0:
             await message.reply_text(
@@ -39,61 +50,45 @@ def is_owner(func):
         return await func(client, message)
     return wrapper
 
-@Bot.on_message(filters.command('stats') & filters.private & filters.incoming)
-@is_owner
-async def stats_handler(client: Bot, message: Message):
-    """Handle the stats command."""
-    try:
-        # Get statistics from database
-        total_users = await client.db.get_total_users()
-        banned_users = await client.db.get_banned_users_count()
-        active_users = total_users - banned_users
-        
-        # Get users by quality
-        quality_320 = await client.db.get_users_by_quality('320kbps')
-        quality_160 = await client.db.get_users_by_quality('160kbps')
-        quality_96 = await client.db.get_users_by_quality('96kbps')
-        quality_48 = await client.db.get_users_by_quality('48kbps')
-        
-        # Get users by type
-        type_all = await client.db.get_users_by_type('all')
-        type_song = await client.db.get_users_by_type('song')
-        
-        # Get today's new users
-        today = datetime.date.today().isoformat()
-        today_users = await client.db.get_users_by_date(today)
-        
-        # Create stats message
-        stats_text = f"""
+def stats_text(stats: dict) -> str:
+    """Builds the /stats message from a `Database.get_stats_snapshot` result."""
+    quality, user_type = stats['quality'], stats['type']
+    return f"""
 📊 **Bot Statistics**
 
 👥 **User Statistics:**
-├ Total Users: `{total_users:,}`
-├ Active Users: `{active_users:,}`
-├ Banned Users: `{banned_users:,}`
-└ New Users Today: `{today_users:,}`
+├ Total Users: `{stats['total']:,}`
+├ Active Users: `{stats['active']:,}`
+├ Banned Users: `{stats['banned']:,}`
+└ New Users Today: `{stats['today']:,}`
 
 🎵 **Quality Preferences:**
-├ 320kbps: `{quality_320:,}` users
-├ 160kbps: `{quality_160:,}` users
-├ 96kbps: `{quality_96:,}` users
-└ 48kbps: `{quality_48:,}` users
+├ 320kbps: `{quality['320kbps']:,}` users
+├ 160kbps: `{quality['160kbps']:,}` users
+├ 96kbps: `{quality['96kbps']:,}` users
+└ 48kbps: `{quality['48kbps']:,}` users
 
 📁 **Type Preferences:**
-├ All (Songs + Albums): `{type_all:,}` users
-└ Songs Only: `{type_song:,}` users
+├ All (Songs + Albums): `{user_type['all']:,}` users
+└ Songs Only: `{user_type['song']:,}` users
 
 📅 **Date:** `{datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')} UTC`
         """
-        
-        buttons = [[
-            InlineKeyboardButton('🔄 Refresh', callback_data='refresh_stats'),
-            InlineKeyboardButton('❌ Close', callback_data='close_stats')
-        ]]
-        
+
+STATS_BUTTONS = InlineKeyboardMarkup([[
+    InlineKeyboardButton('🔄 Refresh', callback_data='refresh_stats'),
+    InlineKeyboardButton('❌ Close', callback_data='close_stats')
+]])
+
+@Bot.on_message(filters.command('stats') & filters.private & filters.incoming)
+@is_owner
+async def stats_handler(client: Bot, message: Message):
+    """Handle the stats command."""
+    try:
+        stats = await client.db.get_stats_snapshot()
         await message.reply_text(
-            stats_text, 
-            reply_markup=InlineKeyboardMarkup(buttons),
+            stats_text(stats), 
+            reply_markup=STATS_BUTTONS,
             quote=True
         )
         
@@ -109,52 +104,10 @@ async def refresh_stats_callback(client: Bot, callback):
         return
     
     try:
-        # Get fresh statistics
-        total_users = await client.db.get_total_users()
-        banned_users = await client.db.get_banned_users_count()
-        active_users = total_users - banned_users
-        
-        quality_320 = await client.db.get_users_by_quality('320kbps')
-        quality_160 = await client.db.get_users_by_quality('160kbps')
-        quality_96 = await client.db.get_users_by_quality('96kbps')
-        quality_48 = await client.db.get_users_by_quality('48kbps')
-        
-        type_all = await client.db.get_users_by_type('all')
-        type_song = await client.db.get_users_by_type('song')
-        
-        today = datetime.date.today().isoformat()
-        today_users = await client.db.get_users_by_date(today)
-        
-        stats_text = f"""
-📊 **Bot Statistics**
-
-👥 **User Statistics:**
-├ Total Users: `{total_users:,}`
-├ Active Users: `{active_users:,}`
-├ Banned Users: `{banned_users:,}`
-└ New Users Today: `{today_users:,}`
-
-🎵 **Quality Preferences:**
-├ 320kbps: `{quality_320:,}` users
-├ 160kbps: `{quality_160:,}` users
-├ 96kbps: `{quality_96:,}` users
-└ 48kbps: `{quality_48:,}` users
-
-📁 **Type Preferences:**
-├ All (Songs + Albums): `{type_all:,}` users
-└ Songs Only: `{type_song:,}` users
-
-📅 **Date:** `{datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')} UTC`
-        """
-        
-        buttons = [[
-            InlineKeyboardButton('🔄 Refresh', callback_data='refresh_stats'),
-            InlineKeyboardButton('❌ Close', callback_data='close_stats')
-        ]]
-        
+        stats = await client.db.get_stats_snapshot()
         await callback.message.edit_text(
-            stats_text, 
-            reply_markup=InlineKeyboardMarkup(buttons)
+            stats_text(stats), 
+            reply_markup=STATS_BUTTONS
         )
         await callback.answer("✅ Statistics refreshed!")
         
@@ -176,10 +129,39 @@ async def close_stats_callback(client: Bot, callback):
 @is_owner
 async def broadcast_handler(client: Bot, message: Message):
     """Handle the broadcast command."""
-    if not message.reply_to_message:
+    global broadcast_task
+    args = message.command[1:]
+
+    if args and args[0] == "cancel":
+        if not broadcast_task or broadcast_task.done():
+            await message.reply_text("⚠️ **No broadcast is running.**")
+            return
+        broadcast_task.cancel()
+        broadcast = await client.db.get_unfinished_broadcast()
+        if broadcast:
+            await client.db.set_broadcast_status(broadcast['_id'], 'cancelled')
+        await message.reply_text("🛑 **Broadcast cancelled.**", quote=True)
+        return
+
+    if broadcast_task and not broadcast_task.done():
+        await message.reply_text("⚠️ **A broadcast is already running.** Use `/broadcast cancel` to stop it.")
+        return
+
+    if args and args[0] == "resume":
+        broadcast = await client.db.get_unfinished_broadcast()
+        if not broadcast:
+            await message.reply_text("⚠️ **No interrupted broadcast to resume.**")
+            return
+    elif message.reply_to_message:
+        broadcast = await client.db.create_broadcast(
+            message.chat.id, message.reply_to_message.id, shards=BROADCAST_SHARDS
+        )
+    else:
         await message.reply_text(
             "📢 **Broadcast Usage:**\n\n"
-            "Reply to a message with `/broadcast` to send it to all users.\n\n"
+            "Reply to a message with `/broadcast` to send it to all users.\n"
+            "`/broadcast resume` - Continue an interrupted broadcast\n"
+            "`/broadcast cancel` - Stop the running broadcast\n\n"
             "**Supported message types:**\n"
             "• Text messages\n"
             "• Photos\n"
@@ -191,141 +173,105 @@ async def broadcast_handler(client: Bot, message: Message):
             "• Animations/GIFs"
         )
         return
-    
-    # Get the message to broadcast
-    broadcast_message = message.reply_to_message
-    
+
     # Start broadcasting immediately without confirmation
     total_users = await client.db.get_total_users()
+    broadcast_message = message.reply_to_message
+    preview = '[Resumed Broadcast]' if not broadcast_message else (
+        f"{broadcast_message.text[:50]}{'...' if len(broadcast_message.text) > 50 else ''}"
+        if broadcast_message.text else '[Media Message]'
+    )
     status_msg = await message.reply_text(
         f"📢 **Broadcasting...**\n\n"
         f"Starting broadcast to **{total_users:,}** users...\n"
-        f"**Message Preview:** {broadcast_message.text[:50] if broadcast_message.text else '[Media Message]'}{'...' if broadcast_message.text and len(broadcast_message.text) > 50 else ''}",
+        f"**Message Preview:** {preview}",
         quote=True
     )
-    
-    # Initialize counters
-    success_count = 0
-    failed_count = 0
-    blocked_count = 0
-    deleted_count = 0
-    
+    broadcast_task = client.run_in_background(run_broadcast(client, broadcast, status_msg), "broadcast")
+
+async def run_broadcast(client: Bot, broadcast: dict, status_msg: Message):
+    """Runs a broadcast and keeps its status message updated."""
     start_time = datetime.datetime.now()
-    
+
+    async def report_progress(counts: dict):
+        await safe_edit_text(
+            status_msg,
+            f"📢 **Broadcasting...**\n\n"
+            f"✅ Sent: {counts['sent']:,}\n"
+            f"❌ Failed: {counts['failed']:,}\n"
+            f"🚫 Blocked: {counts['blocked']:,}\n"
+            f"👻 Deleted: {counts['deleted']:,}"
+        )
+
     try:
-        # Get all users and broadcast
-        async for user in client.db.get_all_users():
-            try:
-                user_id = user['id']
-                
-                # Send the message based on type
-                if broadcast_message.text:
-                    await client.send_message(
-                        chat_id=user_id,
-                        text=broadcast_message.text,
-                        entities=broadcast_message.entities,
-                        disable_web_page_preview=True
-                    )
-                elif broadcast_message.photo:
-                    await client.send_photo(
-                        chat_id=user_id,
-                        photo=broadcast_message.photo.file_id,
-                        caption=broadcast_message.caption,
-                        caption_entities=broadcast_message.caption_entities
-                    )
-                elif broadcast_message.video:
-                    await client.send_video(
-                        chat_id=user_id,
-                        video=broadcast_message.video.file_id,
-                        caption=broadcast_message.caption,
-                        caption_entities=broadcast_message.caption_entities
-                    )
-                elif broadcast_message.document:
-                    await client.send_document(
-                        chat_id=user_id,
-                        document=broadcast_message.document.file_id,
-                        caption=broadcast_message.caption,
-                        caption_entities=broadcast_message.caption_entities
-                    )
-                elif broadcast_message.audio:
-                    await client.send_audio(
-                        chat_id=user_id,
-                        audio=broadcast_message.audio.file_id,
-                        caption=broadcast_message.caption,
-                        caption_entities=broadcast_message.caption_entities
-                    )
-                elif broadcast_message.voice:
-                    await client.send_voice(
-                        chat_id=user_id,
-                        voice=broadcast_message.voice.file_id,
-                        caption=broadcast_message.caption,
-                        caption_entities=broadcast_message.caption_entities
-                    )
-                elif broadcast_message.sticker:
-                    await client.send_sticker(
-                        chat_id=user_id,
-                        sticker=broadcast_message.sticker.file_id
-                    )
-                elif broadcast_message.animation:
-                    await client.send_animation(
-                        chat_id=user_id,
-                        animation=broadcast_message.animation.file_id,
-                        caption=broadcast_message.caption,
-                        caption_entities=broadcast_message.caption_entities
-                    )
-                
-                success_count += 1
-                
-                # Update progress every 50 successful sends
-                if success_count % 50 == 0:
-                    await status_msg.edit_text(
-                        f"📢 **Broadcasting...**\n\n"
-                        f"✅ Sent: {success_count:,}\n"
-                        f"❌ Failed: {failed_count:,}\n"
-                        f"🚫 Blocked: {blocked_count:,}\n"
-                        f"👻 Deleted: {deleted_count:,}"
-                    )
-                
-            except FloodWait as e:
-                await asyncio.sleep(e.value)
-                failed_count += 1
-            except UserIsBlocked:
-                blocked_count += 1
-            except InputUserDeactivated:
-                deleted_count += 1
-            except Exception as e:
-                failed_count += 1
-                logger.error(f"Error broadcasting to user {user.get('id', 'unknown')}: {e}")
-            
-            # Small delay to avoid flooding
-            await asyncio.sleep(0.03)
-    
+        counts = await send_broadcast(
+            client, broadcast, rate=BROADCAST_RATE, workers=BROADCAST_WORKERS, on_progress=report_progress
+        )
+    except asyncio.CancelledError:
+        await safe_edit_text(status_msg, "🛑 **Broadcast Stopped**")
+        raise
     except Exception as e:
         logger.error(f"Error during broadcast: {e}")
-        await status_msg.edit_text(f"❌ **Broadcast Failed**\n\nError: {str(e)}")
+        await safe_edit_text(status_msg, f"❌ **Broadcast Failed**\n\nError: {str(e)}\n\nUse `/broadcast resume` to continue.")
         return
-    
+
     # Calculate broadcast duration
     end_time = datetime.datetime.now()
     duration = end_time - start_time
-    
+
     # Final broadcast report
-    total_sent = success_count + failed_count + blocked_count + deleted_count
+    total_sent = sum(counts.values())
     final_text = f"""
 📢 **Broadcast Completed!**
 
 📊 **Final Statistics:**
 ├ Total Users: `{total_sent:,}`
-├ ✅ Successfully Sent: `{success_count:,}`
-├ ❌ Failed: `{failed_count:,}`
-├ 🚫 Blocked Bot: `{blocked_count:,}`
-└ 👻 Deleted Account: `{deleted_count:,}`
+├ ✅ Successfully Sent: `{counts['sent']:,}`
+├ ❌ Failed: `{counts['failed']:,}`
+├ 🚫 Blocked Bot: `{counts['blocked']:,}`
+└ 👻 Deleted Account: `{counts['deleted']:,}`
 
 ⏱️ **Duration:** `{str(duration).split('.')[0]}`
 📅 **Completed:** `{end_time.strftime('%Y-%m-%d %H:%M:%S')} UTC`
     """
-    
-    await status_msg.edit_text(final_text)
+
+    await safe_edit_text(status_msg, final_text)
+
+@Bot.on_message(filters.command('prewarm') & filters.private & filters.incoming)
+@is_owner
+async def prewarm_handler(client: Bot, message: Message):
+    """Handle the prewarm command."""
+    if not STORAGE_CHANNEL:
+        await message.reply_text("⚠️ **Storage Channel Not Set**\n\nSet the `STORAGE_CHANNEL` environment variable to use pre-warming.")
+        return
+
+    args = message.command[1:]
+    if not args:
+        await message.reply_text(
+            "🔥 **Pre-warm Usage:**\n\n"
+            "`/prewarm <links or IDs>` - Upload songs, albums or playlists to the storage channel\n"
+            "`/prewarm top [count]` - Upload the most requested songs"
+        )
+        return
+
+    if args[0] == "top":
+        count = int(args[1]) if len(args) > 1 and args[1].isdigit() else 100
+        items = await client.db.get_most_requested_songs(limit=count)
+    else:
+        items = args
+
+    status_msg = await message.reply_text(f"🔥 **Pre-warming started** for {len(items)} item(s)...", quote=True)
+
+    async def run():
+        counts = await prewarm(client, items, PREWARM_QUALITIES, PREWARM_RATE)
+        await status_msg.edit_text(
+            f"🔥 **Pre-warm Completed!**\n\n"
+            f"├ ✅ Stored: `{counts['stored']:,}`\n"
+            f"├ 💾 Already Cached: `{counts['cached']:,}`\n"
+            f"└ ❌ Failed: `{counts['failed']:,}`"
+        )
+
+    client.run_in_background(run(), "prewarm command")
 
 # Additional callback handlers for new user notifications
 
@@ -359,6 +305,7 @@ async def admin_broadcast_help_callback(client: Bot, callback):
 3. Done! ✅
 
 You'll get real-time progress updates during broadcasting.
+Use `/broadcast resume` to continue an interrupted broadcast.
     """
     
     await callback.message.edit_text(
@@ -1,8 +1,8 @@
-import html
 import logging
 import traceback
 
 from api.jiosaavn import Jiosaavn
+from api.models import Artist
 from jiosaavn.bot import Bot
 from jiosaavn.utils import safe_edit
 
@@ -65,55 +65,22 @@ async def artist(client: Bot, callback: CallbackQuery):
             reply_markup=reply_markup
         )
 
-    name = response.get("name")
-    songs = response.get("topSongs")
-    total_results = response.get("count", 0)
-    
-    # Handle image URL - different formats between APIs
-    image_url = None
-    image_data = response.get("image")
-    if isinstance(image_data, str):
-        # Official API format - direct string
-        image_url = image_data.replace("150x150", "500x500") if image_data else None
-    elif isinstance(image_data, list) and len(image_data) > 0:
-        # Fallback API format - list of image objects
-        # Get the highest quality image (usually the last one)
-        image_url = image_data[-1].get("url", "") if image_data[-1] else None
-    elif isinstance(image_data, dict):
-        # Some APIs return image as dict
-        image_url = image_data.get("url", "")
-    
-    artist_url = response.get("urls", {}).get("songs")
-    follower_count = int(response.get("follower_count", "0"))
-    dob = response.get("dob")
+    artist_info = Artist.from_api(response)
 
     buttons = []
-    for song in songs:
-        try:
-            # Handle different title fields between APIs
-            song_title = song.get("title") or song.get("name", "")
-            song_title = html.unescape(str(song_title))
-            button_label = f"🎙 {song_title}" if song_title else f"🎙 Song"
-            
-            # Try to get song ID from multiple possible fields
-            song_id = song.get("id")
-            if not song_id and song.get("perma_url"):
-                song_id = song.get("perma_url", "").rsplit("/", 1)[1]
-            
-            if song_id:
-                # Create proper callback data for songs with back navigation
-                if back_type:
-                    callback_data = f"song#{song_id}#{artist_id}#artist#{back_type}"
-                else:
-                    callback_data = f"song#{song_id}#{artist_id}#artist"
-                buttons.append([InlineKeyboardButton(button_label, callback_data=callback_data)])
-        except (IndexError, AttributeError) as e:
-            logger.debug(f"Error processing artist song: {e}")
-            pass
+    for song in artist_info.songs:
+        if not song.id:
+            continue
+        # Create proper callback data for songs with back navigation
+        if back_type:
+            callback_data = f"song#{song.id}#{artist_id}#artist#{back_type}"
+        else:
+            callback_data = f"song#{song.id}#{artist_id}#artist"
+        buttons.append([InlineKeyboardButton(f"🎙 {song.title}" if song.title else "🎙 Song", callback_data=callback_data)])
 
     # Calculate pagination properly
     songs_per_page = 10  # Number of songs shown per page
-    total_pages = (total_results + songs_per_page - 1) // songs_per_page  # Ceiling division
+    total_pages = (artist_info.song_count + songs_per_page - 1) // songs_per_page  # Ceiling division
     
     # Add navigation buttons only if we have multiple pages
     navigation_buttons = []
@@ -134,28 +101,28 @@ async def artist(client: Bot, callback: CallbackQuery):
     text_data = []
     
     # Add invisible image link if available
-    if image_url:
-        text_data.append(f"[\u2063]({image_url})")
+    if artist_info.image_url:
+        text_data.append(f"[\u2063]({artist_info.image_url})")
     
     # Add artist information
-    if name:
-        if artist_url:
-            text_data.append(f"**👨‍🎤 Artist:** [{name}]({artist_url})")
+    if artist_info.name:
+        if artist_info.url:
+            text_data.append(f"**👨‍🎤 Artist:** [{artist_info.name}]({artist_info.url})")
         else:
-            text_data.append(f"**👨‍🎤 Artist:** {name}")
+            text_data.append(f"**👨‍🎤 Artist:** {artist_info.name}")
     
     # Add statistics
-    if total_results:
-        text_data.append(f"**🎵 Available Songs:** {total_results:,}")
+    if artist_info.song_count:
+        text_data.append(f"**🎵 Available Songs:** {artist_info.song_count:,}")
     
-    if follower_count:
-        text_data.append(f"**👥 Followers:** {follower_count:,}")
+    if artist_info.followers:
+        text_data.append(f"**👥 Followers:** {artist_info.followers:,}")
     
-    if dob:
-        text_data.append(f"**📆 Date of Birth:** __{dob}__")
+    if artist_info.dob:
+        text_data.append(f"**📆 Date of Birth:** __{artist_info.dob}__")
     
     # Add pagination info if needed
-    if total_results > 10:
+    if artist_info.song_count > 10:
         text_data.append(f"**📜 Page:** {page_no}")
     
     # Join all text data
@@ -12,15 +12,12 @@ logger = logging.getLogger(__name__)
 @Bot.on_callback_query(filters.regex('^home$'))
 @Bot.on_message(filters.command('start') & filters.private & filters.incoming)
 async def start_handler(client: Bot, message: Message | CallbackQuery):
-    # Check if it's a new user (only for Message, not CallbackQuery)
+    # Register the user if new (only for Message, not CallbackQuery)
     is_new_user = False
     if isinstance(message, Message):
-        is_new_user = not await client.db.is_user_exist(message.from_user.id)
+        is_new_user = await client.db.add_user(message.from_user.id) is not None
         
-        # Add user to database if new
         if is_new_user:
-            await client.db.add_user(message.from_user.id)
-            
             # Send notification to owner about new user
             if OWNER_ID and OWNER_ID != 0:
                 try:
@@ -1,14 +1,28 @@
+import io
 import os
-import html
 import time
+import uuid
 import shutil
+import socket
+import asyncio
 import logging
+from itertools import islice
+from collections import deque
+from typing import Dict, List, Optional, Tuple
 
 from jiosaavn.bot import Bot
-from jiosaavn.utils import safe_edit
+from jiosaavn.utils import safe_edit, audio_fields, SpooledBuffer
+from jiosaavn.metrics import JOBS_IN_FLIGHT
+from jiosaavn.tracing import DownloadTrace
+from jiosaavn.config.settings import (
+    UPLOAD_LEASE_TTL, BATCH_CONCURRENCY, BATCH_PROGRESS_INTERVAL, STREAM_UPLOADS, STREAM_MEMORY_LIMIT,
+    STORAGE_CHANNEL
+)
 from api.jiosaavn import Jiosaavn
+from api.breaker import cdn_endpoint
+from api.models import Artist, Collection, Song
+from api.session import client_session
 
-import aiohttp
 import aiofiles
 from pyrogram import filters
 from pyrogram.types import Message, CallbackQuery
@@ -16,6 +30,11 @@ from pyrogram.enums import ChatAction
 
 logger = logging.getLogger(__name__)
 
+# Jobs uploading a song in this process, keyed by (song_id, quality)
+pending_uploads: Dict[Tuple[str, str], "SongJob"] = {}
+# Identifies this process when holding an upload lease in the database
+LEASE_OWNER = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
 @Bot.on_callback_query(filters.regex(r"^upload#"))
 @Bot.on_message(filters.regex(r"http.*") & filters.private & filters.incoming)
 async def download(client: Bot, message: Message|CallbackQuery):
@@ -40,7 +59,6 @@ async def download(client: Bot, message: Message|CallbackQuery):
     if search_type == "song":
         await download_tool(client, message, msg, item_id)
     elif search_type in ("album", "playlist", "artist"):
-        page_no = 1
         album_id = item_id if search_type == "album" else None
         playlist_id = item_id if search_type == "playlist" else None
         artist_id = item_id if search_type == "artist" else None
@@ -50,79 +68,44 @@ async def download(client: Bot, message: Message|CallbackQuery):
         if isinstance(message, Message):
             original_url = message.text
 
-        # Get playlist/album/artist data
+        # Get the whole playlist/album/artist track list, shared with the paginated views
         try:
             jiosaavn = Jiosaavn()
             
             if search_type == "artist":
-                response = await jiosaavn.get_artist(artist_id=artist_id, page_no=page_no)
-                if response and response.get("topSongs"):
-                    # Convert artist response to common format
-                    response = {
-                        "list": response["topSongs"],
-                        "title": response.get("name", "Unknown Artist"),
-                        "list_count": response.get("count", len(response["topSongs"]))
-                    }
+                response = await jiosaavn.get_artist_catalog(artist_id=artist_id)
+                entity = Artist.from_api(response) if response else None
             else:
-                response = await jiosaavn.get_playlist_or_album(
+                response = await jiosaavn.get_collection(
                     album_id=album_id, 
                     playlist_id=playlist_id, 
-                    page_no=page_no,
                     original_url=original_url
                 )
+                entity = Collection.from_api(response) if response else None
             
-            if not response or not response.get("list"):
+            if not entity or not entity.songs:
                 await safe_edit(msg, f"**No songs found in this {search_type}.**\n\nThis might be due to:\n• Invalid {search_type} ID\n• {search_type.title()} removed from JioSaavn\n• Temporary API issues")
                 return
             
             # Download all songs from the playlist/album/artist
-            songs = response["list"]
+            songs = entity.songs
             total_songs = len(songs)
             
-            if total_songs == 0:
-                await safe_edit(msg, f"**This {search_type} is empty.**")
-                return
-            
             # Limit to a reasonable number to prevent overwhelming
             MAX_SONGS = 50
             if total_songs > MAX_SONGS:
                 songs = songs[:MAX_SONGS]
                 total_songs = MAX_SONGS
-                await safe_edit(msg, f"**Found {response.get('list_count', 'many')} songs, downloading first {MAX_SONGS}...**")
+                await safe_edit(msg, f"**Found {entity.song_count or 'many'} songs, downloading first {MAX_SONGS}...**")
             else:
                 await safe_edit(msg, f"**Found {total_songs} songs. Starting download...**")
             
-            download_success = 0
-            download_failed = 0
-            
-            for i, song in enumerate(songs, 1):
-                # Try to get song ID from multiple possible fields
-                song_id = song.get("id")
-                if not song_id:
-                    song_url = song.get("perma_url", "")
-                    if song_url and "/" in song_url:
-                        song_id = song_url.rsplit("/", 1)[-1]
-                
-                if not song_id:
-                    logger.warning(f"Could not extract song ID from song: {song}")
-                    download_failed += 1
-                    continue
-                
-                # Update progress
-                progress_msg = f"**Downloading song {i}/{total_songs}...**"
-                try:
-                    await safe_edit(msg, progress_msg)
-                except:
-                    pass  # Continue if edit fails
-                
-                try:
-                    # Pass a flag to indicate this is a batch download
-                    await download_tool(client, message, msg, song_id, is_batch_download=True)
-                    download_success += 1
-                except Exception as e:
-                    logger.error(f"Failed to download song {song_id}: {e}")
-                    download_failed += 1
-                    continue
+            song_ids = [song.id for song in songs if song.id]
+            if len(song_ids) < total_songs:
+                logger.warning("Could not extract song IDs of %s songs in %s %s", total_songs - len(song_ids), search_type, item_id)
+
+            download_success, download_failed = await batch_download(client, message, msg, song_ids, search_type)
+            download_failed += total_songs - len(song_ids)
             
             # Final status message
             if download_success > 0:
@@ -134,379 +117,538 @@ async def download(client: Bot, message: Message|CallbackQuery):
                 await safe_edit(msg, f"**❌ Failed to download any songs from this {search_type}.**")
                 
         except Exception as e:
-            logger.error(f"Error processing {search_type}: {e}")
+            logger.error("Error processing %s: %s", search_type, e)
             await safe_edit(msg, f"**❌ Error processing {search_type}: {str(e)}**")
     else:
         await safe_edit(msg, "Podcast upload not supported.")
         return
 
-async def download_tool(client: Bot, message: Message|CallbackQuery, msg: Message, song_id: str, is_batch_download: bool = False):
-    is_exist = await client.db.is_song_id_exist(song_id)
+async def batch_download(client: Bot, message: Message|CallbackQuery, msg: Message, song_ids: List[str], search_type: str) -> Tuple[int, int]:
+    """
+    Downloads and uploads a list of songs with bounded concurrency.
+
+    Up to `BATCH_CONCURRENCY` songs are fetched and downloaded ahead while earlier songs
+    are being uploaded, but songs are delivered strictly in their original order. Progress
+    for the whole batch is reported in the single status message `msg`.
+
+    Returns:
+        Tuple[int, int]: The number of songs delivered and the number that failed.
+    """
     user = await client.db.get_user(message.from_user.id)
     quality = user['quality']
-    bitrate = 320 if quality == "320kbps" else 160
+    total = len(song_ids)
+    success = failed = 0
+    last_progress = 0.0
+
+    batch = object()
+
+    def start(song_id: str) -> asyncio.Task:
+        return asyncio.create_task(prepare_song(client, message.from_user.id, song_id, quality, batch=batch))
+
+    upcoming = iter(song_ids)
+    window = deque(start(song_id) for song_id in islice(upcoming, BATCH_CONCURRENCY))
+    JOBS_IN_FLIGHT.labels("batch").inc()
+    try:
+        while window:
+            job = await window.popleft()
+            next_song_id = next(upcoming, None)
+            if next_song_id:
+                window.append(start(next_song_id))
+
+            try:
+                delivered = await deliver_song(client, message, msg, job, is_batch_download=True)
+            except Exception as e:
+                logger.error("Failed to deliver song %s: %s", job.song_id, e)
+                delivered = False
+            job.trace.emit("delivered" if delivered else "failed")
+            if delivered:
+                success += 1
+            else:
+                failed += 1
+
+            done = success + failed
+            if done < total and time.monotonic() - last_progress >= BATCH_PROGRESS_INTERVAL:
+                last_progress = time.monotonic()
+                await safe_edit(
+                    msg,
+                    f"**📥 Downloading {search_type}...**\n\n"
+                    f"**Progress:** {done}/{total}\n"
+                    f"**✅ Sent:** {success}\n"
+                    f"**❌ Failed:** {failed}"
+                )
+    finally:
+        JOBS_IN_FLIGHT.labels("batch").dec()
+        # Release anything still claimed if the batch is interrupted
+        for task in window:
+            task.cancel()
+        for task in window:
+            try:
+                job = await task
+            except asyncio.CancelledError:
+                continue
+            cleanup_download(job.prepared)
+            await finish_upload(client, job, None)
+
+    return success, failed
+
+class SongJob:
+    """
+    State of one song moving through the download pipeline.
+
+    A job is first prepared (cache lookup, upload claim, metadata and audio download) and
+    then delivered to the user, either as a copy of an existing upload or as a new upload.
+    """
+
+    def __init__(self, song_id: str, quality: str, batch: Optional[object] = None):
+        self.song_id = song_id
+        self.quality = quality
+        self.bitrate = 320 if quality == "320kbps" else 160
+        self.record: Optional[dict] = None    # Existing upload to copy to the user
+        self.prepared: Optional[dict] = None  # Downloaded files waiting to be uploaded
+        self.error: Optional[str] = None
+        self.from_cache = False
+        self.future: Optional[asyncio.Future] = None  # Set while this job owns the upload
+        self.has_lease = False
+        self.batch = batch  # The batch delivering this job, which only uploads when its turn comes
+        self.trace = DownloadTrace(song_id, quality)
+
+async def download_tool(client: Bot, message: Message|CallbackQuery, msg: Message, song_id: str, is_batch_download: bool = False):
+    with JOBS_IN_FLIGHT.labels("song").track_inprogress():
+        user = await client.db.get_user(message.from_user.id)
+        job = await prepare_song(client, message.from_user.id, song_id, user['quality'], msg)
+        delivered = await deliver_song(client, message, msg, job, is_batch_download)
+        job.trace.emit("delivered" if delivered else "failed")
+
+async def prepare_song(client: Bot, user_id: Optional[int], song_id: str, quality: str, msg: Optional[Message] = None, use_cache: bool = True, trace: Optional[DownloadTrace] = None, batch: Optional[object] = None) -> SongJob:
+    """
+    Resolves how a song will be delivered and downloads it if it has to be uploaded.
+
+    Only one upload per song and quality runs at a time: in this process through
+    `pending_uploads`, across bot processes through an upload lease in the database.
+    Jobs that lose the race wait for the winner and are delivered a copy of its upload, for at
+    most `UPLOAD_LEASE_TTL` seconds before taking the upload over. Batch jobs never wait for a
+    song claimed by a batch: it is only uploaded when that batch's turn comes, which may itself
+    be waiting for this batch, so they take such uploads over straight away.
+
+    Args:
+        user_id (Optional[int]): The user the song is downloaded for, or None when pre-warming.
+        msg (Optional[Message]): Status message to keep updated, or None to stay silent (batch mode).
+        use_cache (bool): Whether an existing upload may be reused.
+        trace (Optional[DownloadTrace]): Trace to keep adding to when the song is prepared again.
+        batch (Optional[object]): The batch the job is delivered in, if any.
+
+    Returns:
+        SongJob: The prepared job; never raises, failures are reported in `job.error`.
+    """
+    job = SongJob(song_id, quality, batch)
+    job.trace = trace or job.trace
+    key = (song_id, quality)
+
+    if use_cache:
+        with job.trace.span("db_lookup"):
+            # Only requests of users count towards the song's popularity
+            record = await client.db.register_song_request(song_id, quality, count=user_id is not None)
+        if record.get('message_id'):
+            job.record, job.from_cache = record, True
+            job.trace.annotate(cache="hit")
+            return job
+    job.trace.annotate(cache="miss")
+
+    owner = pending_uploads.get(key)
+    if owner:
+        timeout = 0 if batch is not None and owner.batch is not None else UPLOAD_LEASE_TTL
+        if msg and timeout:
+            await safe_edit(msg, "__⏳ This song is already being uploaded, please wait...__")
+        try:
+            with job.trace.span("wait_upload"):
+                job.record = await asyncio.wait_for(asyncio.shield(owner.future), timeout)
+        except asyncio.TimeoutError:
+            # The owner is stalled or waits for its turn in a batch; upload the song ourselves
+            logger.info("Taking over the upload of %s (%s)", song_id, quality)
+            job.trace.annotate(cache="takeover")
+        else:
+            job.trace.annotate(cache="joined")
+            if not job.record:
+                job.error = "**❌ Failed to upload this song.** Please try again."
+            return job
+
+    job.future = asyncio.get_running_loop().create_future()
+    pending_uploads[key] = job
+    try:
+        job.has_lease = await client.db.acquire_song_lease(song_id, quality, LEASE_OWNER, UPLOAD_LEASE_TTL)
+        if not job.has_lease:
+            # Another bot process is uploading this song; wait for its result and take over if it gives up
+            if msg:
+                await safe_edit(msg, "__⏳ This song is already being uploaded, please wait...__")
+            with job.trace.span("wait_upload", remote=True):
+                record = await client.db.wait_for_song(song_id, quality, timeout=UPLOAD_LEASE_TTL)
+            if record:
+                job.trace.annotate(cache="joined")
+                job.record = record
+                await finish_upload(client, job, record)
+                return job
+            job.has_lease = await client.db.acquire_song_lease(song_id, quality, LEASE_OWNER, UPLOAD_LEASE_TTL)
+            if not job.has_lease:
+                raise ValueError("**❌ Failed to upload this song.** Please try again.")
+
+        job.prepared = await fetch_song(client, user_id, song_id, quality, job.bitrate, msg, job.trace)
+    except Exception as e:
+        logger.error("Error preparing song %s: %s", song_id, e)
+        job.error = str(e)
+        await finish_upload(client, job, None)
+    except asyncio.CancelledError:
+        await finish_upload(client, job, None)
+        raise
+    return job
 
-    if is_exist:
-        song = (await client.db.get_song(song_id)).get(quality)
-        if song:
+async def deliver_song(client: Bot, message: Message|CallbackQuery, msg: Message, job: SongJob, is_batch_download: bool = False) -> bool:
+    """
+    Sends a prepared song to the user and publishes the upload to waiting jobs.
+
+    Returns:
+        bool: True if the user received the song.
+    """
+    if job.error:
+        if not is_batch_download:
+            await safe_edit(msg, job.error)
+        return False
+
+    if job.record:
+        if await send_cached_song(client, message, msg, job.record, is_batch_download, job.song_id, job.quality, job.trace):
+            return True
+        if job.from_cache:
+            # The stored message is gone; upload the song again
+            logger.debug("Stored copy of %s is unusable, uploading again", job.song_id)
+            job = await prepare_song(client, message.from_user.id, job.song_id, job.quality, None if is_batch_download else msg, use_cache=False, trace=job.trace, batch=job.batch)
+            return await deliver_song(client, message, msg, job, is_batch_download)
+        if not is_batch_download:
+            await safe_edit(msg, "**❌ Failed to upload this song.** Please try again.")
+        return False
+
+    if not is_batch_download:
+        await safe_edit(msg, f"__📤 Uploading {job.prepared['title']}__")
+    await client.send_chat_action(
+        chat_id=message.from_user.id,
+        action=ChatAction.UPLOAD_AUDIO
+    )
+
+    if STORAGE_CHANNEL:
+        # Upload once to the storage channel, then deliver from there like any cached song
+        job.record = await store_song(client, job)
+        if job.record:
+            return await deliver_song(client, message, msg, job, is_batch_download)
+    elif await store_song(client, job, message.from_user.id, reply_target(message, msg)):
+        # Delete the temporary message after successful upload (only if not batch download)
+        if not is_batch_download:
+            try:
+                await msg.delete()
+            except Exception as e:
+                logger.debug("Could not delete temp message: %s", e)
+        return True
+
+    if not is_batch_download:
+        await safe_edit(msg, job.error)
+    return False
+
+async def store_song(client: Bot, job: SongJob, chat_id: Optional[int] = None, reply_to_id: Optional[int] = None) -> Optional[dict]:
+    """
+    Uploads a prepared song, records it for reuse and hands the result to waiting jobs.
+
+    Args:
+        job (SongJob): A job holding downloaded files.
+        chat_id (Optional[int]): Where to upload; defaults to the storage channel.
+        reply_to_id (Optional[int]): Message to reply to in `chat_id`.
+
+    Returns:
+        Optional[dict]: The stored per-quality record, or None if the upload failed (see `job.error`).
+    """
+    record = None
+    try:
+        song_file = await upload_song(client, job.prepared, chat_id or STORAGE_CHANNEL, reply_to_id, job.trace)
+        record = {'chat_id': song_file.chat.id, 'message_id': song_file.id, **audio_fields(song_file)}
+    except Exception as e:
+        logger.error("Error uploading song %s: %s", job.song_id, e)
+        job.error = str(e) if isinstance(e, ValueError) else f"Failed to upload {job.prepared['title']}: {str(e)}"
+    finally:
+        cleanup_download(job.prepared)
+        await finish_upload(client, job, record)
+    return record
+
+def reply_target(message: Message|CallbackQuery, msg: Message) -> Optional[int]:
+    """Returns the message a delivered song should reply to."""
+    if msg.reply_to_message:
+        return msg.reply_to_message.id
+    elif isinstance(message, Message) and message.reply_to_message:
+        return message.reply_to_message.id
+    elif isinstance(message, Message):
+        return message.id
+    return None
+
+async def finish_upload(client: Bot, job: SongJob, record: Optional[dict]):
+    """Releases the upload claimed by `job` and hands its result to every waiting job."""
+    key = (job.song_id, job.quality)
+    # The claim may have been taken over, and the lease with it (leases are held per process)
+    taken_over = pending_uploads.get(key) not in (None, job)
+    if job.future and not job.future.done():
+        if not taken_over:
+            pending_uploads.pop(key, None)
+        job.future.set_result(record)
+    if job.has_lease:
+        job.has_lease = False
+        if not taken_over:
+            await client.db.release_song_lease(job.song_id, job.quality, LEASE_OWNER)
+
+async def send_cached_song(client: Bot, message: Message|CallbackQuery, msg: Message, song: dict, is_batch_download: bool = False, song_id: Optional[str] = None, quality: Optional[str] = None, trace: Optional[DownloadTrace] = None) -> bool:
+    """
+    Sends an already uploaded song to the user.
+
+    Records with a stored `file_id` are re-sent with a single `send_audio` call. Older records
+    only reference the uploaded message, which is fetched and copied; its file ID is then stored
+    so the next delivery takes the fast path.
+
+    Args:
+        song (dict): The stored per-quality record.
+        song_id (Optional[str]): The song ID, used to backfill the file ID of older records.
+        quality (Optional[str]): The song quality, used to backfill the file ID of older records.
+        trace (Optional[DownloadTrace]): Trace receiving the timing of the delivery.
+
+    Returns:
+        bool: True if the song was sent, False if the stored upload is unusable.
+    """
+    trace = trace or DownloadTrace(song_id, quality)
+    reply_to_id = msg.reply_to_message.id if msg.reply_to_message else None
+    is_sent = None
+
+    if song.get('file_id'):
+        with trace.span("send_cached", method="file_id"):
+            try:
+                is_sent = await client.send_audio(
+                    chat_id=message.from_user.id,
+                    audio=song['file_id'],
+                    caption=song.get('caption') or "",
+                    duration=song.get('duration') or 0,
+                    title=song.get('title'),
+                    performer=song.get('performer'),
+                    reply_to_message_id=reply_to_id
+                )
+            except Exception as e:
+                logger.debug("Could not send stored file_id: %s", e)
+
+    if not is_sent and song.get('message_id'):
+        with trace.span("send_cached", method="copy"):
             try:
                 song_msg = await client.get_messages(chat_id=int(song.get('chat_id')), message_ids=int(song.get('message_id')))
                 if not song_msg.empty:
-                    is_sent = await song_msg.copy(message.from_user.id, reply_to_message_id=msg.reply_to_message.id)
-                    if is_sent:
-                        # Only delete temp message if not in batch download mode
-                        if not is_batch_download:
-                            try:
-                                await msg.delete()
-                            except Exception as e:
-                                logger.debug(f"Could not delete temp message: {e}")
-                        return
+                    is_sent = await song_msg.copy(message.from_user.id, reply_to_message_id=reply_to_id)
+                    if is_sent and song_id and song_msg.audio and not song.get('file_id'):
+                        await client.db.update_song(song_id, quality, song_msg.chat.id, song_msg.id, **audio_fields(song_msg))
             except Exception as e:
-                logger.debug(f"Could not copy existing song: {e}")
-                # Continue with download if copy fails
+                logger.debug("Could not copy existing song: %s", e)
+
+    if not is_sent:
+        return False
+
+    # Only delete temp message if not in batch download mode
+    if not is_batch_download:
+        try:
+            await msg.delete()
+        except Exception as e:
+            logger.debug("Could not delete temp message: %s", e)
+    return True
+
+async def fetch_song(client: Bot, user_id: Optional[int], song_id: str, quality: str, bitrate: int, msg: Optional[Message] = None, trace: Optional[DownloadTrace] = None) -> dict:
+    """
+    Fetches song metadata and downloads the thumbnail and audio to a scratch directory.
+
+    Args:
+        trace (Optional[DownloadTrace]): Trace receiving the timing of each stage.
+
+    Returns:
+        dict: The song metadata and the local `audio`/`thumb` paths.
+
+    Raises:
+        ValueError: With a user-facing message if the song cannot be found or downloaded.
+    """
+    trace = trace or DownloadTrace(song_id, quality)
 
     # Extract song data
-    song_response = await Jiosaavn().get_song(song_id=song_id)
+    with trace.span("metadata"):
+        song_response = await Jiosaavn().get_song(song_id=song_id)
     
     # Handle different response formats
     if not song_response:
         # Try to provide a more helpful error message
-        await safe_edit(msg, f"**❌ Song not found:** Could not find song with ID `{song_id}`\n\nThis might be due to:\n• Invalid song ID\n• Song removed from JioSaavn\n• Temporary API issues\n• Regional restrictions")
-        return
-    
-    # Handle both official API and fallback API formats
-    song_data = None
-    
-    # Try official API format first
-    if song_response.get("songs"):
-        songs = song_response.get("songs")
-        if isinstance(songs, list) and len(songs) > 0:
-            song_data = songs[0]
-        elif isinstance(songs, dict):
-            song_data = songs
+        raise ValueError(f"**❌ Song not found:** Could not find song with ID `{song_id}`\n\nThis might be due to:\n• Invalid song ID\n• Song removed from JioSaavn\n• Temporary API issues\n• Regional restrictions")
     
-    # Try fallback API format
-    if not song_data and song_response.get("data"):
-        data = song_response.get("data")
-        if isinstance(data, list) and len(data) > 0:
-            song_data = data[0]
-        elif isinstance(data, dict):
-            song_data = data
-    
-    # If still no song_data, try direct response
-    if not song_data and isinstance(song_response, dict):
-        song_data = song_response
-    
-    if not song_data:
+    song = Song.from_response(song_response, song_id)
+    if not song:
         raise ValueError(f"Invalid song response format for ID: {song_id}. Response: {song_response}")
-
-    # Extract metadata - handle both official API and fallback API formats
-    title = song_data.get("title") or song_data.get("name", "Unknown")
-    title = html.unescape(str(title))
-    formatted_title = title.replace(" ", "-")
-    
-    # Handle language field
-    language = song_data.get("language", "Unknown")
-    
-    # Handle different API response formats
-    more_info = song_data.get("more_info", {})
-    
-    # Extract album info - handle both official API and new API formats
-    album = "Unknown"
-    album_url = ""
-    
-    # Try official API format first
-    if more_info.get("album"):
-        album_data = more_info.get("album")
-        if isinstance(album_data, dict):
-            album = album_data.get("name", "Unknown")
-        elif isinstance(album_data, str):
-            album = album_data
-    
-    # Try new API format (direct album field)
-    if album == "Unknown" and song_data.get("album"):
-        album_data = song_data.get("album")
-        if isinstance(album_data, dict):
-            album = album_data.get("name", "Unknown")
-            album_url = album_data.get("url", "")
-        elif isinstance(album_data, str):
-            album = album_data
-    
-    # Try more_info album_url
-    if not album_url:
-        album_url = more_info.get("album_url", "")
-    
-    # Extract artists - handle both official API and new API formats
-    artists = []
-    
-    # Try official API format first (artistMap)
-    if more_info.get("artistMap", {}).get("artists"):
-        artists = more_info["artistMap"]["artists"]
-    
-    # Try new API format (direct artists field)
-    if not artists and song_data.get("artists"):
-        artists_data = song_data["artists"]
-        if isinstance(artists_data, list):
-            artists = artists_data
-        elif isinstance(artists_data, dict):
-            # New API format: artists is a dict with primary_artists, featured_artists, etc.
-            if "primary_artists" in artists_data:
-                artists.extend(artists_data.get("primary_artists", []))
-            if "featured_artists" in artists_data:
-                artists.extend(artists_data.get("featured_artists", []))
-            if "all" in artists_data:
-                artists.extend(artists_data.get("all", []))
-            # If no structured data, treat as single artist
-            if not artists and artists_data:
-                artists = [artists_data]
-    
-    # Ensure artists is always a list
-    if not isinstance(artists, list):
-        artists = []
-    
-    def get_artist_by_role(role: str) -> str:
-        artist_names = []
-        for artist in artists:
-            if isinstance(artist, dict) and artist.get("role") == role:
-                name = artist.get("name", "")
-                if name:
-                    artist_names.append(name)
-        return ", ".join(artist_names)
-    
-    # Extract performers/singers
-    singers = get_artist_by_role("singer") or get_artist_by_role("primary_artists")
-    if not singers and artists:
-        # Fallback: use first artist or all artists
-        artist_names = []
-        for artist in artists[:3]:  # Limit to first 3
-            if isinstance(artist, dict):
-                name = artist.get("name", "")
-                if name:
-                    artist_names.append(name)
-            elif isinstance(artist, str):
-                artist_names.append(artist)
-        singers = ", ".join(artist_names)
-    
-    # Extract release info
-    release_date = more_info.get("release_date") or song_data.get("releaseDate")
-    release_year = song_data.get("year") or (release_date.split("-")[0] if release_date else "")
-    
-    # Extract duration - handle string and int formats
-    duration_raw = more_info.get("duration") or song_data.get("duration", "0")
-    try:
-        duration = int(duration_raw) if duration_raw else 0
-    except (ValueError, TypeError):
-        duration = 0
-    
-    # Extract URLs
-    if not album_url and isinstance(album, str) and album != "Unknown":
-        # Fallback: construct album URL if not provided
-        album_url = f"https://jiosaavn.com/album/{album.lower().replace(' ', '-')}"
-    
-    song_url = song_data.get('perma_url') or song_data.get('url', f"https://jiosaavn.com/songs/{formatted_title}/{song_id}")
-    
-    # Handle image URL - different formats between APIs
-    image_url = ""
-    image_data = song_data.get("image", "")
-    if isinstance(image_data, str):
-        # Official API format - direct string
-        image_url = image_data.replace("150x150", "500x500") if image_data else ""
-    elif isinstance(image_data, list) and len(image_data) > 0:
-        # Fallback API format - list of image objects
-        # Get the highest quality image (usually the last one)
-        image_url = image_data[-1].get("url", "") if image_data[-1] else ""
-    elif isinstance(image_data, dict):
-        # Some APIs return image as dict
-        image_url = image_data.get("url", "")
+    title = song.title or "Unknown"
 
     # Create caption
     text_data = [
-        f"[\u2063]({image_url})"
-        f"**🎧 Song:** [{title}]({song_url})" if title else '',
-        f"**📚 Album:** [{album}]({album_url})" if album and album_url else f"**📚 Album:** {album}" if album else '',
-        f"**📰 Language:** {language}" if language else '',
-        f"**📆 Release Date:** __{release_date}__" if release_date else '',
-        f"**📆 Release Year:** __{release_year}__" if not release_date and release_year else '',
+        f"[\u2063]({song.image_url})"
+        f"**🎧 Song:** [{title}]({song.url})",
+        f"**📚 Album:** [{song.album}]({song.album_url})" if song.album and song.album_url else f"**📚 Album:** {song.album}" if song.album else '',
+        f"**📰 Language:** {song.language}" if song.language else '',
+        f"**📆 Release Date:** __{song.release_date}__" if song.release_date else '',
+        f"**📆 Release Year:** __{song.year}__" if not song.release_date and song.year else '',
     ]
 
     caption = "\n\n".join(filter(None, text_data))
 
-    # Download and upload song
-    download_dir = f"./download/{time.time()}{message.from_user.id}/"
-    if not os.path.isdir(download_dir):
-        os.makedirs(download_dir)
+    # Download song and thumbnail, either into memory-bounded buffers or a scratch directory
+    if STREAM_UPLOADS:
+        download_dir = None
+        audio = SpooledBuffer(f"{title}_{quality}.mp3", max_size=STREAM_MEMORY_LIMIT)
+        thumb = io.BytesIO()
+        thumb.name = f"{title}.jpg"
+    else:
+        download_dir = f"./download/{time.time()}{user_id}{song_id}/"
+        if not os.path.isdir(download_dir):
+            os.makedirs(download_dir)
+        audio = f"{download_dir}{title}_{quality}.mp3"
+        thumb = f"{download_dir}{title}.jpg"
 
-    file_name = f"{download_dir}{title}_{quality}.mp3"
-    thumbnail_location = f"{download_dir}{title}.jpg"
+    prepared = {
+        'song_id': song_id,
+        'quality': quality,
+        'title': title,
+        'caption': caption,
+        'duration': song.duration,
+        'performer': song.singers,
+        'audio': audio,
+        'thumb': thumb,
+        'download_dir': download_dir,
+    }
 
     try:
-        await msg.edit(f"__📥 Downloading {title}__")
-    except Exception as e:
-        logger.debug(f"Could not edit message during download: {e}")
-        # If edit fails, send a new message instead
-        msg = await client.send_message(
-            chat_id=message.from_user.id,
-            text=f"__📥 Downloading {title}__",
-            reply_to_message_id=msg.reply_to_message.id if msg.reply_to_message else None
-        )
-    await client.send_chat_action(
-        chat_id=message.from_user.id,
-        action=ChatAction.RECORD_AUDIO
-    )
+        if msg:
+            await safe_edit(msg, f"__📥 Downloading {title}__")
+            await client.send_chat_action(
+                chat_id=user_id,
+                action=ChatAction.RECORD_AUDIO
+            )
 
-    async with aiohttp.ClientSession() as session: 
-        async with session.get(image_url) as response:
-            async with aiofiles.open(thumbnail_location, "wb") as file:
-                await file.write(await response.read())
+        if song.image_url:
+            with trace.span("thumbnail") as span:
+                try:
+                    async with client_session() as session:
+                        async with session.get(song.image_url) as response:
+                            image = await response.read()
+                    if isinstance(thumb, str):
+                        async with aiofiles.open(thumb, "wb") as file:
+                            await file.write(image)
+                    else:
+                        thumb.write(image)
+                        thumb.seek(0)
+                    span['bytes'] = len(image)
+                except Exception as e:
+                    span['error'] = str(e)
+                    logger.debug("Could not download thumbnail for %s: %s", title, e)
 
-    try:
-        # Try to get download URL from song data
-        download_url = None
-        
-        # Check if song has downloadUrl field (fallback API format)
-        if song_data.get("downloadUrl"):
-            download_urls = song_data["downloadUrl"]
-            if isinstance(download_urls, list):
-                # Find the appropriate quality
-                for url_obj in download_urls:
-                    if str(bitrate) in url_obj.get("quality", ""):
-                        download_url = url_obj.get("url")
-                        break
-                # Fallback to highest quality if exact bitrate not found
-                if not download_url and download_urls:
-                    download_url = download_urls[-1].get("url")
-        
-        if download_url:
-            # Direct download from URL
-            logger.info(f"Direct downloading from URL for {title}")
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept': '*/*',
-                'Referer': 'https://www.jiosaavn.com/',
-            }
-            
-            async with aiohttp.ClientSession(headers=headers) as session:
-                async with session.get(download_url) as response:
-                    response.raise_for_status()
-                    async with aiofiles.open(file_name, "wb") as file:
-                        while True:
-                            chunk = await response.content.read(4 * 1024 * 1024)  # 4 MB chunks
-                            if not chunk:
-                                break
-                            await file.write(chunk)
-            audio = file_name
-        else:
-            # Fallback to official API download
-            logger.info(f"Using official API download for {title}")
-            audio = await Jiosaavn().download_song(song_id=song_id, bitrate=bitrate, download_location=file_name)
+        # Direct media URL listed by the fallback API, if any
+        download_url = song.download_url(bitrate)
+
+        # Skip a CDN host that keeps failing; the official API hands out a fresh media URL instead
+        if download_url and not Jiosaavn.breakers.allows(cdn_endpoint(download_url)):
+            logger.warning("⏭️ %s is unavailable, using official API download for %s", cdn_endpoint(download_url), title)
+            download_url = None
         
-        if not audio or not os.path.exists(file_name):
-            await safe_edit(msg, f"Failed to download {title}")
-            return
-            
-    except Exception as e:
-        logger.error(f"Error downloading song {title}: {e}")
-        await safe_edit(msg, f"Failed to download {title}: {str(e)}")
-        return
-    try:
-        await msg.edit(f"__📤 Uploading {title}__")
+        with trace.span("audio", source="downloadUrl" if download_url else "song.generateAuthToken") as span:
+            if download_url:
+                # Direct download from URL
+                logger.info("Direct downloading from URL for %s", title)
+                headers = {
+                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+                    'Accept': '*/*',
+                    'Referer': 'https://www.jiosaavn.com/',
+                }
+                await Jiosaavn().download_file(download_url, audio, headers=headers)
+            else:
+                # Fallback to official API download
+                logger.info("Using official API download for %s", title)
+                await Jiosaavn().download_song(song_id=song_id, bitrate=bitrate, download_location=audio)
+            span['bytes'] = audio.size if isinstance(audio, SpooledBuffer) else os.path.getsize(audio) if os.path.exists(audio) else 0
     except Exception as e:
-        logger.debug(f"Could not edit message during upload: {e}")
-        # If edit fails, send a new message instead
-        msg = await client.send_message(
-            chat_id=message.from_user.id,
-            text=f"__📤 Uploading {title}__",
-            reply_to_message_id=msg.reply_to_message.id if msg.reply_to_message else None
-        )
-    await client.send_chat_action(
-        chat_id=message.from_user.id,
-        action=ChatAction.UPLOAD_AUDIO
-    )
+        logger.error("Error downloading song %s: %s", title, e)
+        cleanup_download(prepared)
+        raise ValueError(f"Failed to download {title}: {str(e)}")
 
-    try:
-        # Get the reply_to_message_id safely
-        reply_to_id = None
-        if msg.reply_to_message:
-            reply_to_id = msg.reply_to_message.id
-        elif isinstance(message, Message) and message.reply_to_message:
-            reply_to_id = message.reply_to_message.id
-        elif isinstance(message, Message):
-            reply_to_id = message.id
-        
-        # Validate file before uploading
-        if not os.path.exists(audio):
-            await safe_edit(msg, f"Audio file not found for {title}")
-            return
-        
-        # Check file size (Telegram has 50MB limit for bots)
-        file_size = os.path.getsize(audio)
-        if file_size > 50 * 1024 * 1024:  # 50MB
-            await safe_edit(msg, f"File too large to upload: {title} ({file_size / 1024 / 1024:.1f}MB)")
-            return
-        
+    prepared['size'] = audio.size if isinstance(audio, SpooledBuffer) else os.path.getsize(audio) if os.path.exists(audio) else 0
+    if not prepared['size']:
+        cleanup_download(prepared)
+        raise ValueError(f"Failed to download {title}")
+
+    return prepared
+
+async def upload_song(client: Bot, prepared: dict, chat_id: int, reply_to_id: Optional[int] = None, trace: Optional[DownloadTrace] = None) -> Message:
+    """
+    Uploads a downloaded song and stores the upload for reuse.
+
+    Args:
+        trace (Optional[DownloadTrace]): Trace receiving the timing of the upload and database update.
+
+    Returns:
+        Message: The uploaded audio message.
+
+    Raises:
+        ValueError: With a user-facing message if the song cannot be uploaded.
+    """
+    title = prepared['title']
+    thumb = prepared['thumb']
+    if isinstance(thumb, str):
+        thumb = thumb if os.path.exists(thumb) else None
+    elif not thumb.getbuffer().nbytes:
+        thumb = None
+
+    # Check file size (Telegram has 50MB limit for bots)
+    file_size = prepared['size']
+    if file_size > 50 * 1024 * 1024:  # 50MB
+        raise ValueError(f"File too large to upload: {title} ({file_size / 1024 / 1024:.1f}MB)")
+
+    trace = trace or DownloadTrace(prepared['song_id'], prepared['quality'])
+    with trace.span("upload") as span:
         song_file = await client.send_audio(
-            chat_id=message.from_user.id,
-            audio=audio,
-            caption=caption,
-            duration=duration,
+            chat_id=chat_id,
+            audio=prepared['audio'],
+            caption=prepared['caption'],
+            duration=prepared['duration'],
             title=title,
-            thumb=thumbnail_location if os.path.exists(thumbnail_location) else None,
-            performer=singers,
+            thumb=thumb,
+            performer=prepared['performer'],
+            file_name=f"{title}_{prepared['quality']}.mp3",
             reply_to_message_id=reply_to_id,
         )
-        
         if not song_file:
-            await safe_edit(msg, f"Failed to upload {title} - upload returned None")
-            return
-        
-        # Update database
-        await client.db.update_song(song_id, quality, song_file.chat.id, song_file.id)
-        
-        # Delete the audio file immediately after successful upload to save space
-        try:
-            if os.path.exists(audio):
-                os.remove(audio)
-                logger.debug(f"Deleted audio file: {audio}")
-        except Exception as e:
-            logger.debug(f"Could not delete audio file {audio}: {e}")
-        
-        # Delete the thumbnail file to save space
-        try:
-            if os.path.exists(thumbnail_location):
-                os.remove(thumbnail_location)
-                logger.debug(f"Deleted thumbnail file: {thumbnail_location}")
-        except Exception as e:
-            logger.debug(f"Could not delete thumbnail file {thumbnail_location}: {e}")
-        
-        # Delete the temporary message after successful upload (only if not batch download)
-        if not is_batch_download:
-            try:
-                await msg.delete()
-            except Exception as e:
-                logger.debug(f"Could not delete temp message: {e}")
-            
+            raise ValueError(f"Failed to upload {title} - upload returned None")
+        span['bytes'] = file_size
+
+    # Update database
+    with trace.span("db_update"):
+        await client.db.update_song(
+            prepared['song_id'],
+            prepared['quality'],
+            song_file.chat.id,
+            song_file.id,
+            **audio_fields(song_file),
+        )
+    return song_file
+
+def cleanup_download(prepared: Optional[dict]):
+    """Releases the buffers or scratch directory holding a downloaded song and its thumbnail."""
+    if not prepared:
+        return
+    for buffer in (prepared['audio'], prepared['thumb']):
+        if not isinstance(buffer, str):
+            buffer.close()
+
+    download_dir = prepared['download_dir']
+    if not download_dir:
+        return
+    try:
+        if os.path.exists(download_dir):
+            shutil.rmtree(download_dir)
+            logger.debug("Cleaned up download directory: %s", download_dir)
     except Exception as e:
-        logger.error(f"Error uploading song {title}: {e}")
-        await safe_edit(msg, f"Failed to upload {title}: {str(e)}")
-    finally:
-        # Clean up individual files first
-        try:
-            if os.path.exists(audio):
-                os.remove(audio)
-                logger.debug(f"Cleaned up audio file: {audio}")
-        except Exception as e:
-            logger.debug(f"Could not clean up audio file {audio}: {e}")
-        
-        try:
-            if os.path.exists(thumbnail_location):
-                os.remove(thumbnail_location)
-                logger.debug(f"Cleaned up thumbnail file: {thumbnail_location}")
-        except Exception as e:
-            logger.debug(f"Could not clean up thumbnail file {thumbnail_location}: {e}")
-        
-        # Clean up download directory
-        try:
-            if os.path.exists(download_dir):
-                shutil.rmtree(download_dir)
-        except Exception as e:
-            logger.debug(f"Could not clean up directory {download_dir}: {e}")
+        logger.debug("Could not clean up directory %s: %s", download_dir, e)
@@ -1,8 +1,8 @@
-import html
 import logging
 import traceback
 
 from api.jiosaavn import Jiosaavn
+from api.models import Collection
 from jiosaavn.bot import Bot
 from jiosaavn.utils import safe_edit
 
@@ -26,7 +26,7 @@ async def playlist_or_album(client: Bot, callback: CallbackQuery):
     
     try:
         response = await Jiosaavn().get_playlist_or_album(album_id=album_id, playlist_id=playlist_id, page_no=page_no)
-        logger.debug(f"Playlist/Album response: {response}")
+        logger.debug("Playlist/Album response: %s", response)
         
         if not response:
             return await safe_edit(callback.message, f"**The requested {search_type} could not be found.**\n\n"
@@ -35,79 +35,32 @@ async def playlist_or_album(client: Bot, callback: CallbackQuery):
                                              f"• {search_type.title()} removed from JioSaavn\n"
                                              f"• Temporary API issues")
         
-        # Check for songs in different possible fields
-        songs = response.get("list") or response.get("songs") or []
-        if not songs:
+        collection = Collection.from_api(response)
+        if not collection.songs:
             return await safe_edit(callback.message, f"**The {search_type} exists but contains no songs.**\n\n"
                                              f"The {search_type} might be empty or the songs are not available in your region.")
-        
-        # Ensure 'list' field exists for compatibility with rest of code
-        if not response.get("list") and response.get("songs"):
-            response["list"] = response["songs"]
-            response["list_count"] = len(response["songs"])
     except RuntimeError as e:
-        logger.error(f"RuntimeError in playlist/album handler: {e}")
+        logger.error("RuntimeError in playlist/album handler: %s", e)
         traceback.print_exc()
         return await safe_edit(callback.message, "Connection refused by JioSaavn API. Please try again.")
     except Exception as e:
-        logger.error(f"Unexpected error in playlist/album handler: {e}")
+        logger.error("Unexpected error in playlist/album handler: %s", e)
         traceback.print_exc()
         return await safe_edit(callback.message, f"An unexpected error occurred while fetching the {search_type}. Please try again.")
 
-    title = html.unescape(response.get("title", ""))
-    total_results = int(response.get("list_count", 0))
-    
-    # Handle image URL - different formats between APIs
-    image_url = ""
-    image_data = response.get("image", "")
-    if isinstance(image_data, str):
-        # Official API format - direct string
-        image_url = image_data.replace("150x150", "500x500") if image_data else ""
-    elif isinstance(image_data, list) and len(image_data) > 0:
-        # Fallback API format - list of image objects
-        # Get the highest quality image (usually the last one)
-        image_url = image_data[-1].get("url", "") if image_data[-1] else ""
-    elif isinstance(image_data, dict):
-        # Some APIs return image as dict
-        image_url = image_data.get("url", "")
-    
-    perma_url = response.get("perma_url", "")
-    more_info = response.get("more_info", {})
-    followers = int(more_info.get("follower_count", 0))
-    duration = int(more_info.get("duration", 0))
-    release_year = response.get("year", "")
-    songs = response.get("list", [])
-    
     buttons = []
-    for song in songs:
-        try:
-            # Handle different title fields between APIs
-            song_title = song.get("title") or song.get("name", "")
-            song_title = html.unescape(str(song_title))
-            
-            # Try to get song ID from multiple possible fields
-            song_id = song.get("id")
-            if not song_id and song.get("perma_url"):
-                song_id = song.get("perma_url", "").rsplit("/", 1)[1]
-            
-            if song_id and song_title:
-                callback_data = f"song#{song_id}#{item_id}#{search_type}"
-                if back_type:
-                    callback_data += f"#{back_type}"
-                buttons.append([InlineKeyboardButton(f"🎙 {song_title}", callback_data=callback_data)])
-            elif song_id:
-                # Fallback if no title
-                callback_data = f"song#{song_id}#{item_id}#{search_type}"
-                if back_type:
-                    callback_data += f"#{back_type}"
-                buttons.append([InlineKeyboardButton(f"🎙 Song {song_id}", callback_data=callback_data)])
-        except (IndexError, AttributeError) as e:
-            logger.debug(f"Error processing song: {e}")
-            pass
+    for song in collection.songs:
+        if not song.id:
+            continue
+        callback_data = f"song#{song.id}#{item_id}#{search_type}"
+        if back_type:
+            callback_data += f"#{back_type}"
+        label = f"🎙 {song.title}" if song.title else f"🎙 Song {song.id}"
+        buttons.append([InlineKeyboardButton(label, callback_data=callback_data)])
 
     # Calculate pagination properly
     songs_per_page = 10  # Number of songs shown per page
-    total_pages = (total_results + songs_per_page - 1) // songs_per_page  # Ceiling division
+    total_pages = (collection.song_count + songs_per_page - 1) // songs_per_page  # Ceiling division
     
     navigation_buttons = []
     if page_no > 1:
@@ -124,13 +77,13 @@ async def playlist_or_album(client: Bot, callback: CallbackQuery):
 
     search_type_text = "💾 Playlist" if playlist_id else "📚 Album"
     text_data = (
-        f"[\u2063]({image_url})"
-        f"**{search_type_text}:** [{title}]({perma_url})",
+        f"[\u2063]({collection.image_url})"
+        f"**{search_type_text}:** [{collection.title}]({collection.url})",
         f"**📜 Page No:** {page_no}",
-        f"**🕰 Duration:** {format_timespan(duration)}" if duration else "",
-        f"**🔊 Total Songs:** {total_results}" if total_results else "",
-        f"**👥 Followers:** {followers:,}" if followers else "",
-        f"**📆 Release Year:** __{release_year}__" if release_year else ''
+        f"**🕰 Duration:** {format_timespan(collection.duration)}" if collection.duration else "",
+        f"**🔊 Total Songs:** {collection.song_count}" if collection.song_count else "",
+        f"**👥 Followers:** {collection.followers:,}" if collection.followers else "",
+        f"**📆 Release Year:** __{collection.year}__" if collection.year else ''
     )
     text = "\n\n".join(filter(None, text_data))
 
@@ -1,11 +1,11 @@
 import os
-import html
 import logging
 import traceback
 
 from jiosaavn.bot import Bot
 from jiosaavn.utils import safe_edit, safe_edit_media
 from api.jiosaavn import Jiosaavn
+from api.models import Song
 from jiosaavn.config.settings import HOST, PORT
 
 from pyrogram import filters
@@ -37,167 +37,22 @@ async def handle_song_callback(client: Bot, callback: CallbackQuery):
         traceback.print_exc()
         return await safe_edit(msg, "Connection refused by jiosaavn api. Please try again")
 
-    # Handle both official API and fallback API formats
-    song_data = None
-    
-    # Try official API format first
-    if response.get("songs"):
-        songs = response.get("songs")
-        if isinstance(songs, list) and len(songs) > 0:
-            song_data = songs[0]
-        elif isinstance(songs, dict):
-            song_data = songs
-    
-    # Try fallback API format
-    if not song_data and response.get("data"):
-        data = response.get("data")
-        if isinstance(data, list) and len(data) > 0:
-            song_data = data[0]
-        elif isinstance(data, dict):
-            song_data = data
-    
-    # If still no song_data, try direct response
-    if not song_data and isinstance(response, dict):
-        song_data = response
-    
-    if not song_data:
+    song = Song.from_response(response, song_id)
+    if not song:
         return await safe_edit(msg, "**The requested song could not be found.**")
 
-    title = song_data.get("title", "Unknown")
-    title = html.unescape(title)
-    formatted_title = title.replace(" ", "-")
-    language = song_data.get("language", "Unknown")
-    play_count = song_data.get("play_count", "0")
-    play_count = int(play_count) if play_count else 0
-    more_info = song_data.get("more_info", {})
-    # Extract album info - handle both official API and new API formats
-    album = "Unknown"
-    album_url = ""
-    
-    # Try official API format first
-    if more_info.get("album"):
-        album_data = more_info.get("album")
-        if isinstance(album_data, dict):
-            album = album_data.get("name", "Unknown")
-        elif isinstance(album_data, str):
-            album = album_data
-    
-    # Try new API format (direct album field)
-    if album == "Unknown" and song_data.get("album"):
-        album_data = song_data.get("album")
-        if isinstance(album_data, dict):
-            album = album_data.get("name", "Unknown")
-            album_url = album_data.get("url", "")
-        elif isinstance(album_data, str):
-            album = album_data
-    
-    # Try more_info album_url
-    if not album_url:
-        album_url = more_info.get("album_url", "")
-    
-    # Fallback: construct album URL if not provided
-    if not album_url and isinstance(album, str) and album != "Unknown":
-        album_url = f"https://jiosaavn.com/album/{album.lower().replace(' ', '-')}"
-    
-    # Extract artists - handle both official API and new API formats
-    artists = []
-    
-    # Try official API format first (artistMap)
-    if more_info.get("artistMap", {}).get("artists"):
-        artists = more_info["artistMap"]["artists"]
-    
-    # Try new API format (direct artists field)
-    if not artists and song_data.get("artists"):
-        artists_data = song_data["artists"]
-        if isinstance(artists_data, list):
-            artists = artists_data
-        elif isinstance(artists_data, dict):
-            # New API format: artists is a dict with primary_artists, featured_artists, etc.
-            if "primary_artists" in artists_data:
-                artists.extend(artists_data.get("primary_artists", []))
-            if "featured_artists" in artists_data:
-                artists.extend(artists_data.get("featured_artists", []))
-            if "all" in artists_data:
-                artists.extend(artists_data.get("all", []))
-            # If no structured data, treat as single artist
-            if not artists and artists_data:
-                artists = [artists_data]
-    
-    # Ensure artists is always a list
-    if not isinstance(artists, list):
-        artists = []
-
-    def get_artist_by_role(role: str) -> str:
-        artist_names = []
-        for artist in artists:
-            if isinstance(artist, dict) and artist.get("role") == role:
-                name = artist.get("name", "")
-                if name:
-                    artist_names.append(name)
-        return ", ".join(artist_names)
-    
-    # Extract performers/singers - handle both formats
-    music = more_info.get("music") or get_artist_by_role("music")
-    
-    # Extract singers - prioritize singer role, then primary_artists
-    singers = get_artist_by_role("singer")
-    if not singers:
-        # Try primary_artists if no specific singers found
-        primary_artists = []
-        for artist in artists:
-            if isinstance(artist, dict) and artist.get("role") == "primary_artists":
-                name = artist.get("name", "")
-                if name:
-                    primary_artists.append(name)
-        if primary_artists:
-            singers = ", ".join(primary_artists)
-    
-    # Final fallback: use first few artists if still no singers
-    if not singers and artists:
-        artist_names = []
-        for artist in artists[:3]:  # Limit to first 3
-            if isinstance(artist, dict):
-                name = artist.get("name", "")
-                if name:
-                    artist_names.append(name)
-            elif isinstance(artist, str):
-                artist_names.append(artist)
-        singers = ", ".join(artist_names)
-    
-    lyricists = get_artist_by_role("lyricist")
-    actors = get_artist_by_role("starring")
-    # Extract release info - handle both formats
-    release_date = more_info.get("release_date") or song_data.get("releaseDate")
-    release_year = song_data.get("year") or (release_date.split("-")[0] if release_date else "")
-    album_url = more_info.get("album_url", "")
-    
-    # Handle image URL - different formats between APIs
-    image_url = ""
-    image_data = song_data.get("image", "")
-    if isinstance(image_data, str):
-        # Official API format - direct string
-        image_url = image_data.replace("150x150", "500x500") if image_data else ""
-    elif isinstance(image_data, list) and len(image_data) > 0:
-        # Fallback API format - list of image objects
-        # Get the highest quality image (usually the last one)
-        image_url = image_data[-1].get("url", "") if image_data[-1] else ""
-    elif isinstance(image_data, dict):
-        # Some APIs return image as dict
-        image_url = image_data.get("url", "")
-    
-    song_url = song_data.get('perma_url', f"https://jiosaavn.com/songs/{formatted_title}/{song_id}")
-
+    title = song.title or "Unknown"
     text_data = [
-        f"**🎧 Song:** [{title}]({song_url})" if title else '',
-        f"**📚 Album:** [{album}]({album_url})" if album and album_url else f"**📚 Album:** {album}" if album else '',
-        f"**🎵 Music:** {music}" if music else '',
-        f"**▶️ Plays:** {play_count:,}" if play_count else '',
-        f"**👨‍🎤 Singers:** {singers}" if singers else '',
-        f"**✍️ Lyricist:** {lyricists}" if lyricists else '',
-        f"**👫 Actors:** {actors}" if actors else '',
-        f"**📰 Language:** {language}" if language else '',
-        f"**📆 Release Date:** __{release_date}__" if release_date else '',
-        f"**📆 Release Year:** __{release_year}__" if not release_date and release_year else '',
+        f"**🎧 Song:** [{title}]({song.url})",
+        f"**📚 Album:** [{song.album}]({song.album_url})" if song.album and song.album_url else f"**📚 Album:** {song.album}" if song.album else '',
+        f"**🎵 Music:** {song.music}" if song.music else '',
+        f"**▶️ Plays:** {song.play_count:,}" if song.play_count else '',
+        f"**👨‍🎤 Singers:** {song.singers}" if song.singers else '',
+        f"**✍️ Lyricist:** {song.lyricists}" if song.lyricists else '',
+        f"**👫 Actors:** {song.actors}" if song.actors else '',
+        f"**📰 Language:** {song.language}" if song.language else '',
+        f"**📆 Release Date:** __{song.release_date}__" if song.release_date else '',
+        f"**📆 Release Year:** __{song.year}__" if not song.release_date and song.year else '',
     ]
     text = "\n\n".join(filter(None, text_data))
 
@@ -215,9 +70,8 @@ async def handle_song_callback(client: Bot, callback: CallbackQuery):
     ], [
         InlineKeyboardButton('Close ❌', callback_data="close")
     ]]
-    if more_info.get('has_lyrics') == 'true':
-        lyrics_id = song_data.get("id")
-        lyrics_button_callback_data = f"lyrics#{lyrics_id}#{song_id}#{search_type}"
+    if song.has_lyrics:
+        lyrics_button_callback_data = f"lyrics#{song.id}#{song_id}#{search_type}"
         if item_id:
             lyrics_button_callback_data += f"#{item_id}#{back_type}"
 
@@ -225,7 +79,7 @@ async def handle_song_callback(client: Bot, callback: CallbackQuery):
 
     await safe_edit_media(
         msg,
-        media=InputMediaPhoto(image_url, caption=text[:1024]),  # Safety limit on caption length
+        media=InputMediaPhoto(song.image_url, caption=text[:1024]),  # Safety limit on caption length
         reply_markup=InlineKeyboardMarkup(buttons)
     )
 
@@ -0,0 +1,172 @@
+"""
+Pre-warming of the storage channel song cache.
+
+Songs are pushed through the regular download pipeline (`prepare_song` + `store_song`)
+ahead of demand, so the first user asking for them is served from the storage channel.
+Pre-warm lookups are not counted as requests, so they do not feed back into the ranking
+of the most requested songs.
+"""
+import asyncio
+import logging
+from typing import Dict, Iterable, List, Tuple
+
+from api.jiosaavn import Jiosaavn
+from api.models import Collection
+from .config.settings import STORAGE_CHANNEL
+from .utils import audio_fields
+
+logger = logging.getLogger(__name__)
+
+
+def parse_item(item: str) -> Tuple[str, str]:
+    """
+    Splits a JioSaavn link or ID into its type and ID.
+
+    Accepts song/album/playlist links, `album:<id>` / `playlist:<id>` / `song:<id>`
+    prefixes, or a bare song ID.
+
+    Returns:
+        Tuple[str, str]: The item type ('song', 'album' or 'playlist') and its ID.
+    """
+    item = item.strip()
+    if item.startswith("http"):
+        item_id = item.rstrip("/").rsplit("/", 1)[1]
+        if "album" in item:
+            return "album", item_id
+        if "featured" in item or "playlist" in item:
+            return "playlist", item_id
+        return "song", item_id
+    if ":" in item:
+        item_type, item_id = item.split(":", 1)
+        if item_type in ("song", "album", "playlist"):
+            return item_type, item_id
+    return "song", item
+
+
+async def expand_items(items: Iterable[str]) -> List[str]:
+    """
+    Resolves links and IDs of songs, albums and playlists into unique song IDs.
+
+    Returns:
+        List[str]: Song IDs in the order they were given.
+    """
+    song_ids: Dict[str, None] = {}
+    for item in items:
+        item_type, item_id = parse_item(item)
+        if item_type == "song":
+            song_ids[item_id] = None
+            continue
+
+        try:
+            response = await Jiosaavn().get_playlist_or_album(
+                album_id=item_id if item_type == "album" else None,
+                playlist_id=item_id if item_type == "playlist" else None,
+                page_size=50,
+                original_url=item if item.startswith("http") else None
+            )
+        except Exception as e:
+            logger.warning("Could not expand %s %s for pre-warming: %s", item_type, item_id, e)
+            continue
+
+        for song in (Collection.from_api(response).songs if response else ()):
+            if song.id:
+                song_ids[song.id] = None
+    return list(song_ids)
+
+
+async def copy_to_storage(client, song_id: str, quality: str, record: dict) -> bool:
+    """
+    Copies a song uploaded to a user's chat into the storage channel and points its record there.
+
+    Args:
+        client (Bot): The running bot.
+        song_id (str): The song ID.
+        quality (str): The quality of the upload.
+        record (dict): The stored per-quality record of the upload.
+
+    Returns:
+        bool: True if the storage channel now holds the song.
+    """
+    try:
+        if record.get('file_id'):
+            song_msg = await client.send_audio(
+                chat_id=STORAGE_CHANNEL,
+                audio=record['file_id'],
+                caption=record.get('caption') or "",
+                duration=record.get('duration') or 0,
+                title=record.get('title'),
+                performer=record.get('performer')
+            )
+        else:
+            song_msg = await client.copy_message(STORAGE_CHANNEL, int(record['chat_id']), int(record['message_id']))
+    except Exception as e:
+        logger.debug("Could not copy %s (%s) to the storage channel: %s", song_id, quality, e)
+        return False
+    if not song_msg or not song_msg.audio:
+        return False
+    await client.db.update_song(song_id, quality, song_msg.chat.id, song_msg.id, **audio_fields(song_msg))
+    return True
+
+
+async def prewarm(client, items: Iterable[str], qualities: Iterable[str], rate: float) -> Dict[str, int]:
+    """
+    Uploads songs to the storage channel ahead of demand.
+
+    Args:
+        client (Bot): The running bot.
+        items (Iterable[str]): Song, album or playlist links or IDs.
+        qualities (Iterable[str]): Qualities to store each song in.
+        rate (float): Maximum number of songs processed per minute.
+
+    Returns:
+        Dict[str, int]: Counts of songs `stored` (uploaded or copied from a user's chat),
+        already `cached` in the storage channel and `failed`.
+    """
+    from jiosaavn.plugins.download_handler import prepare_song, store_song
+
+    counts = {"stored": 0, "cached": 0, "failed": 0}
+    if not STORAGE_CHANNEL:
+        logger.warning("Pre-warming needs STORAGE_CHANNEL to be set")
+        return counts
+
+    song_ids = await expand_items(items)
+    delay = 60 / rate if rate > 0 else 0
+    for song_id in song_ids:
+        for quality in qualities:
+            job = await prepare_song(client, None, song_id, quality)
+            if job.record and int(job.record.get('chat_id') or 0) == STORAGE_CHANNEL:
+                counts["cached"] += 1
+                continue
+            if job.record and not await copy_to_storage(client, song_id, quality, job.record):
+                # The copy in the user's chat is gone; upload the song again
+                job = await prepare_song(client, None, song_id, quality, use_cache=False, trace=job.trace)
+
+            if job.error:
+                outcome = "failed"
+            elif job.record:
+                outcome = "stored"
+            else:
+                outcome = "stored" if await store_song(client, job) else "failed"
+            counts[outcome] += 1
+            job.trace.emit(outcome)
+            await asyncio.sleep(delay)
+
+    logger.info("🔥 Pre-warm finished for %s songs: %s", len(song_ids), counts)
+    return counts
+
+
+async def prewarm_loop(client, interval: float, top: int, qualities: Iterable[str], rate: float):
+    """
+    Periodically pre-warms the most requested songs.
+
+    Args:
+        client (Bot): The running bot.
+        interval (float): Seconds between runs.
+        top (int): Number of most requested songs to keep warm.
+        qualities (Iterable[str]): Qualities to store each song in.
+        rate (float): Maximum number of songs processed per minute.
+    """
+    while True:
+        song_ids = await client.db.get_most_requested_songs(limit=top)
+        await prewarm(client, song_ids, qualities, rate)
+        await asyncio.sleep(interval)
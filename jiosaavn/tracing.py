@@ -0,0 +1,71 @@
+"""
+Per-stage timing of the song download pipeline.
+"""
+import json
+import time
+import logging
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List
+
+from .metrics import DOWNLOAD_STAGE_LATENCY, DOWNLOAD_STAGE_BYTES
+
+logger = logging.getLogger(__name__)
+
+
+class DownloadTrace:
+    """
+    Collects timing spans for one song as it moves through the download pipeline.
+
+    Every span is recorded in the stage latency histogram as soon as it ends; `emit`
+    writes the whole trace as a single JSON log line once the song has been delivered.
+    """
+
+    def __init__(self, song_id: str, quality: str):
+        self.song_id = song_id
+        self.quality = quality
+        self.fields: Dict[str, Any] = {}
+        self.spans: List[Dict[str, Any]] = []
+        self.started = time.perf_counter()
+
+    @contextmanager
+    def span(self, stage: str, **fields) -> Iterator[Dict[str, Any]]:
+        """
+        Times a stage. The yielded dict can be filled with details such as `bytes` or `source`.
+
+        Args:
+            stage (str): Name of the stage, e.g. 'metadata', 'audio' or 'upload'.
+            **fields: Details known when the stage starts.
+        """
+        entry = {"stage": stage, **fields}
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            yield entry
+            outcome = "ok"
+        finally:
+            elapsed = time.perf_counter() - started
+            entry.update(outcome=outcome, ms=round(elapsed * 1000, 1))
+            self.spans.append(entry)
+            DOWNLOAD_STAGE_LATENCY.labels(stage, outcome).observe(elapsed)
+            if entry.get("bytes"):
+                DOWNLOAD_STAGE_BYTES.labels(stage).inc(entry["bytes"])
+
+    def annotate(self, **fields):
+        """Adds details that describe the whole trace, e.g. whether the song was cached."""
+        self.fields.update(fields)
+
+    def emit(self, outcome: str):
+        """Logs the trace as one structured line."""
+        total = time.perf_counter() - self.started
+        DOWNLOAD_STAGE_LATENCY.labels("total", outcome).observe(total)
+        if not logger.isEnabledFor(logging.INFO):
+            return
+        line = {
+            "song_id": self.song_id,
+            "quality": self.quality,
+            "outcome": outcome,
+            "ms": round(total * 1000, 1),
+            **self.fields,
+            "spans": self.spans,
+        }
+        logger.info("⏱ download %s", json.dumps(line, separators=(',', ':'), default=str))
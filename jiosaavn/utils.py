@@ -3,6 +3,7 @@ Utility functions for the JioSaavn bot.
 """
 import logging
 import time
+import tempfile
 from typing import Dict, Optional
 from pyrogram.types import Message, InputMediaPhoto
 from pyrogram.errors import MessageNotModified
@@ -65,6 +66,28 @@ class ArtistCache:
 # Global artist cache instance
 artist_cache = ArtistCache()
 
+class SpooledBuffer(tempfile.SpooledTemporaryFile):
+    """
+    Upload buffer that stays in memory up to `max_size` bytes and only spills to a
+    temporary file on disk beyond that. Carries a `name` so Pyrogram can upload it directly.
+    """
+    def __init__(self, name: str, max_size: int):
+        super().__init__(max_size=max_size)
+        self._upload_name = name
+
+    @property
+    def name(self) -> str:
+        return self._upload_name
+
+    @property
+    def size(self) -> int:
+        """Number of bytes written to the buffer"""
+        position = self.tell()
+        self.seek(0, 2)
+        size = self.tell()
+        self.seek(position)
+        return size
+
 async def safe_edit_text(message: Message, text: str, **kwargs):
     """
     Safely edit message text, handling MessageNotModified errors.
@@ -127,3 +150,23 @@ async def safe_edit(message: Message, text: str, **kwargs):
     except Exception as e:
         logger.error(f"Error editing message: {e}")
         return None
+
+def audio_fields(song_msg: Message) -> dict:
+    """
+    Extracts the audio attributes of an uploaded song message for `Database.update_song`.
+
+    Args:
+        song_msg: Message carrying the uploaded audio
+
+    Returns:
+        Keyword arguments for `Database.update_song`
+    """
+    audio = song_msg.audio
+    return {
+        'file_id': audio.file_id,
+        'file_unique_id': audio.file_unique_id,
+        'duration': audio.duration,
+        'title': audio.title,
+        'performer': audio.performer,
+        'caption': song_msg.caption.markdown if song_msg.caption else None,
+    }
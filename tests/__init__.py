@@ -0,0 +1,3 @@
+"""
+Unit tests of the bot, and the in-memory Telegram and MongoDB stand-ins they share with the benchmarks.
+"""
@@ -0,0 +1,234 @@
+"""
+In-memory stand-ins for Telegram and MongoDB, recording what the handlers ask of them.
+
+The fake messages and callback queries subclass the real Pyrogram types, so the handlers'
+`isinstance` checks and attribute reads behave as they do against Telegram.
+"""
+import time
+import asyncio
+import itertools
+from collections import Counter
+from typing import Any, Dict, Optional, Tuple
+
+from pyrogram.enums import ChatType
+from pyrogram.types import Audio, CallbackQuery, Chat, Message, User
+from pyrogram.types.messages_and_media.message import Str
+
+from jiosaavn.database.database import Database
+
+UPLOAD_CHUNK = 512 * 1024
+
+
+class FakeDatabase:
+    """
+    Dictionary-backed version of the `Database` methods used while serving users.
+
+    Args:
+        search_type (str): Search type every user has selected in their settings.
+        quality (str): Quality every user has selected in their settings.
+    """
+
+    def __init__(self, search_type: str = "songs", quality: str = "320kbps"):
+        self.search_type = search_type
+        self.quality = quality
+        self.users: Dict[int, dict] = {}
+        self.songs: Dict[str, dict] = {}
+
+    async def get_user(self, user_id: int) -> dict:
+        if user_id not in self.users:
+            user = Database.new_user(user_id)
+            user.update(type=self.search_type, quality=self.quality)
+            self.users[user_id] = user
+        return self.users[user_id]
+
+    async def is_user_exist(self, user_id: int) -> bool:
+        return user_id in self.users
+
+    async def register_song_request(self, song_id: str, quality: str, count: bool = True) -> dict:
+        song = self.songs.setdefault(song_id, {'id': song_id, 'requests': 0})
+        song['requests'] += count
+        return dict(song.get(quality) or {})
+
+    async def get_song(self, song_id: str) -> Optional[dict]:
+        return self.songs.get(song_id)
+
+    async def update_song(self, song_id: str, quality: str, chat_id: int, message_id: int, **fields):
+        song = self.songs.setdefault(song_id, {'id': song_id, 'requests': 0})
+        record = song.setdefault(quality, {})
+        record.update(chat_id=chat_id, message_id=message_id, **{k: v for k, v in fields.items() if v is not None})
+
+    async def acquire_song_lease(self, song_id: str, quality: str, owner: str, ttl: int) -> bool:
+        record = self.songs.setdefault(song_id, {'id': song_id, 'requests': 0}).setdefault(quality, {})
+        lease = record.get('lease')
+        if lease and lease['owner'] != owner and lease['expires_at'] > time.time():
+            return False
+        record['lease'] = {'owner': owner, 'expires_at': time.time() + ttl}
+        return True
+
+    async def release_song_lease(self, song_id: str, quality: str, owner: str):
+        record = self.songs.get(song_id, {}).get(quality, {})
+        if record.get('lease', {}).get('owner') == owner:
+            del record['lease']
+
+    async def wait_for_song(self, song_id: str, quality: str, timeout: float, interval: float = 2.0) -> Optional[dict]:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            record = self.songs.get(song_id, {}).get(quality, {})
+            if record.get('message_id'):
+                return dict(record)
+            if not record.get('lease'):
+                return None
+            await asyncio.sleep(interval)
+        return None
+
+
+class FakeClient:
+    """
+    Bot stand-in counting every Telegram call the handlers make.
+
+    Uploads read the whole audio body, like Pyrogram does before sending it, and can be
+    slowed down to mimic the Telegram upload speed.
+
+    Args:
+        db (FakeDatabase): The database exposed as `client.db`.
+        upload_latency (float): Seconds every `send_audio` upload takes on top of reading the file.
+    """
+
+    def __init__(self, db: Optional[FakeDatabase] = None, upload_latency: float = 0.0):
+        self.db = db or FakeDatabase()
+        self.upload_latency = upload_latency
+        self.calls: Counter = Counter()
+        self.uploaded_bytes = 0
+        self._messages: Dict[Tuple[int, int], "FakeMessage"] = {}
+        self._message_ids = itertools.count(1)
+        self._file_ids = itertools.count(1)
+
+    def new_message(self, chat_id: int, text: Optional[str] = None, **kwargs) -> "FakeMessage":
+        message = FakeMessage(self, chat_id, next(self._message_ids), text=text, **kwargs)
+        self._messages[(chat_id, message.id)] = message
+        return message
+
+    async def send_message(self, chat_id: int, text: str, **kwargs) -> "FakeMessage":
+        self.calls["send_message"] += 1
+        return self.new_message(chat_id, text)
+
+    async def send_chat_action(self, chat_id: int, action: Any, **kwargs) -> bool:
+        self.calls["send_chat_action"] += 1
+        return True
+
+    async def send_audio(
+        self,
+        chat_id: int,
+        audio: Any,
+        caption: str = "",
+        duration: int = 0,
+        title: Optional[str] = None,
+        performer: Optional[str] = None,
+        reply_to_message_id: Optional[int] = None,
+        **kwargs
+    ) -> "FakeMessage":
+        if isinstance(audio, str):
+            # A file ID of an earlier upload: no bytes are sent
+            self.calls["send_audio:file_id"] += 1
+            file = Audio(file_id=audio, file_unique_id=audio, duration=duration, title=title, performer=performer)
+        else:
+            self.calls["send_audio:upload"] += 1
+            self.uploaded_bytes += await self._read(audio)
+            if self.upload_latency:
+                await asyncio.sleep(self.upload_latency)
+            file_no = next(self._file_ids)
+            file = Audio(
+                file_id=f"file-{file_no}", file_unique_id=f"unique-{file_no}",
+                duration=duration, title=title, performer=performer
+            )
+        return self.new_message(chat_id, caption=caption, audio=file)
+
+    async def get_messages(self, chat_id: int, message_ids: int, **kwargs) -> "FakeMessage":
+        self.calls["get_messages"] += 1
+        message = self._messages.get((chat_id, message_ids))
+        return message or FakeMessage(self, chat_id, message_ids, empty=True)
+
+    async def copy_message(self, chat_id: int, from_chat_id: int, message_id: int, **kwargs) -> "FakeMessage":
+        self.calls["copy_message"] += 1
+        source = self._messages[(from_chat_id, message_id)]
+        return self.new_message(chat_id, source.text, caption=source.caption, audio=source.audio)
+
+    async def _read(self, audio: Any) -> int:
+        if hasattr(audio, "read"):
+            size = 0
+            while chunk := audio.read(UPLOAD_CHUNK):
+                size += len(chunk)
+                # Let other jobs run between chunks, as the network writes of a real upload would
+                await asyncio.sleep(0)
+            return size
+        with open(audio, "rb") as file:
+            return await self._read(file)
+
+
+class FakeMessage(Message):
+    """A Telegram message whose methods record the call instead of reaching Telegram."""
+
+    def __init__(
+        self,
+        client: FakeClient,
+        chat_id: int,
+        message_id: int,
+        text: Optional[str] = None,
+        caption: Optional[str] = None,
+        audio: Optional[Audio] = None,
+        reply_to_message: Optional[Message] = None,
+        empty: Optional[bool] = None
+    ):
+        super().__init__(
+            client=client,
+            id=message_id,
+            chat=Chat(id=chat_id, type=ChatType.PRIVATE),
+            from_user=User(id=chat_id),
+            text=Str(text).init([]) if text else None,
+            caption=Str(caption).init([]) if caption else None,
+            audio=audio,
+            reply_to_message=reply_to_message,
+            empty=empty,
+        )
+
+    async def reply(self, text: str, quote: Optional[bool] = None, **kwargs) -> "FakeMessage":
+        self._client.calls["reply"] += 1
+        return self._client.new_message(self.chat.id, text, reply_to_message=self if quote else None)
+
+    async def edit(self, text: str, **kwargs) -> "FakeMessage":
+        self._client.calls["edit"] += 1
+        self.text = Str(text).init([])
+        return self
+
+    edit_text = edit
+
+    async def edit_media(self, media: Any, **kwargs) -> "FakeMessage":
+        self._client.calls["edit_media"] += 1
+        return self
+
+    async def delete(self, revoke: bool = True) -> bool:
+        self._client.calls["delete"] += 1
+        self._client._messages.pop((self.chat.id, self.id), None)
+        return True
+
+    async def copy(self, chat_id: int, reply_to_message_id: Optional[int] = None, **kwargs) -> "FakeMessage":
+        self._client.calls["copy"] += 1
+        return self._client.new_message(chat_id, self.text, caption=self.caption, audio=self.audio)
+
+
+class FakeCallbackQuery(CallbackQuery):
+    """A button press on `message` by the chat's user."""
+
+    def __init__(self, client: FakeClient, message: FakeMessage, data: str):
+        super().__init__(
+            client=client,
+            id=str(message.id),
+            from_user=User(id=message.chat.id),
+            chat_instance=str(message.chat.id),
+            message=message,
+            data=data,
+        )
+
+    async def answer(self, text: Optional[str] = None, show_alert: Optional[bool] = None, **kwargs) -> bool:
+        self._client.calls["answer"] += 1
+        return True
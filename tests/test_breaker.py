@@ -0,0 +1,97 @@
+"""
+Circuit breakers of the upstream endpoints, on a clock the tests move by hand.
+"""
+import aiohttp
+import pytest
+
+from api import breaker as breaker_module
+from api.breaker import CLOSED, HALF_OPEN, OPEN, BreakerRegistry, CircuitBreaker, CircuitOpenError, is_upstream_failure
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(breaker_module, "time", clock)
+    return clock
+
+
+def fail(breaker: CircuitBreaker):
+    with pytest.raises(RuntimeError):
+        with breaker.guard():
+            raise RuntimeError("upstream down")
+
+
+def test_opens_on_failures_and_closes_after_a_good_probe(clock):
+    breaker = CircuitBreaker("api.php", min_calls=4, failure_ratio=0.5, open_for=30)
+    for ok in (True, True, False):
+        breaker.record(ok, 0.1)
+    assert breaker.state == CLOSED
+
+    fail(breaker)
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        with breaker.guard():
+            pass
+
+    clock.now += 30
+    assert breaker.state == HALF_OPEN
+    with breaker.guard():
+        # Only one probe at a time
+        assert not breaker.allows()
+    assert breaker.state == CLOSED and breaker.stats()["calls"] == 0
+
+
+def test_failed_probes_double_the_open_time(clock):
+    breaker = CircuitBreaker("cdn", min_calls=1, open_for=10, max_open_for=25)
+    fail(breaker)
+
+    for cooldown in (20, 25):
+        clock.now += breaker.retry_in
+        assert breaker.state == HALF_OPEN
+        fail(breaker)
+        assert breaker.state == OPEN and breaker.retry_in == cooldown
+
+
+def test_slow_calls_open_the_circuit_and_old_calls_leave_the_window(clock):
+    breaker = CircuitBreaker("search", min_calls=2, slow_call=5, slow_ratio=1, horizon=60)
+    breaker.record(True, 6)
+    clock.now += 61
+    breaker.record(True, 6)
+    assert breaker.state == CLOSED
+
+    breaker.record(True, 6)
+    assert breaker.state == OPEN
+
+
+def test_cancelled_probe_frees_its_slot(clock):
+    breaker = CircuitBreaker("api.php", min_calls=1, open_for=1)
+    fail(breaker)
+    clock.now += 1
+
+    probe = breaker.acquire()
+    assert probe and not breaker.allows()
+    breaker.release(probe)
+    assert breaker.allows()
+
+
+def test_registry_only_counts_upstream_failures(clock):
+    registry = BreakerRegistry(min_calls=1)
+    not_found = aiohttp.ClientResponseError(None, (), status=404)
+    with pytest.raises(aiohttp.ClientResponseError):
+        with registry.guard("song", is_upstream_failure):
+            raise not_found
+    assert registry.allows("song") and registry.allows("never called")
+
+    registry.configure(enabled=False)
+    with pytest.raises(RuntimeError):
+        with registry.guard("song"):
+            raise RuntimeError("upstream down")
+    assert registry.allows("song") and not registry.stats()
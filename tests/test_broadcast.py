@@ -0,0 +1,80 @@
+"""
+The broadcast engine: the token bucket pacing its senders and the shards it reads users from.
+"""
+import time
+import asyncio
+from typing import List, Optional
+
+from jiosaavn.broadcast import TokenBucket, send_broadcast
+
+
+class Users:
+    """The broadcast calls of `Database` over users whose `_id`s are `ids`."""
+
+    def __init__(self, ids: List[int]):
+        self.ids = sorted(ids)
+        self.checkpoints = []
+
+    async def iter_broadcast_users(self, after: Optional[int] = None, lower: Optional[int] = None, upper: Optional[int] = None):
+        for doc_id in self.ids:
+            started = doc_id > after if after is not None else lower is None or doc_id >= lower
+            if started and (upper is None or doc_id < upper):
+                yield doc_id, doc_id + 1000
+
+    async def save_broadcast_progress(self, broadcast_id: int, shards: List[dict], counts: dict, status: Optional[str] = None):
+        self.checkpoints.append(([dict(shard) for shard in shards], status))
+
+
+class Client:
+    def __init__(self, db: Users):
+        self.db = db
+        self.sent = []
+
+    async def copy_message(self, chat_id: int, from_chat_id: int, message_id: int):
+        self.sent.append(chat_id)
+
+
+def broadcast(shards: List[dict]) -> dict:
+    counts = {'sent': 0, 'failed': 0, 'blocked': 0, 'deleted': 0}
+    return {'_id': 1, 'from_chat_id': 1, 'message_id': 1, 'shards': shards, 'counts': counts}
+
+
+def elapsed(bucket: TokenBucket, messages: int) -> float:
+    async def main():
+        started = time.monotonic()
+        await asyncio.gather(*(bucket.acquire() for _ in range(messages)))
+        return time.monotonic() - started
+
+    return asyncio.run(main())
+
+
+def test_burst_then_steady_rate():
+    # 5 messages right away, then 5 more at 100 per second
+    assert 0.04 <= elapsed(TokenBucket(rate=100, capacity=5), 10) < 0.5
+
+
+def test_flood_wait_pauses_every_sender():
+    bucket = TokenBucket(rate=1000)
+    bucket.pause(0.1)
+    assert elapsed(bucket, 1) >= 0.09
+
+
+def test_shards_are_sent_and_checkpointed_separately():
+    client = Client(Users(range(10)))
+    shards = [{'lower': None, 'upper': 5, 'cursor': None}, {'lower': 5, 'upper': None, 'cursor': 6}]
+    counts = asyncio.run(send_broadcast(client, broadcast(shards), rate=1000, workers=3))
+
+    # The second shard resumes after its cursor
+    assert sorted(client.sent) == [1000 + doc_id for doc_id in (0, 1, 2, 3, 4, 7, 8, 9)]
+    assert counts['sent'] == 8
+    final, status = client.db.checkpoints[-1]
+    assert status == 'done' and [shard['cursor'] for shard in final] == [4, 9]
+    assert [(shard['lower'], shard['upper']) for shard in final] == [(None, 5), (5, None)]
+
+
+def test_broadcasts_from_before_sharding_resume_from_their_cursor():
+    client = Client(Users(range(5)))
+    legacy = broadcast(None)
+    legacy['cursor'] = 2
+    asyncio.run(send_broadcast(client, legacy, rate=1000, workers=2))
+    assert sorted(client.sent) == [1003, 1004]
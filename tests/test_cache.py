@@ -0,0 +1,89 @@
+"""
+The in-process response cache and the `cached` decorator of the API clients.
+"""
+import asyncio
+from typing import Optional
+
+from api.cache import MemoryCache, cached, make_key
+
+
+class Client:
+    """A stand-in API client counting how often each lookup reaches upstream."""
+
+    def __init__(self, ttl: float = 60):
+        self.cache = MemoryCache()
+        self.cache_ttls = {"song": ttl}
+        self.calls = 0
+
+    @cached("song", ignore=("hint",))
+    async def get_song(self, song_id: str, hint: Optional[str] = None) -> Optional[dict]:
+        self.calls += 1
+        return {"id": song_id, "calls": self.calls} if song_id != "missing" else None
+
+
+def test_values_are_copies_and_expire():
+    cache = MemoryCache()
+
+    async def main():
+        await cache.set("song", {"title": "a"}, 60)
+        value = await cache.get("song")
+        value["title"] = "changed"
+        assert await cache.get("song") == {"title": "a"}
+
+        await cache.set("old", {"title": "b"}, -1)
+        assert await cache.get("old") is None
+
+    asyncio.run(main())
+    assert cache.stats()["entries"] == 1
+
+
+def test_least_recently_used_entries_are_evicted_over_budget():
+    entry = len(b'{"value":"xxxxxxxx"}')
+    cache = MemoryCache(max_bytes=entry * 2)
+
+    async def main():
+        await cache.set("a", {"value": "xxxxxxxx"}, 60)
+        await cache.set("b", {"value": "xxxxxxxx"}, 60)
+        assert await cache.get("a")
+        await cache.set("c", {"value": "xxxxxxxx"}, 60)
+        return [await cache.get(key) is not None for key in ("a", "b", "c")]
+
+    assert asyncio.run(main()) == [True, False, True]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_keys_ignore_hints_and_normalize_parameters():
+    assert make_key("song", {"id": " 1 ", "page": None}) == make_key("song", {"id": "1"})
+
+    client = Client()
+
+    async def main():
+        first = await client.get_song("1", hint="a")
+        second = await client.get_song(song_id="1", hint="b")
+        assert first == second
+        await client.get_song("2")
+
+    asyncio.run(main())
+    assert client.calls == 2
+
+
+def test_empty_results_are_not_cached():
+    client = Client()
+
+    async def main():
+        for _ in range(2):
+            assert await client.get_song("missing") is None
+
+    asyncio.run(main())
+    assert client.calls == 2
+
+
+def test_caching_is_off_without_a_ttl():
+    client = Client(ttl=0)
+
+    async def main():
+        for _ in range(2):
+            await client.get_song("1")
+
+    asyncio.run(main())
+    assert client.calls == 2
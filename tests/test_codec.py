@@ -0,0 +1,52 @@
+"""
+Decoding and encoding of upstream responses, with orjson and with the standard library.
+"""
+import sys
+import json
+import importlib
+from pathlib import Path
+
+import pytest
+
+import api.codec
+
+EXAMPLES = Path(__file__).resolve().parent.parent / "api" / "examples"
+
+
+@pytest.fixture(params=["orjson", "json"])
+def codec(request, monkeypatch):
+    """`api.codec` loaded with each backend, restored afterwards."""
+    if request.param == "orjson":
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setitem(sys.modules, "orjson", None)
+    module = importlib.reload(api.codec)
+    assert module.BACKEND == request.param
+    yield module
+    monkeypatch.undo()
+    importlib.reload(api.codec)
+
+
+def test_responses_decode_from_bytes_like_the_standard_library(codec):
+    body = (EXAMPLES / "get_song_response.json").read_bytes()
+    assert codec.loads(body) == json.loads(body.decode("utf-8"))
+    assert codec.loads('{"title": "Kesariya"}') == {"title": "Kesariya"}
+
+
+@pytest.mark.parametrize("body", [b'{"title": "\xff"}', b'{"title": ', b"<html>blocked</html>"])
+def test_invalid_documents_raise_a_json_decode_error(codec, body):
+    with pytest.raises(json.JSONDecodeError):
+        codec.loads(body)
+
+
+def test_values_round_trip(codec):
+    value = {"title": "Tum Hi Ho", 320: [1, 2.5, None], "plays": 2 ** 70}
+    encoded = codec.dumps(value)
+    assert isinstance(encoded, bytes) and b", " not in encoded and b": " not in encoded
+    assert codec.loads(encoded) == {"title": "Tum Hi Ho", "320": [1, 2.5, None], "plays": 2 ** 70}
+
+
+def test_html_pages_are_sniffed_from_the_first_bytes():
+    assert api.codec.looks_like_html(b"\xef\xbb\xbf  \n<!DOCTYPE html><html>")
+    assert api.codec.looks_like_html(b"<HTML>")
+    assert not api.codec.looks_like_html(b'{"html": "<html>"}')
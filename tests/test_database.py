@@ -0,0 +1,142 @@
+"""
+User counters and user iteration of `Database`, against stand-ins for the collections involved.
+"""
+import asyncio
+from types import SimpleNamespace
+from typing import List, Optional
+
+from pymongo.errors import DuplicateKeyError
+
+from jiosaavn.database.database import Database
+
+
+class Collection:
+    """Records counter updates and answers user updates and upserts with a single document."""
+
+    def __init__(self, document: Optional[dict] = None, racing: Optional[dict] = None):
+        """`racing` is inserted by a concurrent request just before this one upserts."""
+        self.document = document
+        self.racing = racing
+        self.increments = []
+
+    async def find_one_and_update(self, query: dict, update: dict, **kwargs) -> Optional[dict]:
+        return self.document
+
+    async def find_one(self, query: dict, projection: Optional[dict] = None) -> Optional[dict]:
+        return self.document
+
+    async def update_one(self, query: dict, update: dict, upsert: bool = False):
+        if '$inc' in update:
+            self.increments.append(update['$inc'])
+            return SimpleNamespace(upserted_id=None)
+        if self.racing:
+            self.document = self.racing
+            raise DuplicateKeyError("E11000 duplicate key error")
+        if self.document:
+            return SimpleNamespace(upserted_id=None)
+        self.document = {'_id': 'new', **query, **update['$setOnInsert']}
+        return SimpleNamespace(upserted_id='new')
+
+
+class Users:
+    """Answers `_id`-range queries and `$bucketAuto` splits over a list of users."""
+
+    def __init__(self, ids: List[int]):
+        self.users = [{'_id': doc_id, 'id': doc_id + 1000} for doc_id in sorted(ids)]
+
+    def find(self, query: dict, projection: dict, batch_size: int) -> "Cursor":
+        id_range = query.get('_id', {})
+        return Cursor([
+            user for user in self.users
+            if user['_id'] > id_range.get('$gt', float('-inf'))
+            and user['_id'] >= id_range.get('$gte', float('-inf'))
+            and user['_id'] < id_range.get('$lt', float('inf'))
+        ])
+
+    def aggregate(self, pipeline: List[dict], **kwargs) -> "Cursor":
+        # Like Mongo, every bucket's max is the next bucket's min, except for the last one
+        buckets = pipeline[-1]['$bucketAuto']['buckets']
+        ids = [user['_id'] for user in self.users]
+        size = -(-len(ids) // buckets)
+        groups = [ids[start:start + size] for start in range(0, len(ids), size)]
+        return Cursor([
+            {'_id': {'min': group[0], 'max': groups[number + 1][0] if number + 1 < len(groups) else group[-1]}}
+            for number, group in enumerate(groups)
+        ])
+
+
+class Cursor:
+    def __init__(self, documents: List[dict]):
+        self.documents = documents
+
+    def sort(self, key: str, direction: int) -> "Cursor":
+        return self
+
+    def limit(self, count: int) -> "Cursor":
+        return Cursor(self.documents[:count])
+
+    async def to_list(self, length: int) -> List[dict]:
+        return self.documents[:length]
+
+
+def database(user: Optional[dict] = None, counters: Optional[dict] = None) -> Database:
+    db = Database("mongodb://localhost:27017")
+    db.user_collection = Collection(user)
+    db.counter_collection = Collection(counters)
+    return db
+
+
+def test_settings_missing_from_a_user_are_not_decremented():
+    db = database(user={'id': 1})
+    asyncio.run(db.update_user(1, 'quality', '320kbps'))
+    assert db.counter_collection.increments == [{'quality.320kbps': 1}]
+
+
+def test_changing_a_setting_moves_the_user_between_buckets():
+    db = database(user={'id': 1, 'quality': '160kbps'})
+    asyncio.run(db.update_user(1, 'quality', '320kbps'))
+    assert db.counter_collection.increments == [{'quality.160kbps': -1, 'quality.320kbps': 1}]
+
+
+def test_total_users_comes_from_the_counters():
+    db = database(counters={'_id': 'users', 'total': 1234})
+    assert asyncio.run(db.get_total_users()) == 1234
+
+
+def test_new_users_are_registered_and_counted_once():
+    db = database()
+
+    async def main():
+        user = await db.add_user(1)
+        assert user['_id'] == 'new' and user['id'] == 1
+        db.user_cache.invalidate(1)
+        assert await db.add_user(1) is None
+
+    asyncio.run(main())
+    assert [changes['total'] for changes in db.counter_collection.increments] == [1]
+
+
+def test_a_user_registered_concurrently_is_not_added_again():
+    racing = {'_id': 'other', 'id': 1}
+    db = database()
+    db.user_collection = Collection(racing=racing)
+
+    assert asyncio.run(db.get_user(1)) == racing
+    assert not db.counter_collection.increments
+
+
+def test_shards_cover_every_user_exactly_once():
+    db = database()
+    db.user_collection = Users(range(0, 50, 2))
+
+    async def main():
+        ranges = await db.user_id_ranges(2)
+        assert len(ranges) == 2 and ranges[0][0] is None and ranges[-1][1] is None
+        return [
+            [doc_id async for users in db.iter_user_ids(lower=lower, upper=upper, batch_size=4) for doc_id, _ in users]
+            for lower, upper in ranges
+        ]
+
+    first, second = asyncio.run(main())
+    assert first and second
+    assert first + second == list(range(0, 50, 2))
@@ -0,0 +1,124 @@
+"""
+Upload deduplication in `download_handler`: joining uploads in progress, taking them over,
+and batches whose songs overlap.
+"""
+import io
+import asyncio
+from typing import List
+
+import pytest
+
+from tests.fakes import FakeClient, FakeDatabase
+from jiosaavn.plugins import download_handler
+from jiosaavn.plugins.download_handler import SongJob, batch_download, finish_upload, pending_uploads, prepare_song
+
+QUALITY = "320kbps"
+
+
+class DelayedLookups(FakeDatabase):
+    """Delays each cached-record lookup by the next of `delays`, in call order."""
+
+    def __init__(self, delays: List[float]):
+        super().__init__(quality=QUALITY)
+        self.delays = list(delays)
+
+    async def register_song_request(self, song_id: str, quality: str, count: bool = True) -> dict:
+        await asyncio.sleep(self.delays.pop(0) if self.delays else 0)
+        return await super().register_song_request(song_id, quality, count)
+
+
+@pytest.fixture(autouse=True)
+def fake_downloads(monkeypatch):
+    """Replaces song downloads with small in-memory files and counts them."""
+    fetched = []
+
+    async def fetch_song(client, user_id, song_id, quality, bitrate, msg=None, trace=None) -> dict:
+        fetched.append(song_id)
+        await asyncio.sleep(0.01)
+        return {
+            'song_id': song_id, 'quality': quality, 'title': song_id, 'performer': "", 'caption': "",
+            'duration': 1, 'size': 4, 'audio': io.BytesIO(b"song"), 'thumb': io.BytesIO(), 'download_dir': None,
+        }
+
+    monkeypatch.setattr(download_handler, "fetch_song", fetch_song)
+    monkeypatch.setattr(download_handler, "STORAGE_CHANNEL", 0)
+    pending_uploads.clear()
+    yield fetched
+    pending_uploads.clear()
+
+
+def run_batch(client: FakeClient, user_id: int, song_ids: List[str]):
+    message = client.new_message(user_id, "album")
+    status = client.new_message(user_id, "**Processing...**")
+    return batch_download(client, message, status, song_ids, "album")
+
+
+def test_overlapping_batches_in_reverse_order_finish():
+    # A claims X and B claims Y first, then A joins B's Y and B joins A's X: each batch's
+    # first song was claimed by the other batch, which only uploads it on its second turn
+    client = FakeClient(DelayedLookups([0.05, 0, 0.05, 0]))
+
+    async def main():
+        return await asyncio.wait_for(
+            asyncio.gather(run_batch(client, 1, ["songY", "songX"]), run_batch(client, 2, ["songX", "songY"])),
+            timeout=5
+        )
+
+    assert asyncio.run(main()) == [(2, 0), (2, 0)]
+    assert not pending_uploads
+
+
+def test_single_download_joins_upload_in_progress(fake_downloads):
+    client = FakeClient(FakeDatabase(quality=QUALITY))
+
+    async def main():
+        owner = await prepare_song(client, 1, "song", QUALITY)
+        joining = asyncio.create_task(prepare_song(client, 2, "song", QUALITY))
+        await asyncio.sleep(0.02)
+        assert not joining.done()
+
+        record = await download_handler.store_song(client, owner, 1)
+        joined = await asyncio.wait_for(joining, 1)
+        assert record and joined.record == record
+        assert joined.future is None and not joined.prepared
+
+    asyncio.run(main())
+    assert fake_downloads == ["song"]
+    assert not pending_uploads
+
+
+def test_stalled_upload_is_taken_over(monkeypatch, fake_downloads):
+    monkeypatch.setattr(download_handler, "UPLOAD_LEASE_TTL", 0.05)
+    client = FakeClient(FakeDatabase(quality=QUALITY))
+
+    async def main():
+        stalled = SongJob("song", QUALITY)
+        stalled.future = asyncio.get_running_loop().create_future()
+        pending_uploads[("song", QUALITY)] = stalled
+
+        job = await prepare_song(client, 1, "song", QUALITY)
+        assert pending_uploads[("song", QUALITY)] is job
+        assert job.prepared and not job.error
+
+        # The stalled owner finishing late leaves the new claim and its lease alone
+        await finish_upload(client, stalled, None)
+        assert pending_uploads[("song", QUALITY)] is job
+        assert job.has_lease and client.db.songs["song"][QUALITY].get("lease")
+
+        await finish_upload(client, job, None)
+        assert not pending_uploads and not client.db.songs["song"][QUALITY].get("lease")
+
+    asyncio.run(main())
+    assert fake_downloads == ["song"]
+
+
+def test_only_user_requests_are_counted():
+    client = FakeClient(FakeDatabase(quality=QUALITY))
+
+    async def main():
+        for user_id in (1, None):
+            job = await prepare_song(client, user_id, "song", QUALITY)
+            await finish_upload(client, job, None)
+
+    asyncio.run(main())
+    assert client.db.songs["song"]["requests"] == 1
@@ -0,0 +1,103 @@
+"""
+Hedging of official lookups with the fallback API.
+"""
+import asyncio
+from typing import Any, Optional
+
+import pytest
+
+from api.hedge import HedgePolicy, first_usable
+
+
+class Lookup:
+    """A lookup answering `result` (or raising `error`) after `delay` seconds, noting how it was run."""
+
+    def __init__(self, result: Any = None, delay: float = 0.0, error: Optional[Exception] = None):
+        self.result = result
+        self.delay = delay
+        self.error = error
+        self.calls = []
+        self.cancelled = False
+
+    async def __call__(self, *args) -> Any:
+        self.calls.append(args)
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error:
+            raise self.error
+        return self.result
+
+
+def usable(result: Any) -> bool:
+    return bool(result)
+
+
+def race(primary: Lookup, secondary: Lookup, delay: Optional[float]):
+    async def main():
+        outcome = await first_usable(primary, secondary, usable, delay)
+        # Let the cancelled loser run its cancellation
+        await asyncio.sleep(0)
+        return outcome
+
+    return asyncio.run(main())
+
+
+def test_primary_answering_before_the_delay_wins_alone():
+    primary, secondary = Lookup({"id": "official"}), Lookup({"id": "fallback"})
+    source, result, hedged, latency = race(primary, secondary, delay=1)
+
+    assert (source, result, hedged) == ("official", {"id": "official"}, False)
+    assert latency is not None and not secondary.calls
+
+
+def test_hedge_fires_and_the_fallback_wins():
+    primary, secondary = Lookup({"id": "official"}, delay=1), Lookup({"id": "fallback"})
+    source, result, hedged, latency = race(primary, secondary, delay=0.01)
+
+    assert (source, result, hedged) == ("fallback", {"id": "fallback"}, True)
+    # Started as a hedge, the fallback gets no official response
+    assert secondary.calls == [(None,)]
+    assert primary.cancelled and latency >= 0.01
+
+
+def test_primary_winning_after_the_hedge_cancels_the_fallback():
+    primary, secondary = Lookup({"id": "official"}, delay=0.05), Lookup({"id": "fallback"}, delay=1)
+    source, _, hedged, _ = race(primary, secondary, delay=0.01)
+
+    assert (source, hedged) == ("official", True)
+    assert secondary.cancelled
+
+
+def test_unusable_primary_result_falls_through_to_the_fallback():
+    primary, secondary = Lookup({}), Lookup({"id": "fallback"})
+    source, result, hedged, latency = race(primary, secondary, delay=None)
+
+    assert (source, result, hedged) == ("fallback", {"id": "fallback"}, False)
+    assert secondary.calls == [({},)] and latency is not None
+
+
+def test_official_error_is_raised_when_both_fail():
+    primary, secondary = Lookup(error=ValueError("official down")), Lookup(error=RuntimeError("fallback down"))
+    with pytest.raises(ValueError, match="official down"):
+        race(primary, secondary, delay=None)
+
+
+def test_official_result_is_returned_when_neither_is_usable():
+    source, result, _, _ = race(Lookup([]), Lookup(None), delay=None)
+    assert (source, result) == ("none", [])
+
+
+def test_policy_delay_follows_official_latencies_and_shortens_while_the_fallback_wins():
+    policy = HedgePolicy("song", min_delay=0.1, max_delay=3, min_samples=4)
+    assert policy.delay == 3
+
+    for _ in range(4):
+        policy.observe("official", 1.0)
+    assert policy.delay == 1.0
+
+    for _ in range(5):
+        policy.observe("fallback")
+    assert policy.delay == 0.5
@@ -0,0 +1,65 @@
+"""
+The logging pipeline: deferred formatting on the queue and rate limiting of hot call sites.
+"""
+import queue
+import logging
+
+import pytest
+
+from jiosaavn import logs
+from jiosaavn.logs import DeferredQueueHandler, RateLimitFilter
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(logs, "time", clock)
+    return clock
+
+
+def record(msg: str, *args, level: int = logging.INFO, lineno: int = 10) -> logging.LogRecord:
+    return logging.LogRecord("api.jiosaavn", level, __file__, lineno, msg, args, None)
+
+
+def test_each_call_site_gets_its_own_bucket(clock):
+    limiter = RateLimitFilter(per_minute=2)
+    assert [limiter.filter(record("hit")) for _ in range(3)] == [True, True, False]
+    assert limiter.filter(record("other site", lineno=11))
+    assert limiter.filter(record("error", level=logging.ERROR))
+
+    # Refills at two records a minute
+    clock.now += 30
+    kept = record("hit")
+    assert limiter.filter(kept) and not limiter.filter(record("hit"))
+    assert kept.getMessage() == "hit [1 similar messages dropped]"
+
+
+def test_records_over_the_limit_are_sampled(clock):
+    limiter = RateLimitFilter(per_minute=1, sample_every=3)
+    assert [limiter.filter(record("hit")) for _ in range(7)] == [True, False, False, True, False, False, True]
+
+
+def test_plain_arguments_are_formatted_by_the_listener():
+    handler = DeferredQueueHandler(queue.Queue())
+    plain = handler.prepare(record("song %s in %s", "abc", 320))
+    assert plain.msg == "song %s in %s" and plain.args == ("abc", 320)
+
+    response = {"title": "a"}
+    mutable = handler.prepare(record("response %s", response))
+    response["title"] = "changed"
+    assert mutable.msg == "response {'title': 'a'}" and mutable.args is None
+
+
+def test_records_are_dropped_when_the_queue_is_full():
+    handler = DeferredQueueHandler(queue.Queue(maxsize=1))
+    for _ in range(2):
+        handler.handle(record("hit"))
+    assert handler.queue.qsize() == 1
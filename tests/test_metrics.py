@@ -0,0 +1,38 @@
+"""
+Bot metrics: handler latencies recorded under each handler's name, and the statistics collector.
+"""
+import asyncio
+
+from prometheus_client import REGISTRY
+
+from jiosaavn.metrics import StatsCollector, register_stats, timed_handler
+from jiosaavn.plugins.admin_handler import stats_handler
+
+
+def calls(handler: str) -> float:
+    return REGISTRY.get_sample_value("bot_handler_seconds_count", {"handler": handler, "outcome": "ok"}) or 0
+
+
+def test_owner_only_handlers_keep_their_name():
+    assert stats_handler.__name__ == "stats_handler"
+
+    async def ping(client, message):
+        return "pong"
+
+    before = calls("ping")
+    assert asyncio.run(timed_handler(ping)(None, None)) == "pong"
+    assert calls("ping") == before + 1
+
+
+def test_a_later_bot_replaces_the_statistics_of_an_earlier_one():
+    def collector(coalesced: int) -> StatsCollector:
+        return StatsCollector(
+            caches={"users": lambda: {"hits": 3, "misses": 1, "evictions": 0, "entries": 2, "hit_ratio": 0.75}},
+            gauges={},
+            counters={"jiosaavn_requests_coalesced": ("Coalesced requests.", lambda: coalesced)}
+        )
+
+    register_stats(collector(1))
+    register_stats(collector(5))
+    assert REGISTRY.get_sample_value("jiosaavn_requests_coalesced_total") == 5
+    assert REGISTRY.get_sample_value("cache_lookups_total", {"cache": "users", "result": "hit"}) == 3
@@ -0,0 +1,83 @@
+"""
+The file ID backfill of songs stored before file IDs were recorded.
+"""
+import asyncio
+from types import SimpleNamespace
+from typing import List, Optional
+
+from pyrogram.errors import FloodWait
+
+from jiosaavn import migrations
+from jiosaavn.migrations import backfill_file_ids
+
+QUALITY = "320kbps"
+
+
+class Songs:
+    """The backfill calls of `Database` over songs stored at `(chat_id, message_id)`."""
+
+    def __init__(self, stored: List[tuple]):
+        self.songs = [
+            {'_id': number, 'id': f"song{number}", QUALITY: {'chat_id': chat_id, 'message_id': message_id}}
+            for number, (chat_id, message_id) in enumerate(stored)
+        ]
+
+    async def get_songs_without_file_id(self, quality: str, limit: int = 200, after: Optional[int] = None) -> list:
+        pending = [
+            song for song in self.songs
+            if quality in song and not {'file_id', 'file_id_missing'} & set(song[quality])
+            and (after is None or song['_id'] > after)
+        ]
+        return pending[:limit]
+
+    async def update_song(self, song_id: str, quality: str, chat_id: int, message_id: int, **fields):
+        self.record(song_id)['file_id'] = fields['file_id']
+
+    async def mark_song_file_id_missing(self, song_id: str, quality: str):
+        self.record(song_id)['file_id_missing'] = True
+
+    def record(self, song_id: str) -> dict:
+        return next(song[QUALITY] for song in self.songs if song['id'] == song_id)
+
+
+class Client:
+    """Serves audio messages, except for the deleted ones and the chats that fail."""
+
+    def __init__(self, db: Songs, deleted=(), errors=None):
+        self.db = db
+        self.deleted = set(deleted)
+        self.errors = errors or {}
+
+    async def get_messages(self, chat_id: int, message_ids: List[int]) -> list:
+        if self.errors.get(chat_id):
+            raise self.errors[chat_id].pop(0)
+        return [
+            SimpleNamespace(id=message_id, empty=True, audio=None) if message_id in self.deleted else
+            SimpleNamespace(id=message_id, empty=False, audio=SimpleNamespace(file_id=f"file{message_id}"))
+            for message_id in message_ids
+        ]
+
+
+def backfill(client: Client, **kwargs):
+    asyncio.run(backfill_file_ids(client, delay=0, **kwargs))
+    return [song[QUALITY] for song in client.db.songs]
+
+
+def test_only_messages_reported_missing_are_flagged(monkeypatch):
+    monkeypatch.setattr(migrations, "audio_fields", lambda message: {'file_id': message.audio.file_id})
+    client = Client(Songs([(1, 10), (1, 11), (2, 20)]), deleted={11}, errors={2: [ConnectionError("network down")]})
+    records = backfill(client, batch_size=2)
+
+    assert records[0]['file_id'] == "file10"
+    assert records[1]['file_id_missing'] is True
+    # A transient error leaves the songs of that chat for the next run
+    assert records[2] == {'chat_id': 2, 'message_id': 20}
+
+    backfill(client)
+    assert records[2]['file_id'] == "file20"
+
+
+def test_flood_waits_are_waited_out(monkeypatch):
+    monkeypatch.setattr(migrations, "audio_fields", lambda message: {'file_id': message.audio.file_id})
+    client = Client(Songs([(1, 10)]), errors={1: [FloodWait(value=0)]})
+    assert backfill(client)[0]['file_id'] == "file10"
@@ -0,0 +1,37 @@
+"""
+Pre-warming of the storage channel: what is copied, uploaded or left alone, and what is counted.
+"""
+import asyncio
+
+import pytest
+from pyrogram.types import Audio
+
+from tests.fakes import FakeClient, FakeDatabase
+from jiosaavn import prewarm as prewarm_module
+from jiosaavn.plugins import download_handler
+
+STORAGE = -100123
+QUALITY = "320kbps"
+
+
+@pytest.fixture(autouse=True)
+def storage_channel(monkeypatch):
+    monkeypatch.setattr(prewarm_module, "STORAGE_CHANNEL", STORAGE)
+    monkeypatch.setattr(download_handler, "STORAGE_CHANNEL", STORAGE)
+    download_handler.pending_uploads.clear()
+
+
+def test_prewarm_copies_user_uploads_without_counting_requests():
+    client = FakeClient(FakeDatabase(quality=QUALITY))
+
+    async def main():
+        # "user" was uploaded to a user's chat, "stored" already lives in the storage channel
+        user_msg = client.new_message(42, audio=Audio(file_id="f1", file_unique_id="u1", duration=1))
+        await client.db.update_song("user", QUALITY, 42, user_msg.id, file_id="f1")
+        stored_msg = client.new_message(STORAGE, audio=Audio(file_id="f2", file_unique_id="u2", duration=1))
+        await client.db.update_song("stored", QUALITY, STORAGE, stored_msg.id, file_id="f2")
+        return await prewarm_module.prewarm(client, ["user", "stored"], [QUALITY], rate=0)
+
+    assert asyncio.run(main()) == {"stored": 1, "cached": 1, "failed": 0}
+    assert client.db.songs["user"][QUALITY]["chat_id"] == STORAGE
+    assert client.db.songs["user"]["requests"] == client.db.songs["stored"]["requests"] == 0
@@ -0,0 +1,78 @@
+"""
+Coalescing of identical in-flight API requests.
+"""
+import asyncio
+
+import pytest
+
+from api.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_request():
+    flight = SingleFlight()
+    started = []
+
+    async def fetch():
+        started.append(1)
+        await asyncio.sleep(0.01)
+        return {"songs": []}
+
+    async def main():
+        results = await asyncio.gather(*(flight.do("album", fetch) for _ in range(3)))
+        # Joined callers get their own copy to mutate
+        results[1]["songs"].append("x")
+        return results
+
+    leader, joined, other = asyncio.run(main())
+    assert len(started) == 1 and flight.coalesced == 2
+    assert leader == other == {"songs": []} and joined == {"songs": ["x"]}
+    assert len(flight) == 0
+
+
+def test_failures_reach_every_caller_and_are_not_kept():
+    flight = SingleFlight()
+    attempts = []
+
+    async def fetch():
+        attempts.append(1)
+        await asyncio.sleep(0.01)
+        if len(attempts) == 1:
+            raise RuntimeError("upstream down")
+        return "ok"
+
+    async def main():
+        results = await asyncio.gather(flight.do("song", fetch), flight.do("song", fetch), return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+        return await flight.do("song", fetch)
+
+    assert asyncio.run(main()) == "ok"
+    assert len(attempts) == 2
+
+
+def test_request_is_cancelled_only_with_its_last_caller():
+    flight = SingleFlight()
+
+    async def main():
+        request = None
+
+        async def fetch():
+            nonlocal request
+            request = asyncio.current_task()
+            await asyncio.sleep(1)
+
+        callers = [asyncio.create_task(flight.do("song", fetch)) for _ in range(2)]
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+
+        callers[0].cancel()
+        await asyncio.sleep(0)
+        assert not request.done()
+
+        callers[1].cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await callers[1]
+        await asyncio.sleep(0)
+        assert request.cancelled()
+
+    asyncio.run(main())
+    assert len(flight) == 0
@@ -0,0 +1,82 @@
+"""
+Staggered racing of the fallback API's lookup strategies.
+"""
+import time
+import asyncio
+from typing import Any, List, Optional, Tuple
+
+from api.strategies import StrategyRace, id_format
+
+FOUND = {'success': True, 'data': {'id': "1"}}
+NOT_FOUND = {'success': False, 'message': "not found"}
+
+
+class Strategy:
+    """A strategy answering `response` (or raising `error`) after `delay` seconds, noting when it ran."""
+
+    def __init__(self, response: Any = None, delay: float = 0.0, error: Optional[Exception] = None):
+        self.response = response
+        self.delay = delay
+        self.error = error
+        self.started_at: Optional[float] = None
+        self.cancelled = False
+
+    async def __call__(self) -> Any:
+        self.started_at = time.monotonic()
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error:
+            raise self.error
+        return self.response
+
+
+def run(race: StrategyRace, strategies: List[Tuple[str, Strategy]], item_id: str = "1234") -> Tuple[Any, float]:
+    async def main():
+        started = time.monotonic()
+        response = await race.run(item_id, strategies)
+        await asyncio.sleep(0)
+        return response, started
+
+    return asyncio.run(main())
+
+
+def test_next_strategy_starts_after_the_stagger_or_a_miss():
+    slow, quick_miss, found = Strategy(FOUND, delay=0.5), Strategy(NOT_FOUND), Strategy(FOUND, delay=0.02)
+    response, started = run(StrategyRace("album", stagger=0.1), [("link", slow), ("id", quick_miss), ("query", found)])
+
+    assert response == FOUND
+    # `id` waited out the stagger on `link`; `query` started right after `id` missed
+    assert quick_miss.started_at - started >= 0.09
+    assert found.started_at - quick_miss.started_at < 0.05
+
+
+def test_first_success_cancels_the_strategies_still_running():
+    slow, found = Strategy(FOUND, delay=1), Strategy(FOUND)
+    race = StrategyRace("song", stagger=0)
+    response, _ = run(race, [("link", slow), ("id", found)])
+
+    assert response == FOUND and slow.cancelled
+    assert race.stats() == {"numeric": {"id": 1}}
+
+
+def test_winner_for_an_id_format_starts_first_next_time():
+    race = StrategyRace("song", stagger=0.5)
+    run(race, [("link", Strategy(NOT_FOUND)), ("id", Strategy(FOUND))])
+
+    link, by_id = Strategy(FOUND), Strategy(FOUND)
+    run(race, [("link", link), ("id", by_id)])
+    assert by_id.started_at is not None and link.started_at is None
+    assert race.order(id_format("ABmPzRYz"), ["link", "id"]) == ["link", "id"]
+
+
+def test_when_every_strategy_fails_the_last_default_response_is_returned():
+    race = StrategyRace("playlist", stagger=0)
+    first, last = dict(NOT_FOUND, message="first"), dict(NOT_FOUND, message="last")
+    strategies = [("link", Strategy(first)), ("id", Strategy(last, delay=0.02)), ("query", Strategy(error=RuntimeError()))]
+    assert run(race, strategies)[0] == last
+
+    assert run(race, [("link", Strategy(error=RuntimeError())), ("id", Strategy(None))])[0] is None
+    assert not race.stats()